@@ -1,7 +1,15 @@
-import requests
+import os
+import sys
 from mcp.server.fastmcp import FastMCP
 
-BACKEND = "http://localhost:8080"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from mcp_common.transport import shared_transport
+
+BACKEND = os.environ.get("GREYCAT_BASE_URL", "http://localhost:8080")
+
+# One keep-alive pool for every tool call (see backend/mcp_common/transport.py)
+transport = shared_transport(BACKEND)
 
 # Name of your MCP server
 mcp = FastMCP("twin-backend")
@@ -14,7 +22,7 @@ def getCityTotals(day: str) -> dict:
     City-level degraded vs not degraded vehicles for a given day.
     day format: YYYY-MM-DD (e.g. 2025-08-16)
     """
-    resp = requests.get(f"{BACKEND}/getCityTotals", params={"day": day})
+    resp = transport.request_sync("GET", "/getCityTotals", params={"day": day})
     resp.raise_for_status()
     return resp.json()
 
@@ -26,8 +34,9 @@ def getSiteTotals(site: str, day: str) -> dict:
     site: e.g. 'RUHSM173'
     day: '2025-08-20'
     """
-    resp = requests.get(
-        f"{BACKEND}/getSiteTotals",
+    resp = transport.request_sync(
+        "GET",
+        "/getSiteTotals",
         params={"site": site, "day": day},
     )
     resp.raise_for_status()
@@ -39,8 +48,9 @@ def getSiteDayStatus(site: str, day: str) -> dict:
     """
     Detailed site-day status (detections, good/bad, color, etc.).
     """
-    resp = requests.get(
-        f"{BACKEND}/getSiteDayStatus",
+    resp = transport.request_sync(
+        "GET",
+        "/getSiteDayStatus",
         params={"site": site, "day": day},
     )
     resp.raise_for_status()
@@ -52,8 +62,9 @@ def getVehicleDegradeStatus(plate: str) -> dict:
     """
     Latest degradation status for a plate.
     """
-    resp = requests.get(
-        f"{BACKEND}/getVehicleDegradeStatus",
+    resp = transport.request_sync(
+        "GET",
+        "/getVehicleDegradeStatus",
         params={"plate": plate},
     )
     resp.raise_for_status()
@@ -65,8 +76,9 @@ def getTripsForDay(plate: str, day: str) -> list:
     """
     All 30-min trips for a plate on a given day.
     """
-    resp = requests.get(
-        f"{BACKEND}/getTripsForDay",
+    resp = transport.request_sync(
+        "GET",
+        "/getTripsForDay",
         params={"plate": plate, "day": day},
     )
     resp.raise_for_status()
@@ -78,8 +90,9 @@ def getTripsAllDays(plate: str) -> list:
     """
     All trips for a plate across all days.
     """
-    resp = requests.get(
-        f"{BACKEND}/getTripsAllDays",
+    resp = transport.request_sync(
+        "GET",
+        "/getTripsAllDays",
         params={"plate": plate},
     )
     resp.raise_for_status()
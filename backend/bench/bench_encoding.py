@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tool response size and encode time per encoding mode
+Encodes synthetic payloads shaped like each MCP tool's result with every
+mode in mcp_common.encoding (pretty / compact / table)
+
+    python bench_encoding.py --days 90 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mcp_common.encoding import ENCODING_MODES, encode_response, orjson  # noqa: E402
+from stub_greycat import (  # noqa: E402
+    DEFAULT_DAY, history_days, make_degradation_row, make_hourly_grid,
+    make_hourly_quality, make_hourly_zones, make_site_details, make_sites, make_trips,
+)
+
+
+def build_payloads(n_sites: int, n_days: int) -> dict:
+    """One representative result per tool"""
+    sites = make_sites(n_sites)
+    days = history_days(n_days)
+    site = make_site_details(sites[0], DEFAULT_DAY)
+    site["hourly_quality"] = make_hourly_quality(site["siteId"], days)
+    site["hourly_grid"] = make_hourly_grid(site["siteId"], days)
+    site["hourly_zones"] = make_hourly_zones(site["siteId"], days)
+    iso_day = DEFAULT_DAY.replace("_", "-")
+
+    return {
+        "list_all_sites": sites,
+        "get_site_details": site,
+        "get_trip_patterns": {
+            "day": iso_day, "offset": 0, "limit": 200, "total": 200, "next_offset": None,
+            "trips": make_trips(sites, iso_day, 200),
+        },
+        "find_degraded_sites": {
+            "day": DEFAULT_DAY, "threshold": 0,
+            "sites": [make_degradation_row(s, DEFAULT_DAY) for s in sites],
+        },
+        "get_site_hourly_performance": {
+            "site_id": site["siteId"], "day": DEFAULT_DAY,
+            "hourly_performance": [h for h in site["hourly_quality"] if h["day"] == DEFAULT_DAY],
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sites", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = build_payloads(args.sites, args.days)
+    print(f"orjson: {'yes' if orjson is not None else 'no'}; {args.sites} sites, {args.days} days of site history")
+    print(f"{'tool':<30}{'mode':<10}{'bytes':>14}{'vs pretty':>11}{'encode ms':>12}")
+
+    for tool, payload in payloads.items():
+        baseline = None
+        for mode in ENCODING_MODES:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                text = encode_response(payload, mode)
+                best = min(best, time.perf_counter() - start)
+            size = len(text.encode("utf-8"))
+            baseline = baseline or size
+            print(f"{tool:<30}{mode:<10}{size:>14,}{size / baseline:>10.0%}{best * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial get_site_details loop vs GreycatClient.fan_out
+Runs against the local stub Greycat server (no live Greycat needed)
+
+    python bench_fanout.py --sites 1000 --latency-ms 20 --concurrency 1 8 16 32
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mcp_common.greycat import GREYCAT_NAMESPACE, GreycatClient  # noqa: E402
+from mcp_common.transport import GreycatTransport, TransportConfig  # noqa: E402
+from stub_greycat import StubServer, create_app  # noqa: E402
+
+
+def new_client(base_url: str, concurrency: int = 1) -> GreycatClient:
+    """Client on its own transport so connection counts are per run"""
+    transport = GreycatTransport(TransportConfig.from_env(base_url=base_url))
+    return GreycatClient(base_url, GREYCAT_NAMESPACE, max_concurrency=concurrency, transport=transport)
+
+
+async def run_serial(base_url: str, site_ids: list[str]) -> tuple[float, int, int]:
+    client = new_client(base_url)
+    start = time.perf_counter()
+    for site_id in site_ids:
+        await client.call_function("get_site_details", [site_id])
+    elapsed = time.perf_counter() - start
+    connections = client.transport.stats()["new_connections"]
+    await client.close()
+    return elapsed, 0, connections
+
+
+async def run_fan_out(base_url: str, site_ids: list[str], concurrency: int) -> tuple[float, int, int]:
+    client = new_client(base_url, concurrency)
+    start = time.perf_counter()
+    _, failures = await client.fan_out("get_site_details", [[s] for s in site_ids])
+    elapsed = time.perf_counter() - start
+    connections = client.transport.stats()["new_connections"]
+    await client.close()
+    return elapsed, len(failures), connections
+
+
+async def bench(base_url: str, n_sites: int, concurrencies: list[int], skip_serial: bool):
+    site_ids = [f"RUHSM{i:03d}" for i in range(n_sites)]
+
+    print(f"{'mode':<20}{'seconds':>10}{'calls/s':>12}{'failed':>8}{'new conns':>11}")
+    runs = [] if skip_serial else [("serial", run_serial(base_url, site_ids))]
+    runs += [(f"fan_out c={c}", run_fan_out(base_url, site_ids, c)) for c in concurrencies]
+    for label, run in runs:
+        elapsed, failed, connections = await run
+        print(f"{label:<20}{elapsed:>10.2f}{n_sites / elapsed:>12.0f}{failed:>8}{connections:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sites", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 16, 32, 64])
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--skip-serial", action="store_true")
+    args = parser.parse_args()
+
+    with StubServer(create_app(args.sites, args.latency_ms), port=args.port) as stub:
+        print(f"Stub Greycat at {stub.base_url}: {args.sites} sites, {args.latency_ms} ms latency")
+        asyncio.run(bench(stub.base_url, args.sites, args.concurrency, args.skip_serial))
+
+
+if __name__ == "__main__":
+    main()
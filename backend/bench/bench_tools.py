@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Benchmark: every MCP tool of both servers against the stub Greycat server
+Reports p50/p95/p99 latency, throughput and peak RSS per tool
+
+Each server (server/mcp_server.py, mcp_agent/mcp_server_http.py) is loaded
+in its own child process pointed at the stub, and its call_tool() is driven
+directly, so the numbers cover the tool code, the Greycat client and the
+response encoding but not the MCP transport. The response cache is off
+unless --with-cache is given. Peak RSS is the child's, after each tool.
+
+    python bench_tools.py --sites 2000 --history-days 14 --trips 5000 \
+        --latency-ms 20 --calls 200 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from stub_greycat import (  # noqa: E402
+    DEFAULT_DAY, DEFAULT_HISTORY_DAYS, DEFAULT_LATENCY_MS, DEFAULT_N_SITES,
+    DEFAULT_TRIPS_PER_DAY, StubServer, create_app, history_days, make_sites, make_trips,
+)
+
+SERVERS = {
+    "stdio": "server/mcp_server.py",
+    "http": "mcp_agent/mcp_server_http.py",
+}
+
+
+def tool_cases(n_sites: int, day: str, n_history_days: int, trips_per_day: int) -> dict:
+    """Tool name -> function of the call index returning the tool arguments"""
+    sites = make_sites(n_sites)
+    site_ids = [s["siteId"] for s in sites]
+    days = history_days(n_history_days, day)
+    iso = day.replace("_", "-")
+    plates = sorted({t["plate_number"] for t in make_trips(sites, iso, min(trips_per_day, 500))})
+    streets = sorted({s["name_en"] for s in sites})
+
+    def site(i: int) -> str:
+        return site_ids[i % len(site_ids)]
+
+    return {
+        "list_all_sites": lambda i: {},
+        "get_site_details": lambda i: {"site_id": site(i)},
+        "get_vehicle_details": lambda i: {"plate_number": plates[i % len(plates)]},
+        "get_trip_patterns": lambda i: {"day": iso, "offset": (i * 50) % max(trips_per_day, 1), "limit": 50},
+        "get_city_profile": lambda i: {"day": days[i % len(days)]},
+        "debug_site": lambda i: {"site_id": site(i)},
+        "analyze_vehicle_trip": lambda i: {"plate_number": plates[i % len(plates)], "day": iso},
+        "compare_sites_on_street": lambda i: {"street_name": streets[i % len(streets)], "day": day},
+        "find_degraded_sites": lambda i: {"day": day, "threshold": 50},
+        "get_site_hourly_performance": lambda i: {"site_id": site(i), "day": days[i % len(days)]},
+        "sites_near": lambda i: {"lat": 24.6 + (i % 50) * 0.01, "lon": 46.7, "radius_m": 2000},
+        "sites_in_bbox": lambda i: {"min_lat": 24.6, "min_lon": 46.6, "max_lat": 24.8, "max_lon": 46.8},
+        "sites_along_corridor": lambda i: {"points": [[24.6, 46.6], [24.9, 46.9]], "width_m": 500},
+        "get_sites_day_status_batch": lambda i: {
+            "site_ids": [site(i + k) for k in range(20)], "day_from": days[0], "day_to": days[-1]},
+        "get_city_profile_range": lambda i: {"day_from": days[0], "day_to": days[-1]},
+        "get_health_trend": lambda i: {"site_id": site(i), "granularity": ("daily", "weekly")[i % 2]},
+        "get_cache_stats": lambda i: {},
+    }
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def is_error(content) -> bool:
+    """Tool errors come back as an encoded {"error": ...} object"""
+    try:
+        value = json.loads(content[0].text)
+    except (ValueError, IndexError, AttributeError):
+        return False
+    return isinstance(value, dict) and "error" in value
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def bench_tool(call_tool, name: str, args_for, n_calls: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            content = await call_tool(name, args_for(i))
+            latencies.append(time.perf_counter() - start)
+            if is_error(content):
+                errors += 1
+
+    # One untimed call so first-use setup (site cache warm-up) is not in the percentiles
+    await call_tool(name, args_for(0))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_calls)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "tool": name,
+        "calls": n_calls,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "calls_per_sec": n_calls / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def load_server(server: str):
+    """Import a server file as a module of its own (both define `app`)"""
+    path = os.path.join(BACKEND_DIR, SERVERS[server])
+    spec = importlib.util.spec_from_file_location(f"bench_{server}_server", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def run_child(args) -> list[dict]:
+    module = load_server(args.child)
+    cases = tool_cases(args.sites, args.day, args.history_days, args.trips)
+    tools = args.tools or list(cases)
+    results = []
+    for name in tools:
+        results.append(await bench_tool(module.call_tool, name, cases[name], args.calls, args.concurrency))
+    await module.greycat.close()
+    return results
+
+
+def run_server(server: str, base_url: str, args) -> list[dict]:
+    env = dict(os.environ, GREYCAT_BASE_URL=base_url, GREYCAT_BACKEND="greycat")
+    if not args.with_cache:
+        env["MCP_CACHE_MAX_BYTES"] = "0"
+        env.pop("MCP_CACHE_DISK_PATH", None)
+
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", server,
+           "--sites", str(args.sites), "--day", args.day,
+           "--history-days", str(args.history_days), "--trips", str(args.trips),
+           "--calls", str(args.calls), "--concurrency", str(args.concurrency)]
+    if args.tools:
+        cmd += ["--tools", *args.tools]
+
+    proc = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{server} benchmark exited with {proc.returncode}")
+    return json.loads(proc.stdout)
+
+
+def print_table(server: str, results: list[dict]):
+    print(f"\n{server} ({SERVERS[server]})")
+    print(f"{'tool':<30}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'calls/s':>10}{'errors':>8}{'rss MB':>9}")
+    for r in results:
+        print(f"{r['tool']:<30}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              f"{r['calls_per_sec']:>10.0f}{r['errors']:>8}{r['peak_rss_mb']:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sites", type=int, default=DEFAULT_N_SITES)
+    parser.add_argument("--day", default=DEFAULT_DAY, help="last day of the stub history, YYYY_MM_DD")
+    parser.add_argument("--history-days", type=int, default=DEFAULT_HISTORY_DAYS)
+    parser.add_argument("--trips", type=int, default=DEFAULT_TRIPS_PER_DAY, help="trips per day")
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--calls", type=int, default=100, help="timed calls per tool")
+    parser.add_argument("--concurrency", type=int, default=8, help="calls in flight per tool")
+    parser.add_argument("--servers", nargs="+", choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument("--tools", nargs="+", help="only these tools (default: all)")
+    parser.add_argument("--with-cache", action="store_true", help="keep the response cache on")
+    parser.add_argument("--port", type=int, default=8099, help="stub server port")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--child", choices=list(SERVERS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        json.dump(asyncio.run(run_child(args)), sys.stdout)
+        return
+
+    app = create_app(args.sites, args.latency_ms, args.day, args.history_days,
+                     args.trips, args.jitter_ms)
+    report = {}
+    with StubServer(app, port=args.port) as stub:
+        for server in args.servers:
+            report[server] = run_server(server, stub.base_url, args)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"{args.sites} sites, {args.history_days} days, {args.trips} trips/day, "
+          f"{args.latency_ms} ms (+{args.jitter_ms} jitter) Greycat latency, "
+          f"{args.calls} calls per tool at concurrency {args.concurrency}, "
+          f"cache {'on' if args.with_cache else 'off'}")
+    for server, results in report.items():
+        print_table(server, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""
+Stub Greycat server for benchmarking the MCP servers without a live Greycat
+
+Serves the site_queries::* functions the MCP tools call (sites and their
+hourly history, vehicle counts, degradation ranking, trips and trip pages,
+vehicles, city profiles, health rollups, debug counters) for synthetic data
+at a configurable scale (sites, history days, trips per day), with
+injected latency and jitter. Generated data is deterministic per site/day.
+
+    python stub_greycat.py --sites 2000 --history-days 14 --trips 5000 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+try:
+    import uvicorn  # only needed to serve over HTTP (StubServer, __main__)
+except ImportError:
+    uvicorn = None
+
+DEFAULT_N_SITES = 1000
+DEFAULT_LATENCY_MS = 20.0
+DEFAULT_DAY = "2025_08_10"
+DEFAULT_HISTORY_DAYS = 7
+DEFAULT_TRIPS_PER_DAY = 2000
+
+# Distinct hourly histories; sites share them by index, so a full Site node is
+# an encoded template with the site id substituted (no per-call generation)
+HISTORY_VARIANTS = 16
+SITE_PLACEHOLDER = "__SITE__"
+
+EMPTY_SITE_ARRAYS = (
+    "hourly_grid", "hourly_quality", "hourly_zones", "ws_grid_daily", "ws_zones_daily",
+    "peaks_daily", "hourly_veh_stats", "vehicle_counts_total", "vehicle_counts_by_type",
+)
+
+
+def make_sites(n_sites: int) -> list[dict]:
+    """Synthetic SiteView rows"""
+    return [
+        {
+            "siteId": f"RUHSM{i:03d}",
+            "lat": 24.6 + (i % 50) * 0.01,
+            "lon": 46.6 + (i // 50) * 0.01,
+            "numberOfLanes": float(2 + i % 4),
+            "direction": "N" if i % 2 else "S",
+            "name_ar": f"شارع {i % 40}",
+            "name_en": f"Street {i % 40}",
+        }
+        for i in range(n_sites)
+    ]
+
+
+def history_days(n_days: int, last_day: str = DEFAULT_DAY) -> list[str]:
+    """The n_days days ending at last_day, as YYYY_MM_DD"""
+    end = date(*(int(p) for p in last_day.split("_")))
+    return [(end - timedelta(days=n_days - 1 - i)).strftime("%Y_%m_%d") for i in range(n_days)]
+
+
+def make_hourly_quality(site_id: str, days: list[str], seed: int = 0) -> list[dict]:
+    """Synthetic HourlyQuality rows, 24 per day"""
+    rng = random.Random(f"{site_id}-q-{seed}")
+    rows = []
+    for day in days:
+        iso = day.replace("_", "-")
+        for hour in range(24):
+            frames = rng.randint(200, 2000)
+            good = int(frames * rng.uniform(0.55, 0.98))
+            rows.append({
+                "site": site_id, "city": "Riyadh", "day": day, "date_d": iso,
+                "ts_hour": f"{iso} {hour:02d}:00:00", "hour": hour,
+                "frames": frames, "good_frames": good, "bad_frames": frames - good,
+                "pct_good": round(good / frames, 4), "threshold_q": 0.5,
+                "dawn": hour in (5, 6), "dusk": hour in (18, 19),
+                "is_night": hour < 5 or hour > 19,
+            })
+    return rows
+
+
+def make_hourly_grid(site_id: str, days: list[str], seed: int = 0) -> list[dict]:
+    """Synthetic HourlyGridSummary rows (3x4 grid), 24 per day"""
+    rng = random.Random(f"{site_id}-g-{seed}")
+    rows = []
+    for day in days:
+        iso = day.replace("_", "-")
+        for hour in range(24):
+            frames = rng.randint(200, 2000)
+            good = int(frames * rng.uniform(0.55, 0.98))
+            dead = rng.choice((0, 0, 0, 1, 2))
+            good_cells = rng.randint(6, 12 - dead)
+            rows.append({
+                "site": site_id, "day": day, "ts_hour": f"{iso} {hour:02d}:00:00",
+                "hour_str": f"{hour:02d}",
+                "total_frames": frames, "total_good": good, "total_bad": frames - good,
+                "active_cells": 12 - dead, "good_cells": good_cells,
+                "bad_cells": 12 - dead - good_cells, "dead_cells": dead,
+                "pct_good_all": round(good / frames, 4),
+                "pct_good_cells": round(good_cells / 12, 4),
+            })
+    return rows
+
+
+def make_hourly_zones(site_id: str, days: list[str], seed: int = 0) -> list[dict]:
+    """Synthetic HourlyZoneStat rows, 12 zones x 24 hours per day"""
+    rng = random.Random(f"{site_id}-z-{seed}")
+    rows = []
+    for day in days:
+        iso = day.replace("_", "-")
+        for hour in range(24):
+            for zone_row in range(3):
+                for zone_col in range(4):
+                    frames = rng.randint(0, 200)
+                    good = int(frames * rng.uniform(0.4, 1.0))
+                    pct = round(good / frames, 4) if frames else 0.0
+                    rows.append({
+                        "site": site_id, "day": day, "ts_hour": f"{iso} {hour:02d}:00:00",
+                        "hour_str": f"{hour:02d}", "zone_raw": f"r{zone_row}c{zone_col}",
+                        "zone_row": zone_row, "zone_col": zone_col,
+                        "frames": frames, "good_frames": good, "bad_frames": frames - good,
+                        "pct_good": pct, "color": "green" if pct >= 0.5 else "red",
+                        "active": frames > 0, "good_cell": frames > 0 and pct >= 0.5,
+                        "bad_cell": frames > 0 and pct < 0.5, "dead_cell": frames == 0,
+                        "threshold_q": 0.5,
+                    })
+    return rows
+
+
+def make_trips(sites: list[dict], day: str, n_trips: int, seed: int = 0) -> list[dict]:
+    """Synthetic Trip rows (with steps) for a YYYY-MM-DD day"""
+    rng = random.Random(f"trips-{day}-{seed}")
+    labels = ("ok", "site_issue", "car_issue", "mixed")
+    trips = []
+    for t in range(n_trips):
+        plate = f"{1000 + t % 5000}{'ABCDEFGH'[t % 8]}VR"
+        hour = rng.randint(0, 23)
+        route = rng.sample(sites, k=min(len(sites), rng.randint(1, 5)))
+        route_sig = ">".join(s["siteId"] for s in route)
+        qualities = [round(rng.uniform(0.1, 1.0), 3) for _ in route]
+        trips.append({
+            "plate_number": plate,
+            "window30": f"{day} {hour:02d}:{rng.choice(('00', '30'))}",
+            "frames_in_trip": len(route),
+            "min_quality": min(qualities), "max_quality": max(qualities),
+            "hour": hour, "site_list": ",".join(s["siteId"] for s in route),
+            "route_sig_str": route_sig, "n_sites": len(route),
+            "route_n_cars": rng.randint(1, 50),
+            "degrade_site_strict": rng.random() < 0.1,
+            "site_issue_strict": rng.random() < 0.1,
+            "car_issue_singleton_extreme": rng.random() < 0.05,
+            "issue_label": rng.choice(labels),
+            "steps": [{
+                "plate_number": plate, "site": s["siteId"],
+                "ts": f"{day} {hour:02d}:{pos * 5:02d}:00", "hour": hour, "pos": pos,
+                "img_quality": q, "img_name": f"{s['siteId']}_{plate}_{pos}.jpg",
+                "leg_id": 0, "vehicle_type": rng.randint(1, 4),
+            } for pos, (s, q) in enumerate(zip(route, qualities))],
+        })
+    return trips
+
+
+def make_site_details(site: dict, day: str) -> dict:
+    """Synthetic Site node with one vehicle_counts_total row for `day`"""
+    index = int(site["siteId"][5:])
+    unique = 500 + index % 300
+    degraded = (index * 37) % unique
+    return {
+        **site,
+        **{k: [] for k in EMPTY_SITE_ARRAYS},
+        "vehicle_counts_total": [{
+            "day": day,
+            "site": site["siteId"],
+            "unique_vehicles": unique,
+            "always_degraded_vehicles": degraded,
+            "not_always_degraded_vehicles": unique - degraded,
+        }],
+    }
+
+
+def make_degradation_row(site: dict, day: str) -> dict:
+    """Synthetic SiteDegradationView row derived from the site's counts"""
+    counts = [c for c in make_site_details(site, day)["vehicle_counts_total"] if c["day"] == day]
+    total = sum(c["unique_vehicles"] for c in counts)
+    degraded = sum(c["always_degraded_vehicles"] for c in counts)
+    return {
+        **site,
+        "unique_vehicles": total,
+        "always_degraded_vehicles": degraded,
+        "degradation_rate": degraded * 100.0 / total if total > 0 else None,
+    }
+
+
+def make_city_profile(n_sites: int, day: str) -> dict:
+    """Synthetic CityProfile for `day` (overall plus four vehicle types)"""
+    rng = random.Random(f"city-{day}")
+
+    def stats(scale: float) -> dict:
+        total = int(n_sites * 5000 * scale * rng.uniform(0.8, 1.2))
+        good = int(total * rng.uniform(0.7, 0.95))
+        cars = int(total / 6)
+        degraded = int(cars * rng.uniform(0.05, 0.2))
+        return {
+            "detections_total_all_days": total,
+            "detections_good_all_days": good,
+            "detections_missed_all_days": total - good,
+            "elapsed_days": 1,
+            "n_sites_total": n_sites,
+            "unique_cars_all_days": cars,
+            "total_unique_cars": cars,
+            "cars_any_degraded": degraded,
+            "cars_no_degrade": cars - degraded,
+            "cars_all_sites_degraded": degraded // 4,
+            "pct_good_all_days": round(100.0 * good / total, 2) if total else 0.0,
+            "pct_missed_all_days": round(100.0 * (total - good) / total, 2) if total else 0.0,
+            "threshold_good": 0.5,
+        }
+
+    return {
+        "day": day,
+        "overall": stats(1.0),
+        "by_vehicle_type": [{"vehicle_type": t, **stats(0.25)} for t in range(1, 5)],
+    }
+
+
+def iso_day(day: str) -> str:
+    return day.replace("_", "-")
+
+
+def make_counts_by_type(site: dict, day: str) -> list[dict]:
+    """Synthetic SiteCountsByVehicleType rows splitting the site's day counts over 4 types"""
+    total = make_site_details(site, day)["vehicle_counts_total"][0]
+    rows = []
+    for vehicle_type, share in zip(range(1, 5), (0.55, 0.25, 0.15, 0.05)):
+        unique = int(total["unique_vehicles"] * share)
+        degraded = int(total["always_degraded_vehicles"] * share)
+        rows.append({
+            "day": day, "site": site["siteId"], "vehicle_type": vehicle_type,
+            "unique_vehicles": unique, "always_degraded_vehicles": degraded,
+            "not_always_degraded_vehicles": unique - degraded,
+        })
+    return rows
+
+
+def make_vehicle_stats(site_id: str, day: str) -> list[dict]:
+    """Synthetic HourlyZoneStatVeh rows, 4 vehicle types x 24 hours"""
+    rng = random.Random(f"{site_id}-v-{day}")
+    rows = []
+    for vehicle_type in range(1, 5):
+        for hour in range(24):
+            frames = rng.randint(10, 500)
+            good = int(frames * rng.uniform(0.5, 0.98))
+            rows.append({
+                "site": site_id, "day": day, "vehicle_type": vehicle_type, "metric": "q",
+                "ts_hour": f"{iso_day(day)} {hour:02d}:00:00", "hour": hour,
+                "frames": frames, "good_frames": good, "bad_frames": frames - good,
+                "pct_good": round(good / frames, 4), "threshold_q": 0.5,
+            })
+    return rows
+
+
+def make_day_rollup(site_id: str, day: str) -> dict:
+    """SiteDayRollup computed from the synthetic hourly rows of the day"""
+    quality = make_hourly_quality(site_id, [day])
+    grid = make_hourly_grid(site_id, [day])
+    frames = sum(r["frames"] for r in quality)
+    good = sum(r["good_frames"] for r in quality)
+    dead = sum(r["dead_cells"] for r in grid)
+    return {
+        "siteId": site_id, "day": day,
+        "quality_hours": len(quality), "frames": frames, "good_frames": good,
+        "bad_frames": frames - good, "pct_good": good / frames if frames else None,
+        "grid_hours": len(grid), "dead_cells": dead,
+        "max_dead_cells": max((r["dead_cells"] for r in grid), default=0),
+        "avg_dead_cells": dead / len(grid) if grid else None,
+    }
+
+
+def make_site_rollups(site_id: str, days: list[str]) -> dict:
+    """SiteRollupView: one daily rollup per day (import day format) and their weekly (Monday) sums"""
+    daily = [make_day_rollup(site_id, day) for day in days]
+    weekly: dict[str, dict] = {}
+    for r in daily:
+        d = date.fromisoformat(iso_day(r["day"]))
+        week = (d - timedelta(days=d.weekday())).isoformat()
+        w = weekly.setdefault(week, {
+            "siteId": site_id, "week": week, "days": 0, "quality_hours": 0, "frames": 0,
+            "good_frames": 0, "bad_frames": 0, "grid_hours": 0, "dead_cells": 0,
+        })
+        w["days"] += 1
+        for key in ("quality_hours", "frames", "good_frames", "bad_frames", "grid_hours", "dead_cells"):
+            w[key] += r[key]
+    for w in weekly.values():
+        w["pct_good"] = w["good_frames"] / w["frames"] if w["frames"] else None
+        w["avg_dead_cells"] = w["dead_cells"] / w["grid_hours"] if w["grid_hours"] else None
+    return {"siteId": site_id, "daily": daily, "weekly": list(weekly.values())}
+
+
+def make_vehicle(plate_number: str, days: list[str]) -> dict:
+    """Synthetic Vehicle with one daily quality row per day"""
+    rng = random.Random(f"vehicle-{plate_number}")
+    return {
+        "plate_number": plate_number,
+        "vehicle_type": rng.randint(1, 4),
+        "vehicle_label": rng.choice(("car", "bus", "truck", "van")),
+        "first_day": iso_day(days[0]),
+        "daily_quality": [{
+            "day": iso_day(day),
+            "cum_min_q": round(rng.uniform(0.1, 0.6), 3),
+            "cum_max_q": round(rng.uniform(0.6, 1.0), 3),
+            "cum_n_frames": rng.randint(1, 200),
+        } for day in days],
+    }
+
+
+def make_site_debug(site: Optional[dict], site_id: str, n_days: int) -> dict:
+    """SiteDebug counters for the synthetic history (-1 for unknown sites)"""
+    per_day = {"hourly_grid": 24, "hourly_quality": 24, "hourly_zones": 288,
+               "ws_grid_daily": 0, "ws_zones_daily": 0, "peaks_daily": 0,
+               "hourly_veh_stats": 96, "vehicle_counts_total": 1, "vehicle_counts_by_type": 4}
+    return {
+        "siteId": site_id,
+        **{f"{k}_count": (n * n_days if site is not None else -1) for k, n in per_day.items()},
+    }
+
+
+def trip_page(trips: list[dict], day: str, offset: int, limit: int, hour=None,
+              issue_label=None, n_sites=None) -> dict:
+    """TripPage over the day's trips, same filters and limit cap as the Greycat query"""
+    start = max(offset, 0)
+    size = limit if 0 < limit <= 1000 else 1000
+    matching = [t for t in trips
+                if (hour is None or t["hour"] == hour)
+                and (issue_label is None or t["issue_label"] == issue_label)
+                and (n_sites is None or t["n_sites"] == n_sites)]
+    page = matching[start:start + size]
+    end = start + len(page)
+    return {
+        "day": day, "offset": start, "limit": size, "total": len(matching),
+        "next_offset": end if end < len(matching) else None, "trips": page,
+    }
+
+
+def create_app(n_sites: int = DEFAULT_N_SITES,
+               latency_ms: float = DEFAULT_LATENCY_MS,
+               day: str = DEFAULT_DAY,
+               n_history_days: int = DEFAULT_HISTORY_DAYS,
+               trips_per_day: int = DEFAULT_TRIPS_PER_DAY,
+               jitter_ms: float = 0.0) -> Starlette:
+    """
+    Build the stub app serving `site_queries::<function>` POST routes.
+    Serve it with StubServer, or in-process through httpx.ASGITransport.
+
+    Sites have `n_history_days` days of hourly data ending at `day`; every
+    day has `trips_per_day` trips. Each call sleeps latency_ms plus up to
+    jitter_ms.
+    """
+    sites = make_sites(n_sites)
+    sites_by_id = {s["siteId"]: s for s in sites}
+    details = {s["siteId"]: make_site_details(s, day) for s in sites}
+    days = history_days(n_history_days, day) if n_history_days > 0 else [day]
+
+    @lru_cache(maxsize=HISTORY_VARIANTS)
+    def history_template(variant: int) -> bytes:
+        """Encoded hourly arrays (without braces) for SITE_PLACEHOLDER"""
+        arrays = {
+            "hourly_quality": make_hourly_quality(SITE_PLACEHOLDER, days, variant),
+            "hourly_grid": make_hourly_grid(SITE_PLACEHOLDER, days, variant),
+            "hourly_zones": make_hourly_zones(SITE_PLACEHOLDER, days, variant),
+        }
+        return json.dumps(arrays).encode()[1:-1]
+
+    def site_history(site_id: str) -> bytes:
+        """Encoded Site node with hourly quality/grid/zones and counts for every day"""
+        site = sites_by_id[site_id]
+        head = {
+            **site,
+            **{k: [] for k in EMPTY_SITE_ARRAYS if not k.startswith("hourly_") or k == "hourly_veh_stats"},
+            "vehicle_counts_total": [
+                row for d in days for row in make_site_details(site, d)["vehicle_counts_total"]
+            ],
+            "vehicle_counts_by_type": [row for d in days for row in make_counts_by_type(site, d)],
+        }
+        arrays = history_template(int(site_id[5:]) % HISTORY_VARIANTS)
+        return (json.dumps(head).encode()[:-1] + b", "
+                + arrays.replace(SITE_PLACEHOLDER.encode(), site_id.encode()) + b"}")
+
+    @lru_cache(maxsize=8)
+    def trips_for_day(trip_day: str) -> tuple[list[dict], dict, dict]:
+        """(trips, trips by plate, patterns by id) for a YYYY-MM-DD day"""
+        trips = make_trips(sites, trip_day, trips_per_day)
+        by_plate: dict[str, list[dict]] = {}
+        patterns: dict[str, dict] = {}
+        for trip in trips:
+            by_plate.setdefault(trip["plate_number"], []).append(trip)
+            pattern_id = f"{trip_day}|{trip['route_sig_str']}"
+            pattern = patterns.setdefault(pattern_id, {
+                "pattern_id": pattern_id, "day": trip_day,
+                "route_sig_str": trip["route_sig_str"], "trips": [],
+            })
+            pattern["trips"].append(trip)
+        return trips, by_plate, patterns
+
+    def empty_site(site_id: str) -> dict:
+        # Greycat returns an empty Site for unknown ids
+        return {"siteId": site_id, **{k: [] for k in EMPTY_SITE_ARRAYS}}
+
+    def site_day(site_id: str, site_day_str: str) -> dict:
+        """SiteDay node; empty arrays for an unknown site or a day outside the history"""
+        out = {"siteId": site_id, "day": site_day_str, **{k: [] for k in EMPTY_SITE_ARRAYS}}
+        site = sites_by_id.get(site_id)
+        if site is None or site_day_str not in days:
+            return out
+        variant = int(site_id[5:]) % HISTORY_VARIANTS
+        out.update(
+            hourly_quality=make_hourly_quality(site_id, [site_day_str], variant),
+            hourly_grid=make_hourly_grid(site_id, [site_day_str], variant),
+            hourly_zones=make_hourly_zones(site_id, [site_day_str], variant),
+            vehicle_counts_total=counts(site_id, site_day_str),
+            vehicle_counts_by_type=make_counts_by_type(site, site_day_str),
+        )
+        return out
+
+    def counts(site_id: str, count_day: str) -> list[dict]:
+        site = sites_by_id.get(site_id)
+        if site is None:
+            return []
+        if count_day == day:
+            return details[site_id]["vehicle_counts_total"]
+        return make_site_details(site, count_day)["vehicle_counts_total"]
+
+    functions = {
+        "list_sites": lambda: sites,
+        "get_site_details": lambda site_id: (
+            site_history(site_id) if site_id in sites_by_id else empty_site(site_id)),
+        "get_site_day": site_day,
+        "get_site_vehicle_counts_total": counts,
+        "get_site_vehicle_counts_by_type": lambda site_id, count_day: (
+            make_counts_by_type(sites_by_id[site_id], count_day) if site_id in sites_by_id else []),
+        "get_site_degradation_for_day": lambda deg_day: [make_degradation_row(s, deg_day) for s in sites],
+        "get_city_profile": lambda profile_day: make_city_profile(n_sites, profile_day),
+        "get_city_overall_stats": lambda profile_day: make_city_profile(n_sites, profile_day)["overall"],
+        "get_city_stats_by_vehicle_type": lambda profile_day: (
+            make_city_profile(n_sites, profile_day)["by_vehicle_type"]),
+        "get_vehicle_stats": lambda site_id, stat_day, vehicle_type: [
+            r for r in make_vehicle_stats(site_id, stat_day) if r["vehicle_type"] == vehicle_type],
+        "get_vehicle_types_for_site": lambda site_id, stat_day: [1, 2, 3, 4],
+        "get_vehicle_details": lambda plate: make_vehicle(plate, days),
+        "get_trip_patterns_for_day": lambda trip_day: list(trips_for_day(iso_day(trip_day))[2].values()),
+        "get_trip_patterns_for_day_page": lambda trip_day, offset, limit, hour, issue_label, n_sites_filter: (
+            trip_page(trips_for_day(iso_day(trip_day))[0], trip_day, offset, limit,
+                      hour, issue_label, n_sites_filter)),
+        "get_trips_for_plate": lambda plate, trip_day: trips_for_day(iso_day(trip_day))[1].get(plate, []),
+        "get_trips_for_pattern": lambda pattern_id: (
+            trips_for_day(pattern_id.split("|", 1)[0])[2].get(pattern_id, {}).get("trips", [])),
+        "get_site_rollups": lambda site_id: (
+            make_site_rollups(site_id, days) if site_id in sites_by_id
+            else {"siteId": site_id, "daily": [], "weekly": []}),
+        "get_city_rollups": lambda: city_rollups(),
+        "debug_site": lambda site_id: make_site_debug(sites_by_id.get(site_id), site_id, len(days)),
+    }
+
+    @lru_cache(maxsize=1)
+    def city_rollups() -> list[dict]:
+        out = []
+        for rollup_day in days:
+            rows = [make_day_rollup(s["siteId"], rollup_day) for s in sites[:50]]
+            frames = sum(r["frames"] for r in rows)
+            good = sum(r["good_frames"] for r in rows)
+            grid_hours = sum(r["grid_hours"] for r in rows)
+            dead = sum(r["dead_cells"] for r in rows)
+            out.append({
+                "day": rollup_day, "sites": len(rows),
+                "quality_hours": sum(r["quality_hours"] for r in rows),
+                "frames": frames, "good_frames": good, "bad_frames": frames - good,
+                "pct_good": good / frames if frames else None,
+                "grid_hours": grid_hours, "dead_cells": dead,
+                "avg_dead_cells": dead / grid_hours if grid_hours else None,
+            })
+        return out
+
+    async def handle(request: Request):
+        function = request.path_params["function"]
+        params = await request.json()
+        delay = latency_ms + (random.uniform(0, jitter_ms) if jitter_ms else 0.0)
+        await asyncio.sleep(delay / 1000.0)
+
+        handler = functions.get(function)
+        if handler is None:
+            return JSONResponse({"error": f"Unknown function: {function}"}, status_code=404)
+        try:
+            result = handler(*params)
+        except TypeError as e:
+            return JSONResponse({"error": f"{function}: {e}"}, status_code=400)
+        if isinstance(result, bytes):
+            return Response(result, media_type="application/json")
+        return JSONResponse(result)
+
+    return Starlette(routes=[
+        Route("/site_queries::{function}", endpoint=handle, methods=["POST"]),
+    ])
+
+
+class StubServer:
+    """Run the stub app with uvicorn on a background thread"""
+
+    def __init__(self, app: Starlette, host: str = "127.0.0.1", port: int = 8099):
+        if uvicorn is None:
+            raise RuntimeError("StubServer needs uvicorn (pip install uvicorn)")
+        self.base_url = f"http://{host}:{port}"
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sites", type=int, default=DEFAULT_N_SITES)
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--day", default=DEFAULT_DAY, help="last day of the history, YYYY_MM_DD")
+    parser.add_argument("--history-days", type=int, default=DEFAULT_HISTORY_DAYS)
+    parser.add_argument("--trips", type=int, default=DEFAULT_TRIPS_PER_DAY, help="trips per day")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    app = create_app(args.sites, args.latency_ms, args.day, args.history_days,
+                     args.trips, args.jitter_ms)
+    uvicorn.run(app, host="0.0.0.0", port=args.port)
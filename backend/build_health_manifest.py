@@ -0,0 +1,59 @@
+"""
+Write the site-day manifest for bulk_import_health (edi/bulk_importer.gcl)
+
+Walks ROOT/<siteId>/DAY_VIEW/<day> and writes one "siteId,day" line per
+day folder that has files, optionally limited to a day range or to some
+sites.
+
+  python build_health_manifest.py data/organized_site_data/organized_site_data \
+      --from 2025-08-01 --to 2025-08-31 -o data/health_manifest.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+
+def site_days(root: str, day_from: str = None, day_to: str = None, sites: set = None):
+    """(siteId, day) for every non-empty day folder, sorted"""
+    for site in sorted(os.scandir(root), key=lambda e: e.name):
+        if not site.is_dir() or (sites and site.name not in sites):
+            continue
+        day_view = os.path.join(site.path, "DAY_VIEW")
+        if not os.path.isdir(day_view):
+            continue
+        for day in sorted(os.scandir(day_view), key=lambda e: e.name):
+            if not day.is_dir():
+                continue
+            if (day_from and day.name < day_from) or (day_to and day.name > day_to):
+                continue
+            if any(f.is_file() for f in os.scandir(day.path)):
+                yield site.name, day.name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("root", help="folder holding <siteId>/DAY_VIEW/<day>")
+    parser.add_argument("-o", "--output", default="-", help="manifest CSV (default: stdout)")
+    parser.add_argument("--from", dest="day_from", help="first day, same format as the folders")
+    parser.add_argument("--to", dest="day_to", help="last day, same format as the folders")
+    parser.add_argument("--site", dest="sites", action="append", help="only this site (repeatable)")
+    args = parser.parse_args()
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        writer = csv.writer(out)
+        writer.writerow(["siteId", "day"])
+        n = 0
+        for row in site_days(args.root, args.day_from, args.day_to, set(args.sites or ())):
+            writer.writerow(row)
+            n += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{n} site-days", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
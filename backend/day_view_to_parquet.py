@@ -0,0 +1,213 @@
+"""
+Convert a DAY_VIEW tree (ROOT/<siteId>/DAY_VIEW/<day>/<siteId>_<day>_<type>.csv)
+into typed, zstd-compressed Parquet files
+
+  OUT/<type>/<day>/<siteId>.parquet
+
+Column types follow the Greycat row types in server/src/model/model.gcl
+(SCHEMAS in mcp_common/day_view.py).
+Files are converted in a process pool. OUT/_manifest.json records every
+converted source with its size, mtime and row count, so a re-run only
+converts new or changed CSVs (--force converts everything again).
+
+  python day_view_to_parquet.py data/organized_site_data/organized_site_data \
+      data/day_view_parquet --from 2025-08-01 --to 2025-08-31
+
+read_day_view(OUT, "hourly_grid_summary", days=[...], sites=[...]) loads a
+type back as one Arrow table for offline analysis.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Optional
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from build_health_manifest import site_days
+from mcp_common.day_view import CONVERT_OPTIONS, MANIFEST_NAME, SCHEMAS, csv_path, parquet_path
+
+COMPRESSION = "zstd"
+
+# The large per-hour files; --types all converts every type in SCHEMAS
+DEFAULT_TYPES = ("hourly_grid_summary", "hourly_zone_stats_3x4", "ws_grid_3x4_zones")
+
+
+def output_path(out_root: str, file_type: str, day: str, site_id: str) -> str:
+    return parquet_path(out_root, file_type, day, site_id)
+
+
+def convert_file(src: str, dst: str, file_type: str) -> dict:
+    """CSV -> Parquet with the type's column types (unknown columns are inferred)"""
+    start = time.perf_counter()
+    table = pacsv.read_csv(
+        src,
+        convert_options=pacsv.ConvertOptions(column_types=SCHEMAS[file_type], **CONVERT_OPTIONS)
+    )
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = dst + ".tmp"
+    pq.write_table(table, tmp, compression=COMPRESSION)
+    os.replace(tmp, dst)
+    return {
+        "rows": table.num_rows,
+        "bytes_out": os.path.getsize(dst),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def load_manifest(out_root: str) -> dict:
+    path = os.path.join(out_root, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(out_root: str, manifest: dict):
+    path = os.path.join(out_root, MANIFEST_NAME)
+    os.makedirs(out_root, exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def plan(root: str, out_root: str, pairs: Iterable[tuple[str, str]], types: Iterable[str],
+         manifest: dict, force: bool = False) -> tuple[list[tuple], int, int]:
+    """(jobs, up_to_date, missing): jobs are (key, src, dst, file_type, size, mtime_ns)"""
+    jobs = []
+    up_to_date = missing = 0
+    for site_id, day in pairs:
+        for file_type in types:
+            src = csv_path(root, file_type, day, site_id)
+            try:
+                st = os.stat(src)
+            except FileNotFoundError:
+                missing += 1
+                continue
+            key = os.path.relpath(src, root)
+            dst = output_path(out_root, file_type, day, site_id)
+            entry = manifest.get(key)
+            if (not force and entry and entry["size"] == st.st_size
+                    and entry["mtime_ns"] == st.st_mtime_ns and os.path.exists(dst)):
+                up_to_date += 1
+                continue
+            jobs.append((key, src, dst, file_type, st.st_size, st.st_mtime_ns))
+    return jobs, up_to_date, missing
+
+
+def ingest(root: str, out_root: str, pairs: Iterable[tuple[str, str]],
+           types: Iterable[str] = DEFAULT_TYPES, workers: Optional[int] = None,
+           force: bool = False) -> dict:
+    manifest = load_manifest(out_root)
+    jobs, up_to_date, missing = plan(root, out_root, pairs, list(types), manifest, force)
+
+    start = time.perf_counter()
+    by_type = {}
+    failures = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(convert_file, src, dst, file_type): (key, src, dst, file_type, size, mtime)
+                       for key, src, dst, file_type, size, mtime in jobs}
+            for future in as_completed(futures):
+                key, src, dst, file_type, size, mtime = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failures.append({"file": key, "error": f"{type(e).__name__}: {e}"})
+                    continue
+                manifest[key] = {
+                    "file_type": file_type,
+                    "output": os.path.relpath(dst, out_root),
+                    "size": size,
+                    "mtime_ns": mtime,
+                    "rows": result["rows"],
+                    "bytes_out": result["bytes_out"],
+                }
+                acc = by_type.setdefault(file_type, {"files": 0, "rows": 0, "bytes_in": 0, "bytes_out": 0})
+                acc["files"] += 1
+                acc["rows"] += result["rows"]
+                acc["bytes_in"] += size
+                acc["bytes_out"] += result["bytes_out"]
+    finally:
+        save_manifest(out_root, manifest)
+
+    seconds = time.perf_counter() - start
+    rows = sum(acc["rows"] for acc in by_type.values())
+    return {
+        "converted": sum(acc["files"] for acc in by_type.values()),
+        "up_to_date": up_to_date,
+        "missing": missing,
+        "failed": len(failures),
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(rows / seconds) if seconds and rows else None,
+        "by_type": by_type,
+        "failures": failures,
+    }
+
+
+def read_day_view(out_root: str, file_type: str, days: Optional[Iterable[str]] = None,
+                  sites: Optional[Iterable[str]] = None,
+                  columns: Optional[list[str]] = None) -> pa.Table:
+    """One Arrow table of a converted type, optionally limited to days / sites"""
+    type_root = os.path.join(out_root, file_type)
+    wanted_sites = set(sites) if sites is not None else None
+    day_names = sorted(days) if days is not None else (
+        sorted(os.listdir(type_root)) if os.path.isdir(type_root) else [])
+
+    tables = []
+    for day in day_names:
+        folder = os.path.join(type_root, day)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(".parquet") and (wanted_sites is None or name[:-8] in wanted_sites):
+                tables.append(pq.read_table(os.path.join(folder, name), columns=columns))
+
+    if not tables:
+        schema = SCHEMAS[file_type]
+        names = columns or list(schema)
+        return pa.table({n: pa.array([], type=schema.get(n, pa.string())) for n in names})
+    return pa.concat_tables(tables, promote_options="permissive")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("root", help="folder holding <siteId>/DAY_VIEW/<day>")
+    parser.add_argument("out", help="output folder for the Parquet files and manifest")
+    parser.add_argument("--from", dest="day_from", help="first day, same format as the folders")
+    parser.add_argument("--to", dest="day_to", help="last day, same format as the folders")
+    parser.add_argument("--site", dest="sites", action="append", help="only this site (repeatable)")
+    parser.add_argument("--types", default=",".join(DEFAULT_TYPES),
+                        help=f"comma-separated file types or 'all' (default: {','.join(DEFAULT_TYPES)})")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="convert unchanged files again")
+    args = parser.parse_args()
+
+    types = list(SCHEMAS) if args.types == "all" else [t.strip() for t in args.types.split(",")]
+    unknown = [t for t in types if t not in SCHEMAS]
+    if unknown:
+        parser.error(f"unknown file type(s): {', '.join(unknown)}")
+
+    pairs = site_days(args.root, args.day_from, args.day_to, set(args.sites or ()))
+    report = ingest(args.root, args.out, pairs, types, args.workers, args.force)
+
+    print(f"{report['converted']} converted, {report['up_to_date']} up to date, "
+          f"{report['missing']} missing, {report['failed']} failed; "
+          f"{report['rows']} rows in {report['seconds']}s ({report['rows_per_sec']} rows/s)")
+    for file_type, acc in sorted(report["by_type"].items()):
+        ratio = acc["bytes_out"] / acc["bytes_in"] if acc["bytes_in"] else 0
+        print(f"  {file_type:<24} {acc['files']:>7} files {acc['rows']:>11} rows "
+              f"{acc['bytes_in'] / 1e6:>9.1f} MB -> {acc['bytes_out'] / 1e6:>8.1f} MB ({ratio:.0%})")
+    for failure in report["failures"][:20]:
+        print(f"  failed {failure['file']}: {failure['error']}", file=sys.stderr)
+    sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,55 +4,66 @@ MCP Server for Camera Health Digital Twin
 Exposes Greycat API as MCP tools for AI agent analysis
 """
 
+import argparse
 import asyncio
-import json
-import httpx
+import os
+import sys
 from typing import Any, Optional
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from mcp.server.stdio import stdio_server
 
-# Greycat API configuration
-GREYCAT_BASE_URL = "http://localhost:8080"
-GREYCAT_NAMESPACE = "site_queries"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-class GreycatClient:
-    """Client for interacting with Greycat API"""
-    
-    def __init__(self, base_url: str, namespace: str):
-        self.base_url = base_url
-        self.namespace = namespace
-        self.client = httpx.AsyncClient(timeout=30.0)
-    
-    async def call_function(self, function_name: str, params: list) -> dict:
-        """Call a Greycat function via HTTP"""
-        url = f"{self.base_url}/{self.namespace}::{function_name}"
-        try:
-            response = await self.client.post(
-                url,
-                json=params,
-                headers={"Content-Type": "application/json"}
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPError as e:
-            return {"error": str(e), "function": function_name}
-    
-    async def close(self):
-        await self.client.aclose()
+from mcp_common.batch import (
+    batch_days, city_profile_range, health_trend, sites_day_status_batch
+)
+from mcp_common.encoding import DEFAULT_ENCODING, ENCODING_MODES, encode_response
+from mcp_common.greycat import GREYCAT_NAMESPACE, GreycatClient
+from mcp_common.hourly_analytics import site_hourly_performance
+from mcp_common.response_cache import ResponseCache
+from mcp_common.spatial_tools import SPATIAL_TOOL_NAMES, SPATIAL_TOOL_SCHEMAS, spatial_query
+from mcp_common.transport import DEFAULT_BASE_URL
+from mcp_common.trip_pages import TRIP_PAGE_DEFAULT_LIMIT, TRIP_PAGE_MAX_LIMIT, trip_page_params
+from mcp_common.vehicle_trip import analyze_vehicle_trip
+
+# Greycat API configuration (connection pool, HTTP/2 and timeouts: see mcp_common/transport.py)
+GREYCAT_BASE_URL = os.environ.get("GREYCAT_BASE_URL", DEFAULT_BASE_URL)
+
+# greycat: the server on GREYCAT_BASE_URL; offline: the exported files (see mcp_common/offline.py)
+GREYCAT_BACKEND = os.environ.get("GREYCAT_BACKEND", "greycat")
+
+# Tool response encoding: pretty | compact | table (see mcp_common/encoding.py)
+RESPONSE_ENCODING = os.environ.get("MCP_RESPONSE_ENCODING", DEFAULT_ENCODING)
+
+# Initialize Greycat client (response cache settings: see mcp_common/response_cache.py)
+if GREYCAT_BACKEND == "offline":
+    from mcp_common.offline import OfflineTransport
+    greycat_transport = OfflineTransport()
+    # Tools needing data the exported files do not hold (vehicles, trips)
+    UNAVAILABLE_TOOLS = greycat_transport.unsupported_tools()
+else:
+    greycat_transport = None
+    UNAVAILABLE_TOOLS = frozenset()
 
+greycat = GreycatClient(GREYCAT_BASE_URL, GREYCAT_NAMESPACE,
+                        transport=greycat_transport,
+                        response_cache=ResponseCache.from_env())
 
-# Initialize Greycat client
-greycat = GreycatClient(GREYCAT_BASE_URL, GREYCAT_NAMESPACE)
 
 # Initialize MCP server
 app = Server("camera-health-mcp")
 
 
+def encode(result: Any) -> str:
+    """Serialize a tool result with the configured response encoding"""
+    return encode_response(result, RESPONSE_ENCODING)
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List all available MCP tools"""
-    return [
+    tools = [
         Tool(
             name="list_all_sites",
             description="Get a list of all camera sites with their metadata (location, lanes, direction, names)",
@@ -92,13 +103,35 @@ async def list_tools() -> list[Tool]:
         ),
         Tool(
             name="get_trip_patterns",
-            description="Get all trip patterns for a specific day, showing vehicle routes and detection quality",
+            description="Get one page of the trips for a specific day, showing vehicle routes and detection quality. The response header gives the total number of matching trips and the next_offset to request.",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "day": {
                         "type": "string",
                         "description": "The day in format YYYY-MM-DD (e.g., '2025-08-10')"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Index of the first trip to return (use next_offset from the previous page)",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"Trips per page (default {TRIP_PAGE_DEFAULT_LIMIT}, max {TRIP_PAGE_MAX_LIMIT})",
+                        "default": TRIP_PAGE_DEFAULT_LIMIT
+                    },
+                    "hour": {
+                        "type": "integer",
+                        "description": "Only trips in this hour (0-23)"
+                    },
+                    "issue_label": {
+                        "type": "string",
+                        "description": "Only trips with this issue label"
+                    },
+                    "n_sites": {
+                        "type": "integer",
+                        "description": "Only trips that passed this many sites"
                     }
                 },
                 "required": ["day"]
@@ -152,7 +185,7 @@ async def list_tools() -> list[Tool]:
         ),
         Tool(
             name="compare_sites_on_street",
-            description="Compare performance of all sites on a specific street",
+            description="Compare performance of all sites on a specific street (matches English or Arabic names by word prefix, ignoring case and Arabic spelling variants)",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -189,7 +222,7 @@ async def list_tools() -> list[Tool]:
         ),
         Tool(
             name="get_site_hourly_performance",
-            description="Get hour-by-hour performance for a site on a specific day",
+            description="Get hour-by-hour performance for a site on a specific day: good-rate per hour, night/dawn/dusk/day splits, dead-cell trend and hours that are anomalous against the site's own multi-day baseline",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -204,8 +237,80 @@ async def list_tools() -> list[Tool]:
                 },
                 "required": ["site_id", "day"]
             }
+        ),
+        *(Tool(**schema) for schema in SPATIAL_TOOL_SCHEMAS),
+        Tool(
+            name="get_sites_day_status_batch",
+            description="Detection and degradation status for many sites over many days in one call (one row per site and day: frames, good rate, vehicles, degradation rate), returned as a columnar table",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "site_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Site IDs (max 200, and at most 5000 sites x days)"
+                    },
+                    "days": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Days in format YYYY_MM_DD (or use day_from/day_to)"
+                    },
+                    "day_from": {"type": "string", "description": "First day of the range, YYYY_MM_DD"},
+                    "day_to": {"type": "string", "description": "Last day of the range (inclusive), YYYY_MM_DD"}
+                },
+                "required": ["site_ids"]
+            }
+        ),
+        Tool(
+            name="get_city_profile_range",
+            description="City-wide statistics for a range of days in one call, one row per day, returned as a columnar table",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "days": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Days (or use day_from/day_to)"
+                    },
+                    "day_from": {"type": "string", "description": "First day of the range"},
+                    "day_to": {"type": "string", "description": "Last day of the range (inclusive)"},
+                    "include_vehicle_types": {
+                        "type": "boolean",
+                        "description": "Also return per-vehicle-type rows (default: false)"
+                    }
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="get_health_trend",
+            description="Health trend from precomputed rollups: frames, good rate and dead cells per day or week for one site, or per day city-wide when site_id is omitted. Returned as a columnar table",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "site_id": {"type": "string", "description": "Site ID (omit for city-wide)"},
+                    "granularity": {
+                        "type": "string",
+                        "enum": ["daily", "weekly"],
+                        "description": "daily (default) or weekly (sites only)"
+                    },
+                    "day_from": {"type": "string", "description": "First day, YYYY-MM-DD (optional)"},
+                    "day_to": {"type": "string", "description": "Last day, YYYY-MM-DD (optional)"}
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="get_cache_stats",
+            description="Get MCP server cache and connection statistics (site metadata and response cache hits/misses, coalesced in-flight calls, Greycat connection reuse and per-endpoint latency)",
+            inputSchema={
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
         )
     ]
+    return [tool for tool in tools if tool.name not in UNAVAILABLE_TOOLS]
 
 
 @app.call_tool()
@@ -213,11 +318,18 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     """Handle tool calls"""
     
     try:
-        if name == "list_all_sites":
+        if name in UNAVAILABLE_TOOLS:
+            return [TextContent(
+                type="text",
+                text=encode({"error": f"{name} is not available with GREYCAT_BACKEND={GREYCAT_BACKEND}",
+                             "tool": name})
+            )]
+
+        elif name == "list_all_sites":
             result = await greycat.call_function("list_sites", [])
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=encode(result)
             )]
         
         elif name == "get_site_details":
@@ -225,7 +337,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             result = await greycat.call_function("get_site_details", [site_id])
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=encode(result)
             )]
         
         elif name == "get_vehicle_details":
@@ -233,15 +345,16 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             result = await greycat.call_function("get_vehicle_details", [plate_number])
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=encode(result)
             )]
         
         elif name == "get_trip_patterns":
-            day = arguments["day"]
-            result = await greycat.call_function("get_trip_patterns_for_day", [day])
+            result = await greycat.call_function(
+                "get_trip_patterns_for_day_page", trip_page_params(arguments)
+            )
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=encode(result)
             )]
         
         elif name == "get_city_profile":
@@ -249,7 +362,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             result = await greycat.call_function("get_city_profile", [day])
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=encode(result)
             )]
         
         elif name == "debug_site":
@@ -257,11 +370,15 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             result = await greycat.call_function("debug_site", [site_id])
             return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=encode(result)
             )]
         
         elif name == "analyze_vehicle_trip":
-            return await analyze_vehicle_trip(arguments["plate_number"], arguments["day"])
+            result = await analyze_vehicle_trip(greycat, arguments["plate_number"], arguments["day"])
+            return [TextContent(
+                type="text",
+                text=encode(result)
+            )]
         
         elif name == "compare_sites_on_street":
             return await compare_sites_on_street(arguments["street_name"], arguments["day"])
@@ -273,180 +390,86 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         elif name == "get_site_hourly_performance":
             return await get_site_hourly_performance(arguments["site_id"], arguments["day"])
         
+        elif name in SPATIAL_TOOL_NAMES:
+            return [TextContent(
+                type="text",
+                text=encode(await spatial_query(greycat, name, arguments))
+            )]
+        
+        elif name == "get_sites_day_status_batch":
+            result = await sites_day_status_batch(
+                greycat, arguments["site_ids"], batch_days(arguments)
+            )
+            return [TextContent(
+                type="text",
+                text=encode(result)
+            )]
+        
+        elif name == "get_city_profile_range":
+            result = await city_profile_range(
+                greycat, batch_days(arguments), arguments.get("include_vehicle_types", False)
+            )
+            return [TextContent(
+                type="text",
+                text=encode(result)
+            )]
+        
+        elif name == "get_health_trend":
+            result = await health_trend(
+                greycat, arguments.get("site_id"), arguments.get("granularity", "daily"),
+                arguments.get("day_from"), arguments.get("day_to")
+            )
+            return [TextContent(
+                type="text",
+                text=encode(result)
+            )]
+        
+        elif name == "get_cache_stats":
+            return [TextContent(
+                type="text",
+                text=encode(greycat.stats())
+            )]
+        
         else:
             return [TextContent(
                 type="text",
-                text=json.dumps({"error": f"Unknown tool: {name}"})
+                text=encode({"error": f"Unknown tool: {name}"})
             )]
     
     except Exception as e:
         return [TextContent(
             type="text",
-            text=json.dumps({"error": str(e), "tool": name})
+            text=encode({"error": str(e), "tool": name})
         )]
 
 
-async def analyze_vehicle_trip(plate_number: str, day: str) -> list[TextContent]:
-    """
-    Complex analysis: Determine if vehicle degradation is due to vehicle or site issues
-    """
-    # Get vehicle details
-    vehicle = await greycat.call_function("get_vehicle_details", [plate_number])
-    
-    # Get trip patterns for the day
-    day_formatted = day  # YYYY-MM-DD
-    trips = await greycat.call_function("get_trip_patterns_for_day", [day_formatted])
-    
-    # Find trips for this vehicle
-    vehicle_trips = []
-    for pattern in trips:
-        for trip in pattern.get("trips", []):
-            if trip.get("plate_number") == plate_number:
-                vehicle_trips.append(trip)
-    
-    if not vehicle_trips:
-        return [TextContent(
-            type="text",
-            text=json.dumps({
-                "analysis": "No trips found for this vehicle on this day",
-                "vehicle": vehicle,
-                "plate_number": plate_number,
-                "day": day
-            }, indent=2)
-        )]
-    
-    # Analyze each trip
-    analysis = {
-        "vehicle": vehicle,
-        "plate_number": plate_number,
-        "day": day,
-        "trips": [],
-        "summary": {
-            "total_trips": len(vehicle_trips),
-            "total_detections": 0,
-            "degraded_detections": 0,
-            "sites_visited": set(),
-            "always_degraded": vehicle.get("vehicle_label") == "always_degraded"
-        }
-    }
-    
-    for trip in vehicle_trips:
-        trip_analysis = {
-            "window": trip.get("window30"),
-            "sites": trip.get("site_list"),
-            "min_quality": trip.get("min_quality"),
-            "max_quality": trip.get("max_quality"),
-            "issue_label": trip.get("issue_label"),
-            "steps": []
-        }
-        
-        # Analyze each step in the trip
-        for step in trip.get("steps", []):
-            site_id = step.get("site")
-            quality = step.get("img_quality")
-            hour = step.get("hour")
-            
-            analysis["summary"]["sites_visited"].add(site_id)
-            analysis["summary"]["total_detections"] += 1
-            
-            if quality < 0.5:  # Threshold for degraded
-                analysis["summary"]["degraded_detections"] += 1
-            
-            # Get site details for comparison
-            site_info = await greycat.call_function("get_site_details", [site_id])
-            
-            step_analysis = {
-                "site_id": site_id,
-                "timestamp": step.get("ts"),
-                "hour": hour,
-                "quality": quality,
-                "is_degraded": quality < 0.5,
-                "site_name": site_info.get("name_en", "Unknown")
-            }
-            
-            trip_analysis["steps"].append(step_analysis)
-        
-        analysis["trips"].append(trip_analysis)
-    
-    # Convert set to list for JSON serialization
-    analysis["summary"]["sites_visited"] = list(analysis["summary"]["sites_visited"])
-    
-    # Determine root cause
-    degradation_rate = (analysis["summary"]["degraded_detections"] / 
-                       analysis["summary"]["total_detections"] * 100 
-                       if analysis["summary"]["total_detections"] > 0 else 0)
-    
-    if analysis["summary"]["always_degraded"]:
-        analysis["conclusion"] = {
-            "root_cause": "VEHICLE_ISSUE",
-            "confidence": "HIGH",
-            "reasoning": f"Vehicle is marked as 'always_degraded' with {degradation_rate:.1f}% degradation rate across {len(analysis['summary']['sites_visited'])} sites",
-            "recommendation": "Vehicle camera/plate requires maintenance or replacement"
-        }
-    elif degradation_rate > 80:
-        analysis["conclusion"] = {
-            "root_cause": "LIKELY_VEHICLE_ISSUE",
-            "confidence": "MEDIUM",
-            "reasoning": f"High degradation rate ({degradation_rate:.1f}%) across multiple sites suggests vehicle issue",
-            "recommendation": "Inspect vehicle plate quality and compare with other vehicles at same sites"
-        }
-    elif len(analysis["summary"]["sites_visited"]) == 1:
-        analysis["conclusion"] = {
-            "root_cause": "LIKELY_SITE_ISSUE",
-            "confidence": "MEDIUM",
-            "reasoning": "Degradation only at single site suggests site-specific issue",
-            "recommendation": "Inspect site camera and compare with other vehicles at same time"
-        }
-    else:
-        analysis["conclusion"] = {
-            "root_cause": "MIXED_OR_UNCLEAR",
-            "confidence": "LOW",
-            "reasoning": f"Degradation rate {degradation_rate:.1f}% across {len(analysis['summary']['sites_visited'])} sites requires deeper analysis",
-            "recommendation": "Compare site performance at same time of day with other vehicles"
-        }
-    
-    return [TextContent(
-        type="text",
-        text=json.dumps(analysis, indent=2)
-    )]
-
-
 async def compare_sites_on_street(street_name: str, day: str) -> list[TextContent]:
     """Compare performance of sites on a specific street"""
-    # Get all sites
-    all_sites = await greycat.call_function("list_sites", [])
-    
-    # Filter sites by street name
-    matching_sites = [
-        site for site in all_sites
-        if (street_name.lower() in site.get("name_en", "").lower() or
-            street_name in site.get("name_ar", ""))
-    ]
+    # Street index lookup (English/Arabic, token prefixes), then day counts
+    # for the matching sites only
+    matching_sites, failures = await greycat.get_street_sites_for_day(street_name, day)
     
-    if not matching_sites:
+    if not matching_sites and not failures:
         return [TextContent(
             type="text",
-            text=json.dumps({
+            text=encode({
                 "error": f"No sites found on street: {street_name}",
                 "searched_street": street_name
-            }, indent=2)
+            })
         )]
     
-    # Get performance data for each site
     comparison = {
         "street_name": street_name,
         "day": day,
         "sites": []
     }
+    if failures:
+        comparison["failed_site_lookups"] = failures
     
     for site in matching_sites:
-        site_id = site["siteId"]
-        
-        # Get site counts
-        site_details = await greycat.call_function("get_site_details", [site_id])
-        
+        rate = site.get("degradation_rate")
         site_perf = {
-            "site_id": site_id,
+            "site_id": site["siteId"],
             "name_en": site.get("name_en"),
             "name_ar": site.get("name_ar"),
             "location": {
@@ -455,93 +478,84 @@ async def compare_sites_on_street(street_name: str, day: str) -> list[TextConten
             },
             "lanes": site.get("numberOfLanes"),
             "direction": site.get("direction"),
-            "vehicle_counts": len(site_details.get("vehicle_counts_total", []))
+            "total_vehicles": site.get("unique_vehicles", 0),
+            "degraded_vehicles": site.get("always_degraded_vehicles", 0),
+            "degradation_rate": round(rate, 2) if rate is not None else None
         }
         
         comparison["sites"].append(site_perf)
     
     return [TextContent(
         type="text",
-        text=json.dumps(comparison, indent=2)
+        text=encode(comparison)
     )]
 
 
 async def find_degraded_sites(day: str, threshold: float) -> list[TextContent]:
     """Find sites with high degradation rates"""
-    # Get all sites
-    all_sites = await greycat.call_function("list_sites", [])
+    # Greycat computes the per-site rates; only the compact rows cross the wire
+    all_sites = await greycat.call_function("get_site_degradation_for_day", [day])
+    if isinstance(all_sites, dict) and "error" in all_sites:
+        return [TextContent(type="text", text=encode(all_sites))]
     
     degraded_sites = []
     
     for site in all_sites:
-        site_id = site["siteId"]
-        site_details = await greycat.call_function("get_site_details", [site_id])
+        degradation_rate = site.get("degradation_rate")
         
-        # Check vehicle counts
-        counts = site_details.get("vehicle_counts_total", [])
-        for count in counts:
-            if count.get("day") == day:
-                total = count.get("unique_vehicles", 0)
-                degraded = count.get("always_degraded_vehicles", 0)
-                
-                if total > 0:
-                    degradation_rate = (degraded / total) * 100
-                    
-                    if degradation_rate >= threshold:
-                        degraded_sites.append({
-                            "site_id": site_id,
-                            "name_en": site.get("name_en"),
-                            "name_ar": site.get("name_ar"),
-                            "total_vehicles": total,
-                            "degraded_vehicles": degraded,
-                            "degradation_rate": round(degradation_rate, 2),
-                            "location": {
-                                "lat": site.get("lat"),
-                                "lon": site.get("lon")
-                            }
-                        })
+        if degradation_rate is not None and degradation_rate >= threshold:
+            degraded_sites.append({
+                "site_id": site["siteId"],
+                "name_en": site.get("name_en"),
+                "name_ar": site.get("name_ar"),
+                "total_vehicles": site.get("unique_vehicles", 0),
+                "degraded_vehicles": site.get("always_degraded_vehicles", 0),
+                "degradation_rate": round(degradation_rate, 2),
+                "location": {
+                    "lat": site.get("lat"),
+                    "lon": site.get("lon")
+                }
+            })
     
     # Sort by degradation rate
     degraded_sites.sort(key=lambda x: x["degradation_rate"], reverse=True)
     
     return [TextContent(
         type="text",
-        text=json.dumps({
+        text=encode({
             "day": day,
             "threshold": threshold,
             "degraded_sites_count": len(degraded_sites),
             "sites": degraded_sites
-        }, indent=2)
+        })
     )]
 
 
 async def get_site_hourly_performance(site_id: str, day: str) -> list[TextContent]:
-    """Get hour-by-hour performance for a site"""
+    """
+    Hour-by-hour performance for a site: good-rate per hour, night/dawn/dusk
+    splits, dead-cell trend and anomalies against the site's other days
+    """
     site_details = await greycat.call_function("get_site_details", [site_id])
-    
-    # Extract hourly quality data
-    hourly_data = site_details.get("hourly_quality", [])
-    
-    # Filter by day
-    day_data = [h for h in hourly_data if h.get("day") == day]
-    
-    # Sort by hour
-    day_data.sort(key=lambda x: x.get("hour", 0))
-    
+    if "error" in site_details:
+        return [TextContent(type="text", text=encode(site_details))]
+
     performance = {
         "site_id": site_id,
         "day": day,
-        "hourly_performance": day_data
+        **site_hourly_performance(site_details, day)
     }
     
     return [TextContent(
         type="text",
-        text=json.dumps(performance, indent=2)
+        text=encode(performance)
     )]
 
 
 async def main():
     """Run the MCP server"""
+    # Load site metadata and the site indexes before the first tool call
+    await greycat.warm_site_cache()
     async with stdio_server() as (read_stream, write_stream):
         await app.run(
             read_stream,
@@ -551,4 +565,9 @@ async def main():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Camera Health MCP server (stdio)")
+    parser.add_argument("--encoding", choices=ENCODING_MODES, default=RESPONSE_ENCODING,
+                        help="tool response encoding (default: %(default)s)")
+    RESPONSE_ENCODING = parser.parse_args().encoding
+    
     asyncio.run(main())
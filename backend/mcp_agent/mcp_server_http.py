@@ -4,9 +4,12 @@ MCP Server for Camera Health Diagnostics - HTTP VERSION (Windows Compatible)
 Exposes Greycat API as MCP tools via HTTP instead of stdio
 """
 
+import argparse
 import asyncio
+import os
+import sys
 import httpx
-import json
+from contextlib import asynccontextmanager
 from typing import Any, Dict, List
 from mcp.server import Server
 from mcp.types import Tool, TextContent
@@ -15,29 +18,56 @@ from starlette.applications import Starlette
 from starlette.routing import Route
 from starlette.responses import Response
 
-# Greycat API configuration
-GREYCAT_BASE_URL = "http://localhost:8080"
-GREYCAT_NAMESPACE = "site_queries"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_common.batch import (
+    batch_days, city_profile_range, health_trend, sites_day_status_batch
+)
+from mcp_common.encoding import DEFAULT_ENCODING, ENCODING_MODES, encode_response
+from mcp_common.greycat import GREYCAT_NAMESPACE, GreycatClient
+from mcp_common.hourly_analytics import site_hourly_performance
+from mcp_common.response_cache import ResponseCache
+from mcp_common.spatial_tools import SPATIAL_TOOL_NAMES, SPATIAL_TOOL_SCHEMAS, spatial_query
+from mcp_common.transport import DEFAULT_BASE_URL
+from mcp_common.trip_pages import TRIP_PAGE_DEFAULT_LIMIT, TRIP_PAGE_MAX_LIMIT, trip_page_params
+from mcp_common.vehicle_trip import analyze_vehicle_trip
+
+# Greycat API configuration (connection pool, HTTP/2 and timeouts: see mcp_common/transport.py)
+GREYCAT_BASE_URL = os.environ.get("GREYCAT_BASE_URL", DEFAULT_BASE_URL)
+
+# greycat: the server on GREYCAT_BASE_URL; offline: the exported files (see mcp_common/offline.py)
+GREYCAT_BACKEND = os.environ.get("GREYCAT_BACKEND", "greycat")
+
+# Tool response encoding: pretty | compact | table (see mcp_common/encoding.py)
+RESPONSE_ENCODING = os.environ.get("MCP_RESPONSE_ENCODING", DEFAULT_ENCODING)
 
 # Initialize MCP server
 app_mcp = Server("camera-health-mcp")
 
-# HTTP client for Greycat
-http_client = httpx.AsyncClient(timeout=30.0)
+# Greycat client on the shared keep-alive transport, with the response cache
+if GREYCAT_BACKEND == "offline":
+    from mcp_common.offline import OfflineTransport
+    greycat_transport = OfflineTransport()
+    # Tools needing data the exported files do not hold (vehicles, trips)
+    UNAVAILABLE_TOOLS = greycat_transport.unsupported_tools()
+else:
+    greycat_transport = None
+    UNAVAILABLE_TOOLS = frozenset()
+
+greycat = GreycatClient(GREYCAT_BASE_URL, GREYCAT_NAMESPACE,
+                        transport=greycat_transport,
+                        response_cache=ResponseCache.from_env())
+
+
+def encode(result: Any) -> str:
+    """Serialize a tool result with the configured response encoding"""
+    return encode_response(result, RESPONSE_ENCODING)
 
 
 async def call_greycat_function(function_name: str, args: list) -> dict:
     """Call a Greycat function via HTTP"""
-    url = f"{GREYCAT_BASE_URL}/{GREYCAT_NAMESPACE}::{function_name}"
-    
     try:
-        response = await http_client.post(
-            url,
-            json=args,
-            headers={"Content-Type": "application/json"}
-        )
-        response.raise_for_status()
-        return response.json()
+        return await greycat.post_function(function_name, args)
     except httpx.HTTPError as e:
         return {"error": f"HTTP error calling {function_name}: {str(e)}"}
     except Exception as e:
@@ -48,7 +78,7 @@ async def call_greycat_function(function_name: str, args: list) -> dict:
 @app_mcp.list_tools()
 async def list_tools() -> List[Tool]:
     """List available MCP tools"""
-    return [
+    tools = [
         Tool(
             name="list_all_sites",
             description="Get a list of all camera sites in the system with their metadata",
@@ -88,13 +118,35 @@ async def list_tools() -> List[Tool]:
         ),
         Tool(
             name="get_trip_patterns",
-            description="Get all trip patterns for a specific day, including vehicle routes and degradation patterns",
+            description="Get one page of the trips for a specific day, including vehicle routes and degradation patterns. The response header gives the total number of matching trips and the next_offset to request.",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "day": {
                         "type": "string",
                         "description": "Date in YYYY-MM-DD format (e.g., '2025-08-10')"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Index of the first trip to return (use next_offset from the previous page)",
+                        "default": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"Trips per page (default {TRIP_PAGE_DEFAULT_LIMIT}, max {TRIP_PAGE_MAX_LIMIT})",
+                        "default": TRIP_PAGE_DEFAULT_LIMIT
+                    },
+                    "hour": {
+                        "type": "integer",
+                        "description": "Only trips in this hour (0-23)"
+                    },
+                    "issue_label": {
+                        "type": "string",
+                        "description": "Only trips with this issue label"
+                    },
+                    "n_sites": {
+                        "type": "integer",
+                        "description": "Only trips that passed this many sites"
                     }
                 },
                 "required": ["day"]
@@ -148,7 +200,7 @@ async def list_tools() -> List[Tool]:
         ),
         Tool(
             name="compare_sites_on_street",
-            description="Compare performance of all camera sites on the same street",
+            description="Compare performance of all camera sites on the same street (English or Arabic name, matched by word prefix)",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -185,7 +237,7 @@ async def list_tools() -> List[Tool]:
         ),
         Tool(
             name="get_site_hourly_performance",
-            description="Get hour-by-hour performance metrics for a specific site",
+            description="Get hour-by-hour performance metrics for a specific site: good-rate per hour, night/dawn/dusk/day splits, dead-cell trend and anomalous hours against the site's own baseline, with city context",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -200,8 +252,80 @@ async def list_tools() -> List[Tool]:
                 },
                 "required": ["site_id", "day"]
             }
+        ),
+        *(Tool(**schema) for schema in SPATIAL_TOOL_SCHEMAS),
+        Tool(
+            name="get_sites_day_status_batch",
+            description="Detection and degradation status for many sites over many days in one call (one row per site and day: frames, good rate, vehicles, degradation rate), returned as a columnar table",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "site_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Site IDs (max 200, and at most 5000 sites x days)"
+                    },
+                    "days": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Days in format YYYY_MM_DD (or use day_from/day_to)"
+                    },
+                    "day_from": {"type": "string", "description": "First day of the range, YYYY_MM_DD"},
+                    "day_to": {"type": "string", "description": "Last day of the range (inclusive), YYYY_MM_DD"}
+                },
+                "required": ["site_ids"]
+            }
+        ),
+        Tool(
+            name="get_city_profile_range",
+            description="City-wide statistics for a range of days in one call, one row per day, returned as a columnar table",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "days": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Days (or use day_from/day_to)"
+                    },
+                    "day_from": {"type": "string", "description": "First day of the range"},
+                    "day_to": {"type": "string", "description": "Last day of the range (inclusive)"},
+                    "include_vehicle_types": {
+                        "type": "boolean",
+                        "description": "Also return per-vehicle-type rows (default: false)"
+                    }
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="get_health_trend",
+            description="Health trend from precomputed rollups: frames, good rate and dead cells per day or week for one site, or per day city-wide when site_id is omitted. Returned as a columnar table",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "site_id": {"type": "string", "description": "Site ID (omit for city-wide)"},
+                    "granularity": {
+                        "type": "string",
+                        "enum": ["daily", "weekly"],
+                        "description": "daily (default) or weekly (sites only)"
+                    },
+                    "day_from": {"type": "string", "description": "First day, YYYY-MM-DD (optional)"},
+                    "day_to": {"type": "string", "description": "Last day, YYYY-MM-DD (optional)"}
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="get_cache_stats",
+            description="Get MCP server cache and connection statistics (response cache hits/misses, coalesced in-flight calls, Greycat connection reuse, per-endpoint latency)",
+            inputSchema={
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
         )
     ]
+    return [tool for tool in tools if tool.name not in UNAVAILABLE_TOOLS]
 
 
 @app_mcp.call_tool()
@@ -209,7 +333,10 @@ async def call_tool(name: str, arguments: dict) -> List[TextContent]:
     """Handle tool calls"""
     
     try:
-        if name == "list_all_sites":
+        if name in UNAVAILABLE_TOOLS:
+            result = {"error": f"{name} is not available with GREYCAT_BACKEND={GREYCAT_BACKEND}"}
+
+        elif name == "list_all_sites":
             result = await call_greycat_function("list_sites", [])
         
         elif name == "get_site_details":
@@ -219,7 +346,7 @@ async def call_tool(name: str, arguments: dict) -> List[TextContent]:
             result = await call_greycat_function("get_vehicle_details", [arguments["plate_number"]])
         
         elif name == "get_trip_patterns":
-            result = await call_greycat_function("get_trip_patterns_for_day", [arguments["day"]])
+            result = await call_greycat_function("get_trip_patterns_for_day_page", trip_page_params(arguments))
         
         elif name == "get_city_profile":
             result = await call_greycat_function("get_city_profile", [arguments["day"]])
@@ -228,102 +355,102 @@ async def call_tool(name: str, arguments: dict) -> List[TextContent]:
             result = await call_greycat_function("debug_site", [arguments["site_id"]])
         
         elif name == "analyze_vehicle_trip":
-            # Complex analysis - call multiple Greycat functions
-            plate = arguments["plate_number"]
-            day = arguments["day"]
-            day_underscore = day.replace("-", "_")
-            
-            # Get vehicle details
-            vehicle = await call_greycat_function("get_vehicle_details", [plate])
-            
-            # Get trip patterns
-            trips = await call_greycat_function("get_trip_patterns_for_day", [day])
-            
-            # Filter trips for this vehicle
-            vehicle_trips = [t for t in trips.get("trips", []) if plate in str(t)]
-            
-            # Analyze
-            if not vehicle_trips:
-                result = {
-                    "analysis": f"No trips found for vehicle {plate} on {day}",
-                    "root_cause": "NO_DATA",
-                    "confidence": "N/A"
-                }
-            else:
-                # Simple analysis based on trip data
-                result = {
-                    "vehicle": plate,
-                    "day": day,
-                    "trips_found": len(vehicle_trips),
-                    "vehicle_data": vehicle,
-                    "trip_data": vehicle_trips[:3],  # First 3 trips
-                    "analysis": f"Found {len(vehicle_trips)} trips for vehicle {plate}. Check degradation patterns across sites.",
-                    "recommendation": "Compare vehicle quality across different sites to determine root cause"
-                }
-        
+            # Same analysis as the stdio server, step site names from the metadata cache
+            result = await analyze_vehicle_trip(greycat, arguments["plate_number"], arguments["day"])
+
         elif name == "compare_sites_on_street":
-            # Get all sites
-            all_sites = await call_greycat_function("list_sites", [])
-            
-            # Filter by street name
+            # Street index lookup, then day counts for the matching sites only
             street_name = arguments["street_name"]
-            matching_sites = [
-                s for s in all_sites 
-                if street_name.lower() in str(s.get("name_en", "")).lower() or 
-                   street_name.lower() in str(s.get("name_ar", "")).lower()
-            ]
+            matching_sites, failures = await greycat.get_street_sites_for_day(
+                street_name, arguments["day"]
+            )
             
             result = {
                 "street": street_name,
+                "day": arguments["day"],
                 "sites_found": len(matching_sites),
                 "sites": matching_sites,
                 "analysis": f"Found {len(matching_sites)} sites on {street_name}"
             }
+            if failures:
+                result["failed_site_lookups"] = failures
         
         elif name == "find_degraded_sites":
             day = arguments["day"]
             threshold = arguments.get("threshold", 50)
             
-            # Get city profile
-            profile = await call_greycat_function("get_city_profile", [day])
+            # Per-site degradation rates computed by Greycat
+            all_sites = await call_greycat_function("get_site_degradation_for_day", [day])
             
-            # Extract degraded sites (simplified - would need actual degradation data)
-            result = {
-                "day": day,
-                "threshold": threshold,
-                "city_profile": profile,
-                "note": "Check city profile data for degradation metrics"
-            }
+            if isinstance(all_sites, dict):
+                result = all_sites
+            else:
+                degraded = [
+                    s for s in all_sites
+                    if s.get("degradation_rate") is not None and s["degradation_rate"] >= threshold
+                ]
+                degraded.sort(key=lambda s: s["degradation_rate"], reverse=True)
+                result = {
+                    "day": day,
+                    "threshold": threshold,
+                    "degraded_sites_count": len(degraded),
+                    "sites": degraded
+                }
         
         elif name == "get_site_hourly_performance":
             site_id = arguments["site_id"]
             day = arguments["day"]
             
-            # Get site details
-            site = await call_greycat_function("get_site_details", [site_id])
+            # Site history (for the baseline) and city profile for context
+            site, profile = await asyncio.gather(
+                call_greycat_function("get_site_details", [site_id]),
+                call_greycat_function("get_city_profile", [day])
+            )
             
-            # Get city profile for context
-            profile = await call_greycat_function("get_city_profile", [day])
-            
-            result = {
-                "site_id": site_id,
-                "day": day,
-                "site_data": site,
-                "city_context": profile
-            }
+            if "error" in site:
+                result = site
+            else:
+                result = {
+                    "site_id": site_id,
+                    "day": day,
+                    **site_hourly_performance(site, day),
+                    "city_context": profile
+                }
+        
+        elif name in SPATIAL_TOOL_NAMES:
+            result = await spatial_query(greycat, name, arguments)
+        
+        elif name == "get_sites_day_status_batch":
+            result = await sites_day_status_batch(
+                greycat, arguments["site_ids"], batch_days(arguments)
+            )
+        
+        elif name == "get_city_profile_range":
+            result = await city_profile_range(
+                greycat, batch_days(arguments), arguments.get("include_vehicle_types", False)
+            )
+        
+        elif name == "get_health_trend":
+            result = await health_trend(
+                greycat, arguments.get("site_id"), arguments.get("granularity", "daily"),
+                arguments.get("day_from"), arguments.get("day_to")
+            )
+        
+        elif name == "get_cache_stats":
+            result = greycat.stats()
         
         else:
             result = {"error": f"Unknown tool: {name}"}
         
         return [TextContent(
             type="text",
-            text=json.dumps(result, indent=2)
+            text=encode(result)
         )]
     
     except Exception as e:
         return [TextContent(
             type="text",
-            text=json.dumps({"error": str(e)}, indent=2)
+            text=encode({"error": str(e)})
         )]
 
 
@@ -339,20 +466,34 @@ async def handle_sse(request):
     return Response()
 
 
+@asynccontextmanager
+async def lifespan(app):
+    # Load site metadata and the site indexes before the first tool call
+    await greycat.warm_site_cache()
+    yield
+
+
 starlette_app = Starlette(
     routes=[
         Route("/sse", endpoint=handle_sse),
-    ]
+    ],
+    lifespan=lifespan
 )
 
 
 if __name__ == "__main__":
     import uvicorn
+    parser = argparse.ArgumentParser(description="Camera Health MCP server (HTTP/SSE)")
+    parser.add_argument("--encoding", choices=ENCODING_MODES, default=RESPONSE_ENCODING,
+                        help="tool response encoding (default: %(default)s)")
+    RESPONSE_ENCODING = parser.parse_args().encoding
+    
     print("=" * 80)
     print("MCP Server - HTTP Mode (Windows Compatible)")
     print("=" * 80)
     print(f"Starting HTTP MCP server on http://localhost:3000")
     print(f"Connecting to Greycat at {GREYCAT_BASE_URL}")
+    print(f"Response encoding: {RESPONSE_ENCODING}")
     print("=" * 80)
     
     uvicorn.run(starlette_app, host="0.0.0.0", port=3000)
@@ -0,0 +1,4 @@
+"""
+Shared building blocks for the camera-health MCP servers
+(backend/server/mcp_server.py and backend/mcp_agent/mcp_server_http.py)
+"""
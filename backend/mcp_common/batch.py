@@ -0,0 +1,195 @@
+"""
+Batch multi-site / multi-day queries (get_sites_day_status_batch,
+get_city_profile_range, get_health_trend)
+
+One tool call covers a list of sites and a range of days. Upstream calls
+are fanned out concurrently (one get_site_day per site and day, one
+get_city_profile per day; both go through the response cache), and the
+result is a single columnar table: {"columns": [...], "rows": [[...], ...]}.
+get_health_trend reads the rollups Greycat maintains at import time
+(get_site_rollups / get_city_rollups), so a months-long trend is one call.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Optional
+
+from mcp_common.greycat import GreycatClient
+from mcp_common.response_cache import parse_day
+
+# Upper bounds on one batch call
+BATCH_MAX_SITES = 200
+BATCH_MAX_DAYS = 366
+# Site-day cells of one status batch (one get_site_day call each)
+BATCH_MAX_SITE_DAYS = 5000
+
+SITE_DAY_STATUS_COLUMNS = (
+    "site_id", "day", "hours", "frames", "good_frames", "bad_frames", "good_rate",
+    "unique_vehicles", "always_degraded_vehicles", "degradation_rate"
+)
+
+CITY_PROFILE_COLUMNS = (
+    "day", "detections_total_all_days", "detections_good_all_days",
+    "detections_missed_all_days", "elapsed_days", "n_sites_total",
+    "unique_cars_all_days", "total_unique_cars", "cars_any_degraded",
+    "cars_no_degrade", "cars_all_sites_degraded", "pct_good_all_days",
+    "pct_missed_all_days", "threshold_good"
+)
+
+TREND_COLUMNS = (
+    "quality_hours", "frames", "good_frames", "bad_frames", "pct_good",
+    "grid_hours", "dead_cells", "avg_dead_cells"
+)
+
+
+def day_range(day_from: str, day_to: str) -> list[str]:
+    """Every day from day_from to day_to inclusive, in day_from's format (- or _)"""
+    start, end = parse_day(day_from), parse_day(day_to)
+    if start is None or end is None:
+        raise ValueError(f"Days must be YYYY-MM-DD or YYYY_MM_DD: {day_from!r}, {day_to!r}")
+    if end < start:
+        raise ValueError(f"day_to {day_to} is before day_from {day_from}")
+    n_days = (end - start).days + 1
+    if n_days > BATCH_MAX_DAYS:
+        raise ValueError(f"Day range of {n_days} days exceeds {BATCH_MAX_DAYS}")
+    fmt = f"%Y{day_from[4]}%m{day_from[4]}%d"
+    return [(start + timedelta(days=i)).strftime(fmt) for i in range(n_days)]
+
+
+def batch_days(arguments: dict) -> list[str]:
+    """Days from an explicit `days` list or a `day_from`/`day_to` range"""
+    if arguments.get("days"):
+        days = list(dict.fromkeys(arguments["days"]))
+        if len(days) > BATCH_MAX_DAYS:
+            raise ValueError(f"{len(days)} days exceeds {BATCH_MAX_DAYS}")
+        return days
+    if arguments.get("day_from") and arguments.get("day_to"):
+        return day_range(arguments["day_from"], arguments["day_to"])
+    raise ValueError("Give either days or day_from and day_to")
+
+
+def _bound(value: Optional[str], name: str) -> Optional[date]:
+    """A trend bound as a date (None: open)"""
+    if value is None:
+        return None
+    day = parse_day(value)
+    if day is None:
+        raise ValueError(f"{name} must be YYYY-MM-DD or YYYY_MM_DD: {value!r}")
+    return day
+
+
+def _rate(part: int, total: int, scale: float = 1.0) -> Optional[float]:
+    return round(part * scale / total, 4) if total else None
+
+
+def site_day_status_row(site_id: str, day: str, site_day: Optional[dict]) -> list:
+    """One SITE_DAY_STATUS_COLUMNS row from a get_site_day result (None: zeros)"""
+    site_day = site_day or {}
+    quality = site_day.get("hourly_quality") or []
+    frames = sum(row.get("frames") or 0 for row in quality)
+    good = sum(row.get("good_frames") or 0 for row in quality)
+
+    counts = site_day.get("vehicle_counts_total") or []
+    unique = sum(row.get("unique_vehicles") or 0 for row in counts)
+    degraded = sum(row.get("always_degraded_vehicles") or 0 for row in counts)
+
+    return [
+        site_id, day, len(quality), frames, good, frames - good, _rate(good, frames),
+        unique, degraded, _rate(degraded, unique, 100.0)
+    ]
+
+
+async def sites_day_status_batch(greycat: GreycatClient, site_ids: list[str],
+                                 days: list[str]) -> dict:
+    """Per (site, day) detection and degradation status as one table"""
+    site_ids = list(dict.fromkeys(site_ids))
+    if len(site_ids) > BATCH_MAX_SITES:
+        raise ValueError(f"{len(site_ids)} sites exceeds {BATCH_MAX_SITES}")
+    if len(site_ids) * len(days) > BATCH_MAX_SITE_DAYS:
+        raise ValueError(f"{len(site_ids)} sites x {len(days)} days exceeds "
+                         f"{BATCH_MAX_SITE_DAYS} site-days; split the batch")
+
+    cells = [[site_id, day] for site_id in site_ids for day in days]
+    site_days, failures = await greycat.fan_out("get_site_day", cells)
+
+    rows = [
+        site_day_status_row(site_id, day, site_day)
+        for (site_id, day), site_day in zip(cells, site_days)
+        if site_day is not None
+    ]
+    return {
+        "sites": len(site_ids),
+        "days": len(days),
+        "columns": list(SITE_DAY_STATUS_COLUMNS),
+        "rows": rows,
+        "failures": failures
+    }
+
+
+async def city_profile_range(greycat: GreycatClient, days: list[str],
+                             include_vehicle_types: bool = False) -> dict:
+    """City overall stats per day as one table, optionally with per-vehicle-type rows"""
+    profiles, failures = await greycat.fan_out("get_city_profile", [[d] for d in days])
+
+    rows = []
+    type_rows = []
+    type_columns: list[str] = []
+    for day, profile in zip(days, profiles):
+        if profile is None:
+            continue
+        overall: dict[str, Any] = profile.get("overall") or {}
+        rows.append([day] + [overall.get(c) for c in CITY_PROFILE_COLUMNS[1:]])
+        if include_vehicle_types:
+            for stats in profile.get("by_vehicle_type") or []:
+                if not type_columns:
+                    type_columns = ["day"] + list(stats.keys())
+                type_rows.append([day] + [stats.get(c) for c in type_columns[1:]])
+
+    result = {
+        "days": len(days),
+        "columns": list(CITY_PROFILE_COLUMNS),
+        "rows": rows,
+        "failures": failures
+    }
+    if include_vehicle_types:
+        result["by_vehicle_type"] = {"columns": type_columns, "rows": type_rows}
+    return result
+
+
+async def health_trend(greycat: GreycatClient, site_id: Optional[str] = None,
+                       granularity: str = "daily", day_from: Optional[str] = None,
+                       day_to: Optional[str] = None) -> dict:
+    """
+    Site (daily or weekly) or city (daily) health rollups as one table,
+    sorted by period and limited to [day_from, day_to]. Days are compared as
+    dates, so YYYY-MM-DD and YYYY_MM_DD bounds both work whatever format the
+    import used.
+    """
+    start = _bound(day_from, "day_from")
+    end = _bound(day_to, "day_to")
+
+    if site_id is None:
+        if granularity != "daily":
+            raise ValueError("City rollups are daily only")
+        rollups = await greycat.post_function("get_city_rollups", [])
+        key = "day"
+        extra = ("sites",)
+    else:
+        view = await greycat.post_function("get_site_rollups", [site_id])
+        if granularity == "weekly":
+            rollups, key, extra = view.get("weekly") or [], "week", ("days",)
+        else:
+            rollups, key, extra = view.get("daily") or [], "day", ("max_dead_cells",)
+
+    columns = (key,) + extra + TREND_COLUMNS
+    periods = [(parse_day(r.get(key)), r) for r in rollups]
+    rows = [
+        [r.get(c) for c in columns]
+        for period, r in sorted((p for p in periods if p[0] is not None), key=lambda p: p[0])
+        if (start is None or period >= start) and (end is None or period <= end)
+    ]
+    return {
+        "site_id": site_id,
+        "granularity": granularity,
+        "columns": list(columns),
+        "rows": rows
+    }
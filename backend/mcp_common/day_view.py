@@ -0,0 +1,72 @@
+"""
+DAY_VIEW file types and paths, shared by day_view_to_parquet.py and the
+offline backend
+
+  ROOT/<siteId>/DAY_VIEW/<day>/<siteId>_<day>_<type>.csv   (exporter output)
+  OUT/<type>/<day>/<siteId>.parquet                         (day_view_to_parquet.py)
+"""
+
+import os
+
+import pyarrow as pa
+
+_S, _I, _F, _B = pa.string(), pa.int64(), pa.float64(), pa.bool_()
+
+# Typed columns per file type (HourlyGridSummary, HourlyQuality, ... in model.gcl)
+SCHEMAS = {
+    "hourly_grid_summary": {
+        "site": _S, "day": _S, "ts_hour": _S, "hour_str": _S,
+        "total_frames": _I, "total_good": _I, "total_bad": _I,
+        "active_cells": _I, "good_cells": _I, "bad_cells": _I, "dead_cells": _I,
+        "pct_good_all": _F, "pct_good_cells": _F,
+    },
+    "hourly_quality": {
+        "site": _S, "city": _S, "day": _S, "date_d": _S, "ts_hour": _S, "hour": _I,
+        "frames": _I, "good_frames": _I, "bad_frames": _I,
+        "pct_good": _F, "threshold_q": _F, "dawn": _B, "dusk": _B, "is_night": _B,
+    },
+    # Read both as HourlyZoneStat and as HourlyZoneStatVeh
+    "hourly_zone_stats_3x4": {
+        "site": _S, "day": _S, "ts_hour": _S, "hour_str": _S, "hour": _I,
+        "vehicle_type": _I, "metric": _S,
+        "zone_raw": _S, "zone_row": _I, "zone_col": _I,
+        "frames": _I, "good_frames": _I, "bad_frames": _I, "pct_good": _F,
+        "color": _S, "active": _B, "good_cell": _B, "bad_cell": _B, "dead_cell": _B,
+        "threshold_q": _F,
+    },
+    "peaks_summary": {
+        "site": _S, "day": _S, "metric": _S, "ts_hour": _S, "hour": _I,
+        "frames": _I, "good_frames": _I, "bad_frames": _I,
+        "pct_good": _F, "threshold_q": _F,
+    },
+    "ws_grid_3x4_summary": {
+        "site": _S, "day": _S, "grid_rows": _I, "grid_cols": _I,
+        "cells_total": _I, "cells_active": _I, "cells_good": _I, "cells_bad": _I,
+        "cells_dead": _I, "pct_good_overall": _F,
+        "frames_total": _I, "frames_good": _I, "frames_bad": _I, "threshold_q": _F,
+    },
+    "ws_grid_3x4_zones": {
+        "site": _S, "day": _S, "zone": _S,
+        "frames": _I, "good_frames": _I, "bad_frames": _I,
+        "pct_good": _F, "threshold_q": _F,
+    },
+}
+
+# OUT/_manifest.json: the sources day_view_to_parquet.py converted, rewritten by every run
+MANIFEST_NAME = "_manifest.json"
+
+# pyarrow.csv.ConvertOptions keywords for the exporter's CSVs
+CONVERT_OPTIONS = dict(
+    true_values=["True", "true", "TRUE", "1"],
+    false_values=["False", "false", "FALSE", "0"],
+    null_values=["", "NA", "NaN", "nan", "None", "null"],
+    strings_can_be_null=True,
+)
+
+
+def csv_path(root: str, file_type: str, day: str, site_id: str) -> str:
+    return os.path.join(root, site_id, "DAY_VIEW", day, f"{site_id}_{day}_{file_type}.csv")
+
+
+def parquet_path(out_root: str, file_type: str, day: str, site_id: str) -> str:
+    return os.path.join(out_root, file_type, day, f"{site_id}.parquet")
@@ -0,0 +1,63 @@
+"""
+Response encoding for MCP tool results
+
+Modes:
+  pretty   json.dumps(indent=2), the original output and the default
+  compact  no whitespace, UTF-8 text (Arabic names are not \\u-escaped);
+           uses orjson when it is installed
+  table    compact, and every homogeneous array of objects (e.g. hourly_quality,
+           vehicle_counts_total, trips) becomes {"columns": [...], "rows": [[...]]}
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional accelerator
+    orjson = None
+
+ENCODING_MODES = ("pretty", "compact", "table")
+# Opt in to compact/table with MCP_RESPONSE_ENCODING or --encoding
+DEFAULT_ENCODING = "pretty"
+
+# Arrays shorter than this are left as objects; the header would not pay off
+TABLE_MIN_ROWS = 2
+
+
+def to_table(value: Any) -> Any:
+    """Recursively convert homogeneous lists of dicts into column/row tables"""
+    if isinstance(value, dict):
+        return {k: to_table(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if (len(value) >= TABLE_MIN_ROWS
+                and all(isinstance(row, dict) for row in value)):
+            columns = list(value[0].keys())
+            column_set = set(columns)
+            if all(row.keys() == column_set for row in value):
+                return {
+                    "columns": columns,
+                    "rows": [[to_table(row[c]) for c in columns] for row in value]
+                }
+        return [to_table(v) for v in value]
+    return value
+
+
+def _dumps_compact(value: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass  # types orjson does not know (e.g. sets); fall back to json
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=list)
+
+
+def encode_response(result: Any, mode: str = DEFAULT_ENCODING) -> str:
+    """Serialize a tool result in the given encoding mode"""
+    if mode == "pretty":
+        return json.dumps(result, indent=2)
+    if mode == "compact":
+        return _dumps_compact(result)
+    if mode == "table":
+        return _dumps_compact(to_table(result))
+    raise ValueError(f"Unknown encoding mode: {mode} (expected one of {ENCODING_MODES})")
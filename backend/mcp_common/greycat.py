@@ -0,0 +1,333 @@
+"""
+Async Greycat client shared by the MCP servers
+
+Wraps the pooled transport with the calls the tools need: single function
+calls, bounded-concurrency fan-out over many parameter lists, a cached
+site metadata lookup with street-name and spatial indexes, and an optional
+day-aware response cache. Identical
+calls that are in flight at the same time share one upstream request.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import httpx
+
+from mcp_common.response_cache import ResponseCache, cache_key
+from mcp_common.spatial_index import SpatialIndex
+from mcp_common.street_index import StreetIndex
+from mcp_common.transport import GreycatTransport, shared_transport
+
+GREYCAT_NAMESPACE = "site_queries"
+
+# Fan-out configuration (per-site loops run this many Greycat calls at once)
+GREYCAT_MAX_CONCURRENCY = int(os.environ.get("GREYCAT_MAX_CONCURRENCY", "16"))
+GREYCAT_CALL_RETRIES = int(os.environ.get("GREYCAT_CALL_RETRIES", "2"))
+GREYCAT_RETRY_BACKOFF = 0.25
+
+# Site metadata cache (SiteView fields, warmed from list_sites)
+SITE_CACHE_TTL = float(os.environ.get("SITE_CACHE_TTL", "3600"))
+SITE_CACHE_MAX_SIZE = int(os.environ.get("SITE_CACHE_MAX_SIZE", "4096"))
+SITE_METADATA_FIELDS = (
+    "siteId", "lat", "lon", "numberOfLanes", "direction", "name_ar", "name_en"
+)
+
+
+class SiteMetadataCache:
+    """TTL + LRU cache of site metadata keyed by site_id, with hit/miss counters"""
+
+    def __init__(self, max_size: int = SITE_CACHE_MAX_SIZE, ttl: float = SITE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def peek(self, site_id: str) -> Optional[dict]:
+        """Return fresh metadata for site_id without touching the counters"""
+        entry = self._entries.get(site_id)
+        if entry is None:
+            return None
+        expires_at, metadata = entry
+        if expires_at < time.monotonic():
+            del self._entries[site_id]
+            return None
+        self._entries.move_to_end(site_id)
+        return metadata
+
+    def get(self, site_id: str) -> Optional[dict]:
+        metadata = self.peek(site_id)
+        if metadata is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return metadata
+
+    def put(self, site_id: str, site: dict):
+        metadata = {field: site.get(field) for field in SITE_METADATA_FIELDS}
+        self._entries[site_id] = (time.monotonic() + self.ttl, metadata)
+        self._entries.move_to_end(site_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None
+        }
+
+
+class GreycatClient:
+    """Client for interacting with Greycat API"""
+
+    def __init__(self, base_url: str, namespace: str,
+                 max_concurrency: int = GREYCAT_MAX_CONCURRENCY,
+                 transport: Optional[GreycatTransport] = None,
+                 response_cache: Optional[ResponseCache] = None):
+        self.base_url = base_url
+        self.namespace = namespace
+        self.max_concurrency = max_concurrency
+        self.transport = transport or shared_transport(base_url)
+        self.response_cache = response_cache
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._waiters: dict[asyncio.Future, int] = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+        self.site_cache = SiteMetadataCache()
+        self._site_cache_warmed_at: Optional[float] = None
+        self._site_cache_lock = asyncio.Lock()
+        self.street_index = StreetIndex()
+        self.spatial_index = SpatialIndex()
+
+    async def post_function(self, function_name: str, params: list) -> Any:
+        """
+        POST a Greycat function call, raising on transport or HTTP errors.
+
+        Concurrent calls with the same function and params are coalesced:
+        the first one goes upstream and the others await its result (or
+        error). The shared result must not be mutated. A caller that gives
+        up on a hung call uses abandon_in_flight() so a retry goes upstream
+        again.
+        """
+        cache = self.response_cache
+        if cache is not None and cache.is_cacheable(function_name):
+            hit, value = cache.get(function_name, params)
+            if hit:
+                return value
+
+        key = cache_key(function_name, params)
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced_calls += 1
+        else:
+            self.upstream_calls += 1
+            task = asyncio.ensure_future(self._fetch(function_name, params))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish_in_flight(key, done))
+        # shield: a caller timing out must not cancel the call for the others
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def abandon_in_flight(self, function_name: str, params: list):
+        """
+        Stop coalescing onto the in-flight call: the next identical call
+        goes upstream. The call is cancelled if no one else awaits it.
+        """
+        task = self._in_flight.pop(cache_key(function_name, params), None)
+        if task is not None and task not in self._waiters:
+            task.cancel()
+
+    def _finish_in_flight(self, key: str, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every waiter gave up
+
+    async def _fetch(self, function_name: str, params: list) -> Any:
+        response = await self.transport.request(
+            "POST",
+            f"/{self.namespace}::{function_name}",
+            json=params,
+            headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+        value = response.json()
+        cache = self.response_cache
+        if cache is not None and cache.is_cacheable(function_name):
+            cache.put(function_name, params, value, response.content)
+        return value
+
+    async def call_function(self, function_name: str, params: list) -> dict:
+        """Call a Greycat function via HTTP"""
+        try:
+            return await self.post_function(function_name, params)
+        except httpx.HTTPError as e:
+            return {"error": str(e), "function": function_name}
+
+    async def fan_out(self, function_name: str, params_list: list[list],
+                      timeout: Optional[float] = None,
+                      retries: int = GREYCAT_CALL_RETRIES) -> tuple[list, list]:
+        """
+        Call one Greycat function for many parameter lists concurrently.
+
+        At most `max_concurrency` calls are in flight at once. Each call gets
+        its own timeout (the transport's timeout for the endpoint unless given)
+        and is retried on transport errors, timeouts and 5xx
+        responses. Returns (results, failures): `results` is aligned with
+        `params_list` and holds None where a call failed, `failures` lists
+        {"params", "error"} for each failed call.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        if timeout is None:
+            timeout = self.transport.config.timeout_for(function_name)
+
+        async def call_one(params: list) -> tuple[Any, Optional[str]]:
+            async with semaphore:
+                error = None
+                for attempt in range(retries + 1):
+                    try:
+                        result = await asyncio.wait_for(
+                            self.post_function(function_name, params), timeout
+                        )
+                        return result, None
+                    except httpx.HTTPStatusError as e:
+                        error = str(e)
+                        if e.response.status_code < 500:
+                            break
+                    except asyncio.TimeoutError as e:
+                        error = str(e) or type(e).__name__
+                        # The timed-out request may hang on: retry with a new one
+                        self.abandon_in_flight(function_name, params)
+                    except httpx.HTTPError as e:
+                        error = str(e) or type(e).__name__
+                    if attempt < retries:
+                        await asyncio.sleep(GREYCAT_RETRY_BACKOFF * 2 ** attempt)
+                return None, error
+
+        outcomes = await asyncio.gather(*(call_one(p) for p in params_list))
+
+        results = []
+        failures = []
+        for params, (result, error) in zip(params_list, outcomes):
+            results.append(result)
+            if error is not None:
+                failures.append({"params": params, "error": error})
+        return results, failures
+
+    async def warm_site_cache(self, force: bool = False):
+        """Load metadata for every site with one list_sites call"""
+        async with self._site_cache_lock:
+            now = time.monotonic()
+            if (not force and self._site_cache_warmed_at is not None
+                    and now - self._site_cache_warmed_at < self.site_cache.ttl):
+                return
+            sites = await self.call_function("list_sites", [])
+            if isinstance(sites, dict):
+                return
+            for site in sites:
+                self.site_cache.put(site["siteId"], site)
+            if StreetIndex.signature_of(sites) != self.street_index.signature:
+                self.street_index.rebuild(sites)
+            if SpatialIndex.signature_of(sites) != self.spatial_index.signature:
+                self.spatial_index.rebuild(sites)
+            self._site_cache_warmed_at = now
+
+    async def find_sites_on_street(self, street_name: str) -> list[str]:
+        """Site ids whose English or Arabic name matches street_name (token prefixes)"""
+        await self.warm_site_cache()
+        return self.street_index.lookup(street_name)
+
+    async def get_site_metadata(self, site_ids: list[str]) -> tuple[dict, list]:
+        """
+        Metadata (SiteView fields) for each site, fetched at most once per TTL.
+
+        Misses are filled by warming the cache from list_sites; sites that
+        list_sites does not know are looked up with get_site_details.
+        Returns (metadata by site_id, failures).
+        """
+        found = {}
+        missing = []
+        for site_id in dict.fromkeys(site_ids):
+            metadata = self.site_cache.get(site_id)
+            if metadata is None:
+                missing.append(site_id)
+            else:
+                found[site_id] = metadata
+
+        if not missing:
+            return found, []
+
+        await self.warm_site_cache()
+        unknown = []
+        for site_id in missing:
+            metadata = self.site_cache.peek(site_id)
+            if metadata is None:
+                unknown.append(site_id)
+            else:
+                found[site_id] = metadata
+
+        failures = []
+        if unknown:
+            details, failures = await self.fan_out(
+                "get_site_details", [[site_id] for site_id in unknown]
+            )
+            for site_id, site in zip(unknown, details):
+                if site is not None:
+                    self.site_cache.put(site_id, site)
+                    found[site_id] = self.site_cache.peek(site_id)
+
+        return found, failures
+
+    async def get_street_sites_for_day(self, street_name: str, day: str) -> tuple[list, list]:
+        """
+        SiteDegradationView rows for the sites on a street.
+
+        Matches come from the street index; the day's rows come from one
+        get_site_degradation_for_day call (shared with find_degraded_sites
+        through the response cache), kept in the index's match order.
+        Returns (rows, failures).
+        """
+        site_ids = await self.find_sites_on_street(street_name)
+        if not site_ids:
+            return [], []
+
+        params = [day]
+        try:
+            all_sites = await self.post_function("get_site_degradation_for_day", params)
+        except httpx.HTTPError as e:
+            return [], [{"params": params, "error": str(e)}]
+
+        by_id = {row.get("siteId"): row for row in all_sites or []}
+        return [by_id[site_id] for site_id in site_ids if site_id in by_id], []
+
+    def stats(self) -> dict:
+        return {
+            "site_metadata": self.site_cache.stats(),
+            "street_index": self.street_index.stats(),
+            "spatial_index": self.spatial_index.stats(),
+            "response_cache": self.response_cache.stats() if self.response_cache else None,
+            "coalescing": {
+                "upstream_calls": self.upstream_calls,
+                "coalesced_calls": self.coalesced_calls,
+                "in_flight": len(self._in_flight)
+            },
+            "transport": self.transport.stats()
+        }
+
+    async def close(self):
+        if self.response_cache is not None:
+            self.response_cache.close()
+        await self.transport.aclose()
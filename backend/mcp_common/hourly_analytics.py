@@ -0,0 +1,248 @@
+"""
+Hourly performance analytics for one site (get_site_hourly_performance)
+
+Works on the arrays of a Site as returned by get_site_details. Each array is
+turned into NumPy columns in a single pass and reduced to a (days x 24)
+matrix, so 90 days of history take a few milliseconds:
+
+  - hourly_quality  per-hour good-rate, night/dawn/dusk/day splits and
+                    z-score anomalies against the same hour on the site's
+                    other days
+  - hourly_grid     dead-cell counts per hour and their daily trend
+  - hourly_zones    cells that were dead for most of the requested day
+"""
+
+from datetime import date
+from operator import itemgetter
+from typing import Any, Optional
+
+import numpy as np
+
+# |z| at or above this marks an hour as anomalous
+ANOMALY_Z = 2.5
+# An hour needs at least this many baseline days before it gets a z-score
+MIN_BASELINE_DAYS = 3
+# How many persistent dead cells to report
+PERSISTENT_CELLS_LIMIT = 10
+
+PERIODS = ("night", "dawn", "dusk", "day")
+
+
+def _columns(rows: list[dict], fields: tuple) -> list[tuple]:
+    """One pass over rows, returning one tuple of values per field"""
+    if not rows:
+        return [() for _ in fields]
+    return list(zip(*map(itemgetter(*fields), rows)))
+
+
+def _hours(ts_hours: tuple, hour_strs: tuple) -> np.ndarray:
+    """Hour of day from ts_hour ("YYYY-MM-DD HH:..."), falling back to hour_str"""
+    return np.fromiter(
+        (int(ts[11:13]) if ts and len(ts) >= 13 else int(hs[:2])
+         for ts, hs in zip(ts_hours, hour_strs)),
+        dtype=np.int64, count=len(ts_hours)
+    )
+
+
+def _day_numbers(day_labels: np.ndarray) -> np.ndarray:
+    """
+    Calendar day number (ordinal) of each YYYY-MM-DD / YYYY_MM_DD label, so
+    missing days count; positions if a label is not a day
+    """
+    try:
+        return np.array([date(int(d[0:4]), int(d[5:7]), int(d[8:10])).toordinal() for d in day_labels],
+                        dtype=np.float64)
+    except ValueError:
+        return np.arange(day_labels.size, dtype=np.float64)
+
+
+def _flags(values: tuple) -> np.ndarray:
+    """Nullable booleans as a bool array (null is False)"""
+    return np.fromiter((bool(v) for v in values), dtype=bool, count=len(values))
+
+
+def _number(value: Any, digits: int = 4) -> Optional[float]:
+    """Plain float for the JSON encoder; NaN/inf become None"""
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+
+def _rate(good: Any, frames: Any) -> Optional[float]:
+    return _number(good / frames) if frames else None
+
+
+def _day_hour_matrix(day_index: np.ndarray, hours: np.ndarray,
+                     values: np.ndarray, n_days: int) -> np.ndarray:
+    matrix = np.zeros((n_days, 24))
+    np.add.at(matrix, (day_index, hours % 24), values)
+    return matrix
+
+
+def quality_analytics(hourly_quality: list[dict], day: str) -> dict:
+    """Per-hour good-rate, period splits and baseline anomalies for `day`"""
+    days, hours, frames, good, dawn, dusk, night = _columns(
+        hourly_quality,
+        ("day", "hour", "frames", "good_frames", "dawn", "dusk", "is_night")
+    )
+    day_labels, day_index = np.unique(np.asarray(days, dtype=str), return_inverse=True)
+    hits = np.flatnonzero(day_labels == day)
+    if not hits.size:
+        return {"hourly_performance": [], "periods": {}, "anomalies": [],
+                "baseline": {"days": int(day_labels.size), "min_days": MIN_BASELINE_DAYS,
+                             "anomaly_z": ANOMALY_Z}}
+    target = int(hits[0])
+
+    hours = np.asarray(hours, dtype=np.int64) % 24
+    frames = np.asarray(frames, dtype=np.float64)
+    good = np.asarray(good, dtype=np.float64)
+    n_days = day_labels.size
+
+    frames_m = _day_hour_matrix(day_index, hours, frames, n_days)
+    good_m = _day_hour_matrix(day_index, hours, good, n_days)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate_m = good_m / frames_m
+
+    # Baseline: the same hour on every other day with frames
+    valid = frames_m > 0
+    valid[target] = False
+    n_base = valid.sum(axis=0)
+    base_rates = np.where(valid, rate_m, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = base_rates.sum(axis=0) / n_base
+        var = np.where(valid, (rate_m - mean) ** 2, 0.0).sum(axis=0) / n_base
+        std = np.sqrt(var)
+        z = (rate_m[target] - mean) / std
+    z[(n_base < MIN_BASELINE_DAYS) | ~(std > 0) | ~(frames_m[target] > 0)] = np.nan
+
+    # Period of each hour on the target day (night wins over dawn/dusk)
+    on_day = day_index == target
+    period_of_hour = {}
+    for h, is_dawn, is_dusk, is_night in zip(
+            hours[on_day], _flags(dawn)[on_day], _flags(dusk)[on_day], _flags(night)[on_day]):
+        period_of_hour[int(h)] = ("night" if is_night else "dawn" if is_dawn
+                                  else "dusk" if is_dusk else "day")
+
+    periods = {p: {"hours": 0, "frames": 0, "good_frames": 0} for p in PERIODS}
+    rows = []
+    anomalies = []
+    for h in sorted(period_of_hour):
+        f = int(frames_m[target, h])
+        g = int(good_m[target, h])
+        period = periods[period_of_hour[h]]
+        period["hours"] += 1
+        period["frames"] += f
+        period["good_frames"] += g
+
+        row = {
+            "hour": h,
+            "period": period_of_hour[h],
+            "frames": f,
+            "good_frames": g,
+            "bad_frames": f - g,
+            "good_rate": _rate(g, f),
+            "baseline_good_rate": _number(mean[h]),
+            "baseline_std": _number(std[h]),
+            "z_score": _number(z[h], 2),
+            "anomaly": bool(abs(z[h]) >= ANOMALY_Z) if np.isfinite(z[h]) else False
+        }
+        rows.append(row)
+        if row["anomaly"]:
+            anomalies.append({k: row[k] for k in ("hour", "good_rate", "baseline_good_rate", "z_score")})
+
+    for period in periods.values():
+        period["good_rate"] = _rate(period["good_frames"], period["frames"])
+
+    return {
+        "hourly_performance": rows,
+        "periods": periods,
+        "anomalies": anomalies,
+        "baseline": {
+            "days": int(n_days - 1),
+            "min_days": MIN_BASELINE_DAYS,
+            "anomaly_z": ANOMALY_Z
+        }
+    }
+
+
+def dead_cell_analytics(hourly_grid: list[dict], hourly_zones: list[dict], day: str) -> dict:
+    """Dead-cell count per hour of `day`, daily trend, and persistently dead cells"""
+    days, ts_hours, hour_strs, dead = _columns(
+        hourly_grid, ("day", "ts_hour", "hour_str", "dead_cells")
+    )
+    day_labels, day_index = np.unique(np.asarray(days, dtype=str), return_inverse=True)
+    dead = np.asarray(dead, dtype=np.float64)
+
+    result = {"by_hour": {}, "day_avg": None, "trend_per_day": None,
+              "daily": [], "persistent_cells": []}
+    if day_labels.size:
+        counts = np.bincount(day_index, minlength=day_labels.size)
+        daily_avg = np.bincount(day_index, weights=dead, minlength=day_labels.size) / counts
+        daily_max = np.full(day_labels.size, -np.inf)
+        np.maximum.at(daily_max, day_index, dead)
+
+        result["daily"] = [
+            {"day": str(d), "avg_dead_cells": _number(a, 2), "max_dead_cells": int(m)}
+            for d, a, m in zip(day_labels, daily_avg, daily_max)
+        ]
+        if day_labels.size >= 2:
+            # Per calendar day: days without an import are gaps, not neighbours
+            slope = np.polyfit(_day_numbers(day_labels), daily_avg, 1)[0]
+            result["trend_per_day"] = _number(slope)
+
+        hits = np.flatnonzero(day_labels == day)
+        if hits.size:
+            on_day = day_index == hits[0]
+            hours = _hours(tuple(np.asarray(ts_hours, dtype=object)[on_day]),
+                           tuple(np.asarray(hour_strs, dtype=object)[on_day]))
+            result["by_hour"] = {int(h): int(d) for h, d in zip(hours, dead[on_day])}
+            result["day_avg"] = _number(daily_avg[hits[0]], 2)
+
+    zone_days, zone_ts_hours, zone_hour_strs, zone_rows, zone_cols, zone_dead = _columns(
+        hourly_zones, ("day", "ts_hour", "hour_str", "zone_row", "zone_col", "dead_cell")
+    )
+    if zone_days:
+        on_day = np.asarray(zone_days, dtype=str) == day
+        zone_hours = _hours(tuple(np.asarray(zone_ts_hours, dtype=object)[on_day]),
+                            tuple(np.asarray(zone_hour_strs, dtype=object)[on_day]))
+        # Shares are of the hours the day's zone rows cover (the grid may miss some)
+        hours_on_day = max(np.unique(zone_hours).size, 1)
+        dead_rows = _flags(zone_dead)[on_day]
+        cells = np.stack([np.asarray(zone_rows, dtype=np.int64)[on_day][dead_rows],
+                          np.asarray(zone_cols, dtype=np.int64)[on_day][dead_rows],
+                          zone_hours[dead_rows]], axis=1)
+        if cells.size:
+            # Each dead (cell, hour) once, then dead hours per cell
+            cell_hours = np.unique(cells, axis=0)
+            unique_cells, dead_hours = np.unique(cell_hours[:, :2], axis=0, return_counts=True)
+            order = np.argsort(-dead_hours, kind="stable")[:PERSISTENT_CELLS_LIMIT]
+            result["persistent_cells"] = [
+                {"zone_row": int(unique_cells[i, 0]), "zone_col": int(unique_cells[i, 1]),
+                 "dead_hours": int(dead_hours[i]),
+                 "dead_share": _number(dead_hours[i] / hours_on_day)}
+                for i in order
+            ]
+    return result
+
+
+def site_hourly_performance(site: dict, day: str) -> dict:
+    """Hourly analytics for one site and day from a get_site_details result"""
+    quality = quality_analytics(site.get("hourly_quality") or [], day)
+    dead_cells = dead_cell_analytics(site.get("hourly_grid") or [],
+                                     site.get("hourly_zones") or [], day)
+
+    for row in quality["hourly_performance"]:
+        row["dead_cells"] = dead_cells["by_hour"].get(row["hour"])
+
+    frames = sum(r["frames"] for r in quality["hourly_performance"])
+    good = sum(r["good_frames"] for r in quality["hourly_performance"])
+    return {
+        "summary": {
+            "hours": len(quality["hourly_performance"]),
+            "frames": frames,
+            "good_frames": good,
+            "good_rate": _rate(good, frames),
+            "anomalous_hours": len(quality["anomalies"])
+        },
+        **quality,
+        "dead_cells": {k: v for k, v in dead_cells.items() if k != "by_hour"}
+    }
@@ -0,0 +1,749 @@
+"""
+Offline analytics backend: site_queries functions computed in-process
+
+Answers the Greycat calls the MCP tools make from the same exported files
+the Greycat importers read, without a server on :8080:
+
+  site metadata CSV          list_sites
+  site_counts_total.csv      get_site_vehicle_counts_total, get_site_degradation_for_day
+  site_counts_by_vehicle_type.csv
+                             get_site_vehicle_counts_by_type
+  city_profile_multi/<day>/overall_stats_<day_>.csv
+                             get_city_profile, get_city_overall_stats,
+                             get_city_stats_by_vehicle_type
+  <siteId>/DAY_VIEW/<day>/<siteId>_<day>_<type>.csv (or its Parquet copy
+  from day_view_to_parquet.py)
+                             get_site_day, get_site_details, debug_site,
+                             get_site_rollups, get_city_rollups,
+                             get_vehicle_stats, get_vehicle_types_for_site,
+                             get_all_vehicle_stats
+
+Days are accepted and stored in either spelling (YYYY-MM-DD or
+YYYY_MM_DD): lookups, caches and indexes key them by _day_key (dashed),
+and day folders and Parquet day directories are found under either
+spelling; days are reported dashed. The rollups
+are computed from hourly_quality and hourly_grid_summary like rollups.gcl
+does while importing.
+
+Vehicle plates and trips are not in these files, so the tools built on
+them (TOOL_FUNCTIONS) are hidden by the servers in offline mode; see
+unsupported_tools().
+
+The counts tables are loaded once into Arrow, sorted by (site, day) and
+indexed by NumPy run boundaries, so a site-day lookup is a dict hit plus a
+slice. Per-file tables are memory-mapped and kept in a small LRU.
+Everything loaded or computed (including "no such file" answers and the
+city rollups) is dropped when the snapshot of the input files changes,
+checked at most every snapshot_check_seconds, or on refresh().
+
+OfflineTransport plugs the engine into GreycatClient in place of the HTTP
+transport, so the response cache, coalescing and fan-out work unchanged.
+The MCP servers use it when GREYCAT_BACKEND=offline; it needs numpy and
+pyarrow (requirements-offline.txt).
+"""
+
+import asyncio
+import csv
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Optional
+
+import httpx
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from mcp_common.day_view import CONVERT_OPTIONS, MANIFEST_NAME, SCHEMAS, csv_path, parquet_path
+from mcp_common.transport import GreycatTransport, TransportConfig, endpoint_name
+
+OFFLINE_BASE_URL = "http://offline.greycat"
+
+_S, _I = pa.string(), pa.int64()
+
+SITE_COUNTS_TOTAL_TYPES = {
+    "day": _S, "site": _S, "unique_vehicles": _I,
+    "always_degraded_vehicles": _I, "not_always_degraded_vehicles": _I,
+}
+SITE_COUNTS_BY_TYPE_TYPES = dict(SITE_COUNTS_TOTAL_TYPES, vehicle_type=_I)
+
+# HourlyZoneStat and HourlyZoneStatVeh fields of hourly_zone_stats_3x4
+HOURLY_ZONE_FIELDS = (
+    "site", "day", "ts_hour", "hour_str", "zone_raw", "zone_row", "zone_col",
+    "frames", "good_frames", "bad_frames", "pct_good",
+    "color", "active", "good_cell", "bad_cell", "dead_cell", "threshold_q",
+)
+VEHICLE_STAT_FIELDS = (
+    "site", "day", "vehicle_type", "metric", "ts_hour", "hour",
+    "frames", "good_frames", "bad_frames", "pct_good", "threshold_q",
+)
+
+# SiteDay arrays read from DAY_VIEW files: (file type, fields; None for all)
+SITE_DAY_FILES = {
+    "hourly_grid": ("hourly_grid_summary", None),
+    "hourly_quality": ("hourly_quality", None),
+    "hourly_zones": ("hourly_zone_stats_3x4", HOURLY_ZONE_FIELDS),
+    "ws_grid_daily": ("ws_grid_3x4_summary", None),
+    "ws_zones_daily": ("ws_grid_3x4_zones", None),
+    "peaks_daily": ("peaks_summary", None),
+    "hourly_veh_stats": ("hourly_zone_stats_3x4", VEHICLE_STAT_FIELDS),
+}
+SITE_DAY_FILE_TYPES = tuple(dict.fromkeys(t for t, _ in SITE_DAY_FILES.values()))
+SITE_ARRAYS = (*SITE_DAY_FILES, "vehicle_counts_total", "vehicle_counts_by_type")
+
+ROLLUP_SUM_FIELDS = ("quality_hours", "frames", "good_frames", "bad_frames", "grid_hours", "dead_cells")
+CITY_STAT_INT_FIELDS = (
+    "vehicle_type", "detections_total_all_days", "detections_good_all_days",
+    "detections_missed_all_days", "elapsed_days", "n_sites_total", "unique_cars_all_days",
+    "total_unique_cars", "cars_any_degraded", "cars_no_degrade", "cars_all_sites_degraded",
+)
+CITY_STAT_FLOAT_FIELDS = ("pct_good_all_days", "pct_missed_all_days", "threshold_good")
+
+DAY_VIEW_TABLE_CACHE_SIZE = 256
+
+# Greycat functions behind each MCP tool (the spatial tools and
+# get_cache_stats only need list_sites)
+TOOL_FUNCTIONS = {
+    "list_all_sites": ("list_sites",),
+    "get_site_details": ("get_site_details",),
+    "get_vehicle_details": ("get_vehicle_details",),
+    "get_trip_patterns": ("get_trip_patterns_for_day_page",),
+    "get_city_profile": ("get_city_profile",),
+    "debug_site": ("debug_site",),
+    "analyze_vehicle_trip": ("get_vehicle_details", "get_trips_for_plate"),
+    "compare_sites_on_street": ("get_site_degradation_for_day",),
+    "find_degraded_sites": ("get_site_degradation_for_day",),
+    "get_site_hourly_performance": ("get_site_details", "get_city_profile"),
+    "get_sites_day_status_batch": ("get_site_day", "get_city_profile"),
+    "get_city_profile_range": ("get_city_profile",),
+    "get_health_trend": ("get_site_rollups", "get_city_rollups"),
+}
+
+
+def _env_path(name: str, default: str) -> str:
+    return os.environ.get(name, default)
+
+
+@dataclass
+class OfflineConfig:
+    site_metadata: str = "data/site_metadata/site_meta_final.csv"
+    site_counts_total: str = "data/first half/site_counts_total.csv"
+    site_counts_by_type: str = "data/first half/site_counts_by_vehicle_type.csv"
+    city_profile_root: str = "data/city_profile_multi"
+    day_view_root: str = "data/organized_site_data_uniqueImg_NEW/organized_site_data_uniqueImg_FINAL"
+    parquet_root: Optional[str] = None
+    snapshot_check_seconds: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "OfflineConfig":
+        """
+        Paths from OFFLINE_SITE_METADATA, OFFLINE_SITE_COUNTS_TOTAL,
+        OFFLINE_SITE_COUNTS_BY_TYPE, OFFLINE_CITY_PROFILE_ROOT,
+        OFFLINE_DAY_VIEW_ROOT and OFFLINE_PARQUET_ROOT (defaults: the paths
+        project.gcl imports from), OFFLINE_SNAPSHOT_CHECK_SECONDS
+        """
+        default = cls()
+        return cls(
+            site_metadata=_env_path("OFFLINE_SITE_METADATA", default.site_metadata),
+            site_counts_total=_env_path("OFFLINE_SITE_COUNTS_TOTAL", default.site_counts_total),
+            site_counts_by_type=_env_path("OFFLINE_SITE_COUNTS_BY_TYPE", default.site_counts_by_type),
+            city_profile_root=_env_path("OFFLINE_CITY_PROFILE_ROOT", default.city_profile_root),
+            day_view_root=_env_path("OFFLINE_DAY_VIEW_ROOT", default.day_view_root),
+            parquet_root=os.environ.get("OFFLINE_PARQUET_ROOT") or None,
+            snapshot_check_seconds=float(os.environ.get("OFFLINE_SNAPSHOT_CHECK_SECONDS",
+                                                        str(default.snapshot_check_seconds))),
+        )
+
+
+def _number_or_none(value: Optional[str], cast: Callable) -> Any:
+    value = (value or "").strip()
+    return cast(value) if value else None
+
+
+def _day_forms(day: str) -> tuple[str, str]:
+    """("YYYY-MM-DD", "YYYY_MM_DD") for a day in either form"""
+    return day.replace("_", "-"), day.replace("-", "_")
+
+
+def _day_key(day: str) -> str:
+    """The spelling every day lookup, cache and index is keyed by (YYYY-MM-DD)"""
+    return _day_forms(day)[0]
+
+
+def _day_spellings(day: str) -> tuple[str, ...]:
+    """`day` as given, then its other spellings"""
+    return tuple(dict.fromkeys((day, *_day_forms(day))))
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _rows(table: Optional[pa.Table], fields: Optional[tuple] = None) -> list[dict]:
+    if table is None:
+        return []
+    if fields is not None:
+        table = table.select([f for f in fields if f in table.column_names])
+    return table.to_pylist()
+
+
+def _column_sum(table: pa.Table, column: str) -> int:
+    if column not in table.column_names:
+        return 0
+    return pc.sum(table.column(column)).as_py() or 0
+
+
+def _ratio(part: int, whole: int) -> Optional[float]:
+    return part * 1.0 / whole if whole > 0 else None
+
+
+def _week_start(day: str) -> str:
+    """Monday of the day's week as YYYY-MM-DD (rollup_week_start in rollups.gcl)"""
+    d = date.fromisoformat(_day_key(day))
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+
+def _add_rollup(total: dict, r: dict):
+    for field in ROLLUP_SUM_FIELDS:
+        total[field] += r[field]
+    total["pct_good"] = _ratio(total["good_frames"], total["frames"])
+    total["avg_dead_cells"] = _ratio(total["dead_cells"], total["grid_hours"])
+
+
+def _empty_rollup(**keys) -> dict:
+    return {**keys, **{f: 0 for f in ROLLUP_SUM_FIELDS}, "pct_good": None, "avg_dead_cells": None}
+
+
+def unsupported_tools(functions) -> frozenset[str]:
+    """MCP tools calling a Greycat function that is not in `functions`"""
+    return frozenset(tool for tool, needs in TOOL_FUNCTIONS.items()
+                     if any(f not in functions for f in needs))
+
+
+class SiteDayTable:
+    """
+    An Arrow table sorted by (site, day) with O(1) site-day row ranges;
+    rows keep their day as written, ranges are keyed by _day_key
+    """
+
+    def __init__(self, table: pa.Table):
+        keys = pa.table({"site": table.column("site"),
+                         "day": pc.replace_substring(table.column("day"), "_", "-")})
+        order = pc.sort_indices(keys, sort_keys=[("site", "ascending"), ("day", "ascending")])
+        self.table = table.take(order)
+        keys = keys.take(order)
+        sites = keys.column("site").to_numpy(zero_copy_only=False).astype(str)
+        days = keys.column("day").to_numpy(zero_copy_only=False).astype(str)
+        self.sites, self.days = sites, days
+
+        n = len(sites)
+        if n:
+            change = np.flatnonzero((sites[1:] != sites[:-1]) | (days[1:] != days[:-1])) + 1
+            starts = np.concatenate(([0], change))
+            stops = np.concatenate((change, [n]))
+        else:
+            starts = stops = np.zeros(0, dtype=np.int64)
+        self._ranges = {
+            (sites[a], days[a]): (int(a), int(b)) for a, b in zip(starts, stops)
+        }
+
+    @classmethod
+    def from_csv(cls, path: str, column_types: dict) -> "SiteDayTable":
+        return cls(pacsv.read_csv(path, convert_options=pacsv.ConvertOptions(column_types=column_types)))
+
+    def rows(self, site_id: str, day: str) -> list[dict]:
+        span = self._ranges.get((site_id, _day_key(day)))
+        if span is None:
+            return []
+        start, stop = span
+        return self.table.slice(start, stop - start).to_pylist()
+
+    def site_rows(self, site_id: str) -> list[dict]:
+        """Every row of a site, in day order"""
+        start = int(np.searchsorted(self.sites, site_id, side="left"))
+        stop = int(np.searchsorted(self.sites, site_id, side="right"))
+        return self.table.slice(start, stop - start).to_pylist()
+
+    def day_totals(self, day: str, *columns: str) -> tuple[np.ndarray, list[np.ndarray]]:
+        """(site ids, per-column sums) over the rows of `day`"""
+        mask = self.days == _day_key(day)
+        site_ids, inverse = np.unique(self.sites[mask], return_inverse=True)
+        sums = [
+            np.bincount(inverse, weights=self.table.column(c).to_numpy(zero_copy_only=False)[mask],
+                        minlength=len(site_ids)).astype(np.int64)
+            for c in columns
+        ]
+        return site_ids, sums
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+
+class OfflineEngine:
+    """site_queries functions over the exported files, loaded lazily"""
+
+    def __init__(self, config: Optional[OfflineConfig] = None):
+        self.config = config or OfflineConfig.from_env()
+        self._lock = threading.Lock()
+        self._sites: Optional[list[dict]] = None
+        self._sites_by_id: dict[str, dict] = {}
+        self._counts_total: Optional[SiteDayTable] = None
+        self._counts_by_type: Optional[SiteDayTable] = None
+        self._city_profiles: dict[str, Optional[dict]] = {}
+        self._day_view_tables: OrderedDict[tuple[str, str, str], Optional[pa.Table]] = OrderedDict()
+        self._city_rollups: Optional[list[dict]] = None
+        # Bumped by refresh(), so a load that raced it is not cached
+        self._generation = 0
+        self._snapshot: Optional[tuple] = None
+        self._snapshot_checked: Optional[float] = None
+        self.calls = 0
+        self.refreshes = 0
+
+        self.functions: dict[str, Callable] = {
+            "list_sites": self.list_sites,
+            "get_site_vehicle_counts_total": self.get_site_vehicle_counts_total,
+            "get_site_vehicle_counts_by_type": self.get_site_vehicle_counts_by_type,
+            "get_site_degradation_for_day": self.get_site_degradation_for_day,
+            "get_site_day": self.get_site_day,
+            "get_site_details": self.get_site_details,
+            "debug_site": self.debug_site,
+            "get_site_rollups": self.get_site_rollups,
+            "get_city_rollups": self.get_city_rollups,
+            "get_city_profile": self.get_city_profile,
+            "get_city_overall_stats": self.get_city_overall_stats,
+            "get_city_stats_by_vehicle_type": self.get_city_stats_by_vehicle_type,
+            "get_vehicle_stats": self.get_vehicle_stats,
+            "get_vehicle_types_for_site": self.get_vehicle_types_for_site,
+            "get_all_vehicle_stats": self.get_all_vehicle_stats,
+        }
+
+    def call(self, function_name: str, params: list) -> Any:
+        """Run a site_queries function; KeyError if it has no offline version"""
+        function = self.functions[function_name]
+        self.check_snapshot()
+        self.calls += 1
+        return function(*params)
+
+    # --- snapshot ----------------------------------------------------------
+
+    def snapshot(self) -> tuple:
+        """
+        Modification times of the input files and folders: the counts and
+        metadata CSVs, the city profile root, the DAY_VIEW root and every
+        <siteId>/DAY_VIEW folder (a new day folder changes it), and the
+        Parquet manifest day_view_to_parquet.py rewrites on every run
+        """
+        c = self.config
+        paths = [c.site_metadata, c.site_counts_total, c.site_counts_by_type,
+                 c.city_profile_root, c.day_view_root]
+        if os.path.isdir(c.day_view_root):
+            paths += sorted(os.path.join(entry.path, "DAY_VIEW") for entry in os.scandir(c.day_view_root))
+        if c.parquet_root:
+            paths += [c.parquet_root, os.path.join(c.parquet_root, MANIFEST_NAME)]
+        return tuple((path, _mtime_ns(path)) for path in paths)
+
+    def check_snapshot(self):
+        """refresh() if the snapshot changed; checked at most every snapshot_check_seconds"""
+        now = time.monotonic()
+        with self._lock:
+            checked = self._snapshot_checked
+            if checked is not None and now - checked < self.config.snapshot_check_seconds:
+                return
+            self._snapshot_checked = now
+        snapshot = self.snapshot()
+        with self._lock:
+            changed = self._snapshot is not None and snapshot != self._snapshot
+            self._snapshot = snapshot
+        if changed:
+            self.refresh()
+
+    def refresh(self):
+        """Drop every loaded table and computed result, e.g. after exporting more files"""
+        with self._lock:
+            self._sites = None
+            self._sites_by_id = {}
+            self._counts_total = None
+            self._counts_by_type = None
+            self._city_profiles.clear()
+            self._day_view_tables.clear()
+            self._city_rollups = None
+            self._generation += 1
+            self.refreshes += 1
+
+    # --- loaders -----------------------------------------------------------
+
+    def sites(self) -> list[dict]:
+        with self._lock:
+            if self._sites is None:
+                sites = {}
+                with open(self.config.site_metadata, newline="", encoding="utf-8-sig") as f:
+                    for row in csv.DictReader(f):
+                        site_id = row["location"]
+                        sites[site_id] = {
+                            "siteId": site_id,
+                            "lat": _number_or_none(row.get("geolatitude"), float),
+                            "lon": _number_or_none(row.get("geolongitude"), float),
+                            "numberOfLanes": _number_or_none(row.get("number_of_lanes"), float),
+                            "direction": row.get("Direction") or None,
+                            "name_ar": row.get("Streat_Name_Arabic") or None,
+                            "name_en": row.get("Streat_Name_English") or None,
+                        }
+                self._sites = list(sites.values())
+                self._sites_by_id = sites
+            return self._sites
+
+    def site(self, site_id: str) -> Optional[dict]:
+        self.sites()
+        return self._sites_by_id.get(site_id)
+
+    def counts_total(self) -> SiteDayTable:
+        with self._lock:
+            if self._counts_total is None:
+                self._counts_total = SiteDayTable.from_csv(
+                    self.config.site_counts_total, SITE_COUNTS_TOTAL_TYPES)
+            return self._counts_total
+
+    def counts_by_type(self) -> SiteDayTable:
+        with self._lock:
+            if self._counts_by_type is None:
+                self._counts_by_type = SiteDayTable.from_csv(
+                    self.config.site_counts_by_type, SITE_COUNTS_BY_TYPE_TYPES)
+            return self._counts_by_type
+
+    def _load_city_profile(self, day: str) -> Optional[dict]:
+        dashed, underscored = _day_forms(day)
+        path = os.path.join(self.config.city_profile_root, dashed, f"overall_stats_{underscored}.csv")
+        if not os.path.exists(path):
+            return None
+
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            lines = list(csv.reader(f))
+
+        def parse(header: list[str], values: list[str]) -> dict:
+            row = dict(zip(header, values))
+            stats = {k: _number_or_none(row.get(k), lambda v: int(float(v)))
+                     for k in CITY_STAT_INT_FIELDS if k in row}
+            stats.update({k: _number_or_none(row.get(k), float)
+                          for k in CITY_STAT_FLOAT_FIELDS if k in row})
+            return stats
+
+        # Layout: header, overall row, blank line, header, one row per vehicle type
+        overall = parse(lines[0], lines[1]) if len(lines) >= 2 else {}
+        overall.pop("vehicle_type", None)
+        by_vehicle_type = []
+        if len(lines) >= 4:
+            header = lines[3]
+            day_col = header.index("day") if "day" in header else None
+            for values in lines[4:]:
+                if not values or (day_col is not None and _day_key(values[day_col]) != dashed):
+                    continue
+                by_vehicle_type.append(parse(header, values))
+        return {"day": dashed, "overall": overall, "by_vehicle_type": by_vehicle_type}
+
+    def city_profile(self, day: str) -> Optional[dict]:
+        key = _day_key(day)
+        with self._lock:
+            if key not in self._city_profiles:
+                self._city_profiles[key] = self._load_city_profile(key)
+            return self._city_profiles[key]
+
+    def _load_day_view_table(self, file_type: str, site_id: str, day: str) -> Optional[pa.Table]:
+        """
+        A site-day file: the Parquet copy when there is one, else the
+        DAY_VIEW CSV; both are looked up under either day spelling
+        """
+        days = _day_spellings(day)
+        if self.config.parquet_root:
+            for d in days:
+                path = parquet_path(self.config.parquet_root, file_type, d, site_id)
+                if os.path.exists(path):
+                    return pq.read_table(path, memory_map=True)
+        for d in days:
+            path = csv_path(self.config.day_view_root, file_type, d, site_id)
+            if os.path.exists(path):
+                return pacsv.read_csv(path, convert_options=pacsv.ConvertOptions(
+                    column_types=SCHEMAS[file_type], **CONVERT_OPTIONS))
+        return None
+
+    def day_view_table(self, file_type: str, site_id: str, day: str) -> Optional[pa.Table]:
+        """A site-day DAY_VIEW file as Arrow (None if there is none), LRU cached"""
+        key = (file_type, site_id, _day_key(day))
+        with self._lock:
+            if key in self._day_view_tables:
+                self._day_view_tables.move_to_end(key)
+                return self._day_view_tables[key]
+            generation = self._generation
+        table = self._load_day_view_table(file_type, site_id, day)
+        with self._lock:
+            if generation != self._generation:
+                return table
+            self._day_view_tables[key] = table
+            while len(self._day_view_tables) > DAY_VIEW_TABLE_CACHE_SIZE:
+                self._day_view_tables.popitem(last=False)
+        return table
+
+    def zone_table(self, site_id: str, day: str) -> Optional[pa.Table]:
+        """Per-vehicle hourly zone stats of a site-day"""
+        table = self.day_view_table("hourly_zone_stats_3x4", site_id, day)
+        if table is None:
+            return None
+        return table.select([f for f in VEHICLE_STAT_FIELDS if f in table.column_names])
+
+    def site_days(self, site_id: str) -> list[str]:
+        """Days with a DAY_VIEW folder or Parquet file for the site (dashed, sorted)"""
+        days = set()
+        folder = os.path.join(self.config.day_view_root, site_id, "DAY_VIEW")
+        if os.path.isdir(folder):
+            days.update(os.listdir(folder))
+        if self.config.parquet_root:
+            for file_type in SITE_DAY_FILE_TYPES:
+                type_root = os.path.join(self.config.parquet_root, file_type)
+                if not os.path.isdir(type_root):
+                    continue
+                days.update(d for d in os.listdir(type_root)
+                            if os.path.exists(parquet_path(self.config.parquet_root, file_type, d, site_id)))
+        return sorted({_day_key(d) for d in days})
+
+    def day_view_sites(self) -> list[str]:
+        """Sites with a DAY_VIEW folder or a Parquet hourly_quality / hourly_grid_summary file"""
+        sites = set()
+        root = self.config.day_view_root
+        if os.path.isdir(root):
+            sites.update(name for name in os.listdir(root)
+                         if os.path.isdir(os.path.join(root, name, "DAY_VIEW")))
+        if self.config.parquet_root:
+            for file_type in ("hourly_quality", "hourly_grid_summary"):
+                type_root = os.path.join(self.config.parquet_root, file_type)
+                if not os.path.isdir(type_root):
+                    continue
+                for d in os.listdir(type_root):
+                    sites.update(name[:-len(".parquet")] for name in os.listdir(os.path.join(type_root, d))
+                                 if name.endswith(".parquet"))
+        return sorted(sites)
+
+    def _site_counts(self, table: Callable[[], SiteDayTable], site_id: str,
+                     day: Optional[str] = None) -> list[dict]:
+        """A site's counts rows (one day or all days); [] without the CSV"""
+        try:
+            counts = table()
+        except FileNotFoundError:
+            return []
+        if day is None:
+            return counts.site_rows(site_id)
+        return counts.rows(site_id, day)
+
+    def _day_rollup(self, site_id: str, day: str,
+                    load: Callable[[str, str, str], Optional[pa.Table]]) -> Optional[dict]:
+        """SiteDayRollup of a site-day's hourly_quality and hourly_grid_summary files"""
+        quality = load("hourly_quality", site_id, day)
+        grid = load("hourly_grid_summary", site_id, day)
+        if quality is None and grid is None:
+            return None
+        r = _empty_rollup(siteId=site_id, day=day)
+        r["max_dead_cells"] = 0
+        if quality is not None:
+            r["quality_hours"] = quality.num_rows
+            for field in ("frames", "good_frames", "bad_frames"):
+                r[field] = _column_sum(quality, field)
+        if grid is not None:
+            r["grid_hours"] = grid.num_rows
+            r["dead_cells"] = _column_sum(grid, "dead_cells")
+            if grid.num_rows and "dead_cells" in grid.column_names:
+                r["max_dead_cells"] = pc.max(grid.column("dead_cells")).as_py() or 0
+        r["pct_good"] = _ratio(r["good_frames"], r["frames"])
+        r["avg_dead_cells"] = _ratio(r["dead_cells"], r["grid_hours"])
+        return r
+
+    # --- site_queries functions -------------------------------------------
+
+    def list_sites(self) -> list[dict]:
+        return self.sites()
+
+    def get_site_vehicle_counts_total(self, site_id: str, day: str) -> list[dict]:
+        return self.counts_total().rows(site_id, day)
+
+    def get_site_vehicle_counts_by_type(self, site_id: str, day: str) -> list[dict]:
+        return self.counts_by_type().rows(site_id, day)
+
+    def get_site_degradation_for_day(self, day: str) -> list[dict]:
+        site_ids, (total, degraded) = self.counts_total().day_totals(
+            day, "unique_vehicles", "always_degraded_vehicles")
+        by_site = {s: (int(t), int(d)) for s, t, d in zip(site_ids, total, degraded)}
+
+        out = []
+        for site in self.sites():
+            t, d = by_site.get(site["siteId"], (0, 0))
+            out.append({
+                **site,
+                "unique_vehicles": t,
+                "always_degraded_vehicles": d,
+                "degradation_rate": d * 100.0 / t if t > 0 else None,
+            })
+        return out
+
+    def get_city_profile(self, day: str) -> dict:
+        profile = self.city_profile(day)
+        if profile is None:
+            return {"day": day, "overall": {}, "by_vehicle_type": []}
+        return profile
+
+    def get_city_overall_stats(self, day: str) -> dict:
+        return self.get_city_profile(day)["overall"]
+
+    def get_city_stats_by_vehicle_type(self, day: str) -> list[dict]:
+        return self.get_city_profile(day)["by_vehicle_type"]
+
+    def get_vehicle_stats(self, site_id: str, day: str, vehicle_type: int) -> list[dict]:
+        table = self.zone_table(site_id, day)
+        if table is None or "vehicle_type" not in table.column_names:
+            return []
+        mask = pc.and_(pc.equal(table.column("site"), site_id),
+                       pc.equal(table.column("vehicle_type"), int(vehicle_type)))
+        return table.filter(mask).to_pylist()
+
+    def get_vehicle_types_for_site(self, site_id: str, day: str) -> list[int]:
+        table = self.zone_table(site_id, day)
+        if table is None or "vehicle_type" not in table.column_names:
+            return []
+        types = table.filter(pc.equal(table.column("site"), site_id)).column("vehicle_type")
+        # First-seen order, like the Greycat query
+        return [int(t) for t in dict.fromkeys(types.drop_null().to_pylist())]
+
+    def get_all_vehicle_stats(self, site_id: str, day: str) -> dict:
+        table = self.zone_table(site_id, day)
+        if table is None or "vehicle_type" not in table.column_names:
+            return {}
+        out: dict[int, list[dict]] = {}
+        for row in table.filter(pc.equal(table.column("site"), site_id)).to_pylist():
+            out.setdefault(row["vehicle_type"], []).append(row)
+        return out
+
+    def get_site_day(self, site_id: str, day: str) -> dict:
+        out = {"siteId": site_id, "day": day}
+        for name, (file_type, fields) in SITE_DAY_FILES.items():
+            out[name] = _rows(self.day_view_table(file_type, site_id, day), fields)
+        out["vehicle_counts_total"] = self._site_counts(self.counts_total, site_id, day)
+        out["vehicle_counts_by_type"] = self._site_counts(self.counts_by_type, site_id, day)
+        return out
+
+    def get_site_details(self, site_id: str) -> dict:
+        site = self.site(site_id)
+        out = {**(site or {"siteId": site_id}), **{name: [] for name in SITE_ARRAYS}}
+        if site is None:
+            return out
+        for day in self.site_days(site_id):
+            for name, (file_type, fields) in SITE_DAY_FILES.items():
+                out[name].extend(_rows(self.day_view_table(file_type, site_id, day), fields))
+        out["vehicle_counts_total"] = self._site_counts(self.counts_total, site_id)
+        out["vehicle_counts_by_type"] = self._site_counts(self.counts_by_type, site_id)
+        return out
+
+    def debug_site(self, site_id: str) -> dict:
+        if self.site(site_id) is None:
+            return {"siteId": site_id, **{f"{name}_count": -1 for name in SITE_ARRAYS}}
+        details = self.get_site_details(site_id)
+        return {"siteId": site_id, **{f"{name}_count": len(details[name]) for name in SITE_ARRAYS}}
+
+    def get_site_rollups(self, site_id: str) -> dict:
+        daily = [r for r in (self._day_rollup(site_id, day, self.day_view_table)
+                             for day in self.site_days(site_id)) if r is not None]
+        weekly: dict[str, dict] = {}
+        for r in daily:
+            week = _week_start(r["day"])
+            w = weekly.setdefault(week, _empty_rollup(siteId=site_id, week=week, days=0))
+            w["days"] += 1
+            _add_rollup(w, r)
+        return {"siteId": site_id, "daily": daily, "weekly": [weekly[w] for w in sorted(weekly)]}
+
+    def get_city_rollups(self) -> list[dict]:
+        """Computed once over every site-day (the files are not cached, to spare the LRU)"""
+        with self._lock:
+            if self._city_rollups is not None:
+                return self._city_rollups
+            generation = self._generation
+        by_day: dict[str, dict] = {}
+        for site_id in self.day_view_sites():
+            for day in self.site_days(site_id):
+                r = self._day_rollup(site_id, day, self._load_day_view_table)
+                if r is None:
+                    continue
+                c = by_day.setdefault(day, _empty_rollup(day=day, sites=0))
+                c["sites"] += 1
+                _add_rollup(c, r)
+        rollups = [by_day[d] for d in sorted(by_day)]
+        with self._lock:
+            if generation == self._generation:
+                self._city_rollups = rollups
+        return rollups
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "refreshes": self.refreshes,
+            "sites": len(self._sites) if self._sites is not None else None,
+            "counts_total_rows": len(self._counts_total) if self._counts_total is not None else None,
+            "counts_by_type_rows": len(self._counts_by_type) if self._counts_by_type is not None else None,
+            "city_profiles": len(self._city_profiles),
+            "day_view_tables": len(self._day_view_tables),
+            "city_rollup_days": len(self._city_rollups) if self._city_rollups is not None else None,
+        }
+
+
+class _EngineHTTPTransport(httpx.AsyncBaseTransport, httpx.BaseTransport):
+    """httpx transport answering POST /<namespace>::<function> from an OfflineEngine"""
+
+    def __init__(self, engine: OfflineEngine):
+        self.engine = engine
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        function_name = endpoint_name(request.url.path)
+        params = json.loads(request.content or b"[]")
+        if function_name not in self.engine.functions:
+            return httpx.Response(404, json={"error": f"{function_name} has no offline implementation"})
+        try:
+            value = self.engine.call(function_name, params)
+        except (TypeError, ValueError) as e:
+            return httpx.Response(400, json={"error": str(e)})
+        except FileNotFoundError as e:
+            return httpx.Response(503, json={"error": str(e)})
+        return httpx.Response(200, json=value)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._respond(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        # Loading a table can take a while; keep the event loop free
+        return await asyncio.to_thread(self._respond, request)
+
+
+class OfflineTransport(GreycatTransport):
+    """GreycatTransport whose requests are served by an OfflineEngine"""
+
+    def __init__(self, engine: Optional[OfflineEngine] = None,
+                 config: Optional[TransportConfig] = None):
+        super().__init__(config or TransportConfig.from_env(base_url=OFFLINE_BASE_URL))
+        self.engine = engine or OfflineEngine()
+
+    def _client_kwargs(self) -> dict:
+        return {
+            "base_url": self.config.base_url,
+            "transport": _EngineHTTPTransport(self.engine),
+            "timeout": httpx.Timeout(self.config.default_timeout),
+        }
+
+    def unsupported_tools(self) -> frozenset[str]:
+        """MCP tools this backend cannot serve (see TOOL_FUNCTIONS)"""
+        return unsupported_tools(self.engine.functions)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "offline": self.engine.stats()}
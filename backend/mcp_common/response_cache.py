@@ -0,0 +1,239 @@
+"""
+Response cache in front of Greycat, keyed by (function, params)
+
+Imported days never change, so results for a past day are kept until evicted.
+Results for today (or a later day, or an unparsable one) expire after a short
+TTL because the day may still be importing. Results with no day parameter,
+such as get_site_details (full history) and list_sites, use a medium TTL.
+Empty placeholders (Greycat returns an empty object for a day or site it does
+not know yet, and a ranking row with no values for every site) are treated
+like today so a late import shows up. Rankings over every site change while
+a past day is bulk-imported site by site, so they are kept at most
+aggregate_ttl.
+
+Two tiers:
+  - memory: LRU bounded by the total size of the JSON bodies
+  - disk (optional): sqlite file holding the raw JSON bodies, shared across
+    restarts; hits are promoted to memory
+
+Cached values are shared between callers and must not be mutated.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Optional
+
+# function name -> index of its day parameter (None: no day, medium TTL)
+CACHE_POLICIES = {
+    "get_city_profile": 0,
+    "get_city_overall_stats": 0,
+    "get_city_stats_by_vehicle_type": 0,
+    "get_trip_patterns_for_day": 0,
+    "get_trip_patterns_for_day_page": 0,
+    "get_site_degradation_for_day": 0,
+    "get_trips_for_plate": 1,
+    "get_site_vehicle_counts_total": 1,
+    "get_site_vehicle_counts_by_type": 1,
+    "get_site_day": 1,
+    "get_site_details": None,
+    "list_sites": None,
+    "get_site_rollups": None,
+    "get_city_rollups": None,
+}
+
+# Functions that answer one row per site even for a day not imported yet:
+# function name -> the row field that is null for every site until then
+PLACEHOLDER_ROW_FIELDS = {
+    "get_site_degradation_for_day": "degradation_rate",
+}
+
+# Results aggregated over every site: kept at most aggregate_ttl, even for a past day
+AGGREGATE_FUNCTIONS = frozenset({"get_site_degradation_for_day"})
+
+NEVER = float("inf")
+
+
+def parse_day(value: Any) -> Optional[date]:
+    """Parse YYYY-MM-DD or YYYY_MM_DD; None if it is not a day"""
+    if not isinstance(value, str) or len(value) != 10:
+        return None
+    try:
+        return date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+    except ValueError:
+        return None
+
+
+def is_placeholder(value: Any, row_field: Optional[str] = None) -> bool:
+    """
+    Empty result, an object whose array fields are all empty, or (with
+    row_field) rows whose row_field is null in every row
+    """
+    if not value:
+        return True
+    if isinstance(value, dict):
+        arrays = [v for v in value.values() if isinstance(v, list)]
+        return bool(arrays) and not any(arrays)
+    if row_field is not None and isinstance(value, list):
+        return all(not isinstance(row, dict) or row.get(row_field) is None for row in value)
+    return False
+
+
+def cache_key(function_name: str, params: list) -> str:
+    return json.dumps([function_name, params], separators=(",", ":"), ensure_ascii=False)
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional sqlite) cache of Greycat results"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024,
+                 disk_path: Optional[str] = None,
+                 today_ttl: float = 60.0,
+                 undated_ttl: float = 300.0,
+                 aggregate_ttl: float = 3600.0):
+        self.max_bytes = max_bytes
+        self.today_ttl = today_ttl
+        self.undated_ttl = undated_ttl
+        self.aggregate_ttl = aggregate_ttl
+        self.disk_path = disk_path
+
+        self._entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._disk_lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, expires_at REAL, body BLOB)"
+            )
+            self._disk.commit()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """
+        MCP_CACHE_MAX_BYTES, MCP_CACHE_DISK_PATH (unset: memory only),
+        MCP_CACHE_TODAY_TTL, MCP_CACHE_UNDATED_TTL and MCP_CACHE_AGGREGATE_TTL
+        (seconds)
+        """
+        env = os.environ
+        return cls(
+            max_bytes=int(env.get("MCP_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+            disk_path=env.get("MCP_CACHE_DISK_PATH") or None,
+            today_ttl=float(env.get("MCP_CACHE_TODAY_TTL", "60")),
+            undated_ttl=float(env.get("MCP_CACHE_UNDATED_TTL", "300")),
+            aggregate_ttl=float(env.get("MCP_CACHE_AGGREGATE_TTL", "3600")),
+        )
+
+    def is_cacheable(self, function_name: str) -> bool:
+        return function_name in CACHE_POLICIES
+
+    def ttl_for(self, function_name: str, params: list, value: Any = None) -> float:
+        """Seconds to keep a result: NEVER for past days (aggregate_ttl for rankings)"""
+        if is_placeholder(value, PLACEHOLDER_ROW_FIELDS.get(function_name)):
+            return self.today_ttl
+        day_index = CACHE_POLICIES.get(function_name)
+        if day_index is None:
+            return self.undated_ttl
+        day = parse_day(params[day_index]) if day_index < len(params) else None
+        if day is not None and day < date.today():
+            return self.aggregate_ttl if function_name in AGGREGATE_FUNCTIONS else NEVER
+        return self.today_ttl
+
+    def get(self, function_name: str, params: list) -> tuple[bool, Any]:
+        """(True, value) on a fresh hit, (False, None) otherwise"""
+        key = cache_key(function_name, params)
+        now = time.time()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, size, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, value
+            self._remove(key)
+
+        if self._disk is not None:
+            with self._disk_lock:
+                row = self._disk.execute(
+                    "SELECT expires_at, body FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            if row is not None:
+                expires_at = NEVER if row[0] is None else row[0]
+                if expires_at > now:
+                    value = json.loads(row[1])
+                    self._store(key, expires_at, len(row[1]), value)
+                    self.disk_hits += 1
+                    return True, value
+
+        self.misses += 1
+        return False, None
+
+    def put(self, function_name: str, params: list, value: Any, body: bytes):
+        """Cache a decoded result; `body` is its raw JSON (used for sizing and disk)"""
+        ttl = self.ttl_for(function_name, params, value)
+        expires_at = NEVER if ttl == NEVER else time.time() + ttl
+        key = cache_key(function_name, params)
+        self._store(key, expires_at, len(body), value)
+
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO responses (key, expires_at, body) VALUES (?, ?, ?)",
+                    (key, None if expires_at == NEVER else expires_at, body)
+                )
+                self._disk.commit()
+
+    def _store(self, key: str, expires_at: float, size: int, value: Any):
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        """Drop every entry, e.g. after re-importing a day"""
+        self._entries.clear()
+        self._bytes = 0
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute("DELETE FROM responses")
+                self._disk.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "disk_path": self.disk_path,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else None
+        }
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
@@ -0,0 +1,180 @@
+"""
+Spatial index over the site list (sites_near, sites_in_bbox, sites_along_corridor)
+
+A grid hash built with NumPy: every site gets a cell (row, col) of
+CELL_DEG degrees, and sites are sorted by the cell key row * n_cols + col.
+The cells of one grid row are then a contiguous key range, so a bounding
+box costs one searchsorted per grid row it spans plus an exact filter on
+the few candidates. Distances are haversine metres.
+"""
+
+import math
+from typing import Iterable, Optional
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_000.0
+METRES_PER_DEG_LAT = 111_320.0
+
+# ~1.1 km cells: a 2 km radius query touches a handful of grid rows
+CELL_DEG = 0.01
+
+SITE_FIELDS = ("siteId", "name_en", "name_ar", "lat", "lon", "direction")
+
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """Grid-hash index of site coordinates"""
+
+    def __init__(self, sites: Iterable[dict] = (), cell_deg: float = CELL_DEG):
+        self.cell_deg = cell_deg
+        self.signature = None
+        self.rebuild(sites)
+
+    @staticmethod
+    def signature_of(sites: Iterable[dict]) -> int:
+        """Changes whenever a site is added, removed or moved"""
+        return hash(frozenset((s["siteId"], s.get("lat"), s.get("lon")) for s in sites))
+
+    def rebuild(self, sites: Iterable[dict]):
+        sites = list(sites)
+        located = [s for s in sites if s.get("lat") is not None and s.get("lon") is not None]
+
+        lats = np.fromiter((s["lat"] for s in located), dtype=np.float64, count=len(located))
+        lons = np.fromiter((s["lon"] for s in located), dtype=np.float64, count=len(located))
+        if located:
+            self.lat0, self.lon0 = float(lats.min()), float(lons.min())
+            rows = ((lats - self.lat0) // self.cell_deg).astype(np.int64)
+            cols = ((lons - self.lon0) // self.cell_deg).astype(np.int64)
+            self.n_rows, self.n_cols = int(rows.max()) + 1, int(cols.max()) + 1
+            keys = rows * self.n_cols + cols
+        else:
+            self.lat0 = self.lon0 = 0.0
+            self.n_rows = self.n_cols = 0
+            keys = np.zeros(0, dtype=np.int64)
+
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._lats = lats[order]
+        self._lons = lons[order]
+        self._sites = [{f: located[i].get(f) for f in SITE_FIELDS} for i in order]
+        self.unlocated = len(sites) - len(located)
+        self.signature = self.signature_of(sites)
+
+    def __len__(self) -> int:
+        return len(self._sites)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return (math.floor((lat - self.lat0) / self.cell_deg),
+                math.floor((lon - self.lon0) / self.cell_deg))
+
+    def _candidates(self, min_lat: float, min_lon: float,
+                    max_lat: float, max_lon: float) -> np.ndarray:
+        """Positions of sites in the grid cells overlapping the box"""
+        if not len(self):
+            return np.zeros(0, dtype=np.int64)
+        r0, c0 = self._cell(min_lat, min_lon)
+        r1, c1 = self._cell(max_lat, max_lon)
+        r0, r1 = max(r0, 0), min(r1, self.n_rows - 1)
+        c0, c1 = max(c0, 0), min(c1, self.n_cols - 1)
+        if r0 > r1 or c0 > c1:
+            return np.zeros(0, dtype=np.int64)
+
+        row_keys = np.arange(r0, r1 + 1, dtype=np.int64) * self.n_cols
+        starts = np.searchsorted(self._keys, row_keys + c0, side="left")
+        ends = np.searchsorted(self._keys, row_keys + c1, side="right")
+        spans = [np.arange(s, e) for s, e in zip(starts, ends) if e > s]
+        return np.concatenate(spans) if spans else np.zeros(0, dtype=np.int64)
+
+    def _rows(self, positions: Iterable[int], distances: Optional[np.ndarray] = None,
+              **extra: np.ndarray) -> list[dict]:
+        out = []
+        for n, i in enumerate(positions):
+            row = dict(self._sites[i])
+            if distances is not None:
+                row["distance_m"] = round(float(distances[n]), 1)
+            for name, values in extra.items():
+                row[name] = round(float(values[n]), 1)
+            out.append(row)
+        return out
+
+    def in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                limit: Optional[int] = None) -> list[dict]:
+        """Sites inside the box, ordered by site id"""
+        cand = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        lats, lons = self._lats[cand], self._lons[cand]
+        hits = cand[(lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)]
+        hits = sorted(hits, key=lambda i: self._sites[i]["siteId"])
+        return self._rows(hits[:limit])
+
+    def near(self, lat: float, lon: float, radius_m: float,
+             limit: Optional[int] = None) -> list[dict]:
+        """Sites within radius_m of the point, nearest first, with distance_m"""
+        dlat = radius_m / METRES_PER_DEG_LAT
+        dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+        cand = self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+        dist = haversine_m(lat, lon, self._lats[cand], self._lons[cand])
+        inside = dist <= radius_m
+        cand, dist = cand[inside], dist[inside]
+        order = np.argsort(dist, kind="stable")[:limit]
+        return self._rows(cand[order], dist[order])
+
+    def along_corridor(self, points: list[tuple[float, float]], width_m: float,
+                       limit: Optional[int] = None) -> list[dict]:
+        """
+        Sites within width_m of the polyline through `points` (lat, lon),
+        ordered along the path. Each row has distance_m (to the path) and
+        along_m (distance from the first point to the site's projection).
+        Uses a local equirectangular projection, fine for city-scale paths.
+        """
+        if not points:
+            return []
+        if len(points) == 1:
+            points = [points[0], points[0]]
+
+        lat_ref = math.radians(sum(p[0] for p in points) / len(points))
+        mx = METRES_PER_DEG_LAT * math.cos(lat_ref)
+        my = METRES_PER_DEG_LAT
+
+        best_dist: dict[int, float] = {}
+        best_along: dict[int, float] = {}
+        along_start = 0.0
+        for (lat_a, lon_a), (lat_b, lon_b) in zip(points, points[1:]):
+            dlat = width_m / my
+            dlon = width_m / mx
+            cand = self._candidates(min(lat_a, lat_b) - dlat, min(lon_a, lon_b) - dlon,
+                                    max(lat_a, lat_b) + dlat, max(lon_a, lon_b) + dlon)
+
+            # Segment and candidates in metres relative to point a
+            sx, sy = (lon_b - lon_a) * mx, (lat_b - lat_a) * my
+            px, py = (self._lons[cand] - lon_a) * mx, (self._lats[cand] - lat_a) * my
+            seg_len2 = sx * sx + sy * sy
+            t = np.clip((px * sx + py * sy) / seg_len2, 0.0, 1.0) if seg_len2 else np.zeros(len(cand))
+            dist = np.hypot(px - t * sx, py - t * sy)
+            seg_len = math.sqrt(seg_len2)
+
+            for i, d, tt in zip(cand[dist <= width_m], dist[dist <= width_m], t[dist <= width_m]):
+                i = int(i)
+                if d < best_dist.get(i, math.inf):
+                    best_dist[i] = float(d)
+                    best_along[i] = along_start + float(tt) * seg_len
+            along_start += seg_len
+
+        hits = sorted(best_dist, key=lambda i: (best_along[i], best_dist[i]))[:limit]
+        return self._rows(hits, np.array([best_dist[i] for i in hits]),
+                          along_m=np.array([best_along[i] for i in hits]))
+
+    def stats(self) -> dict:
+        return {
+            "sites": len(self),
+            "unlocated_sites": self.unlocated,
+            "cell_deg": self.cell_deg,
+            "grid": [self.n_rows, self.n_cols]
+        }
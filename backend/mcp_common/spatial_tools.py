@@ -0,0 +1,101 @@
+"""
+sites_near / sites_in_bbox / sites_along_corridor tools shared by the MCP servers
+
+The schemas are plain dicts (the servers wrap them in mcp.types.Tool) and
+the queries run against the client's in-process SpatialIndex.
+"""
+
+from mcp_common.greycat import GreycatClient
+
+# Result size
+SPATIAL_DEFAULT_LIMIT = 50
+SPATIAL_MAX_LIMIT = 500
+
+_LIMIT_SCHEMA = {
+    "type": "integer",
+    "description": f"Maximum number of sites (default: {SPATIAL_DEFAULT_LIMIT}, max: {SPATIAL_MAX_LIMIT})"
+}
+
+SPATIAL_TOOL_SCHEMAS = [
+    {
+        "name": "sites_near",
+        "description": "Find camera sites within a radius of a point, nearest first (distance in metres)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "lat": {"type": "number", "description": "Latitude of the point"},
+                "lon": {"type": "number", "description": "Longitude of the point"},
+                "radius_m": {"type": "number", "description": "Search radius in metres (default: 2000)"},
+                "limit": _LIMIT_SCHEMA
+            },
+            "required": ["lat", "lon"]
+        }
+    },
+    {
+        "name": "sites_in_bbox",
+        "description": "Find camera sites inside a latitude/longitude bounding box",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "min_lat": {"type": "number"},
+                "min_lon": {"type": "number"},
+                "max_lat": {"type": "number"},
+                "max_lon": {"type": "number"},
+                "limit": _LIMIT_SCHEMA
+            },
+            "required": ["min_lat", "min_lon", "max_lat", "max_lon"]
+        }
+    },
+    {
+        "name": "sites_along_corridor",
+        "description": "Find camera sites within a distance of a path (e.g. a trip route), ordered along the path",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "points": {
+                    "type": "array",
+                    "items": {"type": "array", "items": {"type": "number"}},
+                    "description": "Path as [[lat, lon], ...]"
+                },
+                "width_m": {"type": "number", "description": "Maximum distance from the path in metres (default: 200)"},
+                "limit": _LIMIT_SCHEMA
+            },
+            "required": ["points"]
+        }
+    },
+]
+
+SPATIAL_TOOL_NAMES = tuple(schema["name"] for schema in SPATIAL_TOOL_SCHEMAS)
+
+
+def spatial_limit(arguments: dict) -> int:
+    """Result cap for the spatial tools"""
+    limit = int(arguments.get("limit", SPATIAL_DEFAULT_LIMIT))
+    return min(max(limit, 1), SPATIAL_MAX_LIMIT)
+
+
+async def spatial_query(greycat: GreycatClient, name: str, arguments: dict) -> dict:
+    """sites_near / sites_in_bbox / sites_along_corridor against the in-process spatial index"""
+    await greycat.warm_site_cache()
+    index = greycat.spatial_index
+    limit = spatial_limit(arguments)
+
+    if name == "sites_near":
+        query = {
+            "lat": float(arguments["lat"]),
+            "lon": float(arguments["lon"]),
+            "radius_m": float(arguments.get("radius_m", 2000))
+        }
+        sites = index.near(query["lat"], query["lon"], query["radius_m"], limit)
+    elif name == "sites_in_bbox":
+        query = {k: float(arguments[k]) for k in ("min_lat", "min_lon", "max_lat", "max_lon")}
+        sites = index.in_bbox(query["min_lat"], query["min_lon"],
+                              query["max_lat"], query["max_lon"], limit)
+    else:
+        query = {
+            "points": [(float(p[0]), float(p[1])) for p in arguments["points"]],
+            "width_m": float(arguments.get("width_m", 200))
+        }
+        sites = index.along_corridor(query["points"], query["width_m"], limit)
+
+    return {"query": query, "count": len(sites), "sites": sites}
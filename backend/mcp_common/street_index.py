@@ -0,0 +1,113 @@
+"""
+Street-name index over the site list (compare_sites_on_street)
+
+Site names (name_en and name_ar) are normalized and split into tokens; every
+token maps to the sites that carry it. A query matches the sites that have,
+for each query token, a name token starting with it ("king fah" finds
+"King Fahd Rd"), so a lookup costs O(matching tokens + matching sites)
+instead of a scan over every site.
+
+Normalization folds case and the common Arabic spelling variants:
+  - diacritics (harakat, shadda, sukun, superscript alef) and tatweel removed
+  - alef variants (أ إ آ ٱ) -> ا
+  - taa marbuta (ة) -> ه, alef maqsura (ى) -> ي
+  - punctuation -> space
+Arabic tokens are also indexed without the definite article, so "امير"
+finds "الأمير".
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Iterable
+
+# harakat, shadda, sukun, superscript alef, Quranic marks and tatweel
+_ARABIC_DIACRITICS = re.compile("[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+_ARABIC_LETTERS = str.maketrans({
+    "\u0623": "\u0627",  # alef with hamza above -> alef
+    "\u0625": "\u0627",  # alef with hamza below -> alef
+    "\u0622": "\u0627",  # alef with madda -> alef
+    "\u0671": "\u0627",  # alef wasla -> alef
+    "\u0629": "\u0647",  # taa marbuta -> haa
+    "\u0649": "\u064A",  # alef maqsura -> yaa
+})
+_SEPARATORS = re.compile(r"[\W_]+", re.UNICODE)
+_ARABIC_ARTICLE = "\u0627\u0644"  # al-
+
+
+def normalize(text: str) -> str:
+    """Case-folded, Arabic-normalized text with punctuation turned into spaces"""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = _ARABIC_DIACRITICS.sub("", text).translate(_ARABIC_LETTERS)
+    return _SEPARATORS.sub(" ", text).strip()
+
+
+def tokenize(text: str) -> list[str]:
+    return normalize(text).split()
+
+
+def index_tokens(text: str) -> set[str]:
+    """Tokens to index for a name, plus article-less forms of Arabic tokens"""
+    tokens = set(tokenize(text))
+    for token in list(tokens):
+        if token.startswith(_ARABIC_ARTICLE) and len(token) > len(_ARABIC_ARTICLE) + 1:
+            tokens.add(token[len(_ARABIC_ARTICLE):])
+    return tokens
+
+
+class StreetIndex:
+    """Inverted index from normalized name tokens to site ids"""
+
+    NAME_FIELDS = ("name_en", "name_ar")
+
+    def __init__(self, sites: Iterable[dict] = ()):
+        self._postings: dict[str, set[str]] = {}
+        self._tokens: list[str] = []
+        self.signature = None
+        self.rebuild(sites)
+
+    @classmethod
+    def signature_of(cls, sites: Iterable[dict]) -> int:
+        """Changes whenever a site is added, removed or renamed"""
+        return hash(frozenset(
+            (site["siteId"],) + tuple(site.get(f) for f in cls.NAME_FIELDS) for site in sites
+        ))
+
+    def rebuild(self, sites: Iterable[dict]):
+        sites = list(sites)
+        postings: dict[str, set[str]] = {}
+        for site in sites:
+            for field in self.NAME_FIELDS:
+                for token in index_tokens(site.get(field) or ""):
+                    postings.setdefault(token, set()).add(site["siteId"])
+        self._postings = postings
+        self._tokens = sorted(postings)
+        self.signature = self.signature_of(sites)
+
+    def _prefix_matches(self, prefix: str) -> set[str]:
+        matches: set[str] = set()
+        i = bisect_left(self._tokens, prefix)
+        while i < len(self._tokens) and self._tokens[i].startswith(prefix):
+            matches |= self._postings[self._tokens[i]]
+            i += 1
+        return matches
+
+    def lookup(self, street_name: str) -> list[str]:
+        """Site ids whose name has a token starting with every query token"""
+        query = tokenize(street_name)
+        if not query:
+            return []
+        # Rarest tokens first so the intersection shrinks quickly
+        candidates = sorted((self._prefix_matches(t) for t in query), key=len)
+        result = candidates[0]
+        for matches in candidates[1:]:
+            if not result:
+                break
+            result = result & matches
+        return sorted(result)
+
+    def stats(self) -> dict:
+        return {
+            "tokens": len(self._tokens),
+            "postings": sum(len(p) for p in self._postings.values())
+        }
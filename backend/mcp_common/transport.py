@@ -0,0 +1,268 @@
+"""
+Shared HTTP transport for every MCP server that talks to the backend on :8080
+
+One pooled httpx client per process and base URL, with:
+  - explicit keep-alive pool sizing
+  - optional HTTP/2 (needs the `h2` package; falls back to HTTP/1.1 without it)
+  - per-endpoint timeouts
+  - connection reuse metrics (new TCP connections vs. requests served)
+
+Configuration comes from the environment (see TransportConfig.from_env), so the
+stdio, HTTP/SSE and FastMCP servers are tuned the same way.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (only needed for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_BASE_URL = "http://localhost:8080"
+
+# Endpoints known to return large payloads get more time than the default
+DEFAULT_ENDPOINT_TIMEOUTS = {
+    "get_site_details": 60.0,
+    "get_trip_patterns_for_day_page": 120.0,
+}
+
+
+def parse_endpoint_timeouts(spec: str) -> dict[str, float]:
+    """Parse "name=seconds,name=seconds" into a dict"""
+    timeouts = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+def endpoint_name(path: str) -> str:
+    """Endpoint key for timeouts and metrics: "/site_queries::list_sites" -> "list_sites" """
+    path = path.split("?", 1)[0].rstrip("/")
+    return path.rsplit("::", 1)[-1].rsplit("/", 1)[-1]
+
+
+@dataclass
+class TransportConfig:
+    base_url: str = DEFAULT_BASE_URL
+    max_connections: int = 100
+    max_keepalive_connections: int = 32
+    keepalive_expiry: float = 120.0
+    http2: bool = False
+    connect_timeout: float = 5.0
+    default_timeout: float = 30.0
+    endpoint_timeouts: dict[str, float] = field(
+        default_factory=lambda: dict(DEFAULT_ENDPOINT_TIMEOUTS)
+    )
+
+    @classmethod
+    def from_env(cls, **overrides) -> "TransportConfig":
+        """
+        Build a config from GREYCAT_* environment variables:
+        GREYCAT_BASE_URL, GREYCAT_MAX_CONNECTIONS, GREYCAT_MAX_KEEPALIVE,
+        GREYCAT_KEEPALIVE_EXPIRY, GREYCAT_HTTP2 (1/0), GREYCAT_CONNECT_TIMEOUT,
+        GREYCAT_CALL_TIMEOUT and GREYCAT_ENDPOINT_TIMEOUTS ("name=seconds,...").
+        Keyword overrides win over the environment.
+        """
+        env = os.environ
+        config = cls(
+            base_url=env.get("GREYCAT_BASE_URL", DEFAULT_BASE_URL),
+            max_connections=int(env.get("GREYCAT_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(env.get("GREYCAT_MAX_KEEPALIVE", "32")),
+            keepalive_expiry=float(env.get("GREYCAT_KEEPALIVE_EXPIRY", "120")),
+            http2=env.get("GREYCAT_HTTP2", "0").lower() in ("1", "true", "yes"),
+            connect_timeout=float(env.get("GREYCAT_CONNECT_TIMEOUT", "5")),
+            default_timeout=float(env.get("GREYCAT_CALL_TIMEOUT", "30")),
+        )
+        config.endpoint_timeouts.update(
+            parse_endpoint_timeouts(env.get("GREYCAT_ENDPOINT_TIMEOUTS", ""))
+        )
+        for key, value in overrides.items():
+            setattr(config, key, value)
+        return config
+
+    def timeout_for(self, endpoint: str) -> float:
+        return self.endpoint_timeouts.get(endpoint, self.default_timeout)
+
+
+class TransportMetrics:
+    """Request and connection counters, overall and per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.endpoints: dict[str, dict] = {}
+
+    def connection_opened(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+            stats = self.endpoints.setdefault(
+                endpoint, {"requests": 0, "errors": 0, "total_seconds": 0.0}
+            )
+            stats["requests"] += 1
+            stats["total_seconds"] += seconds
+            if not ok:
+                stats["errors"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_rate": round(reused / self.requests, 4) if self.requests else None,
+                "endpoints": {
+                    name: {
+                        "requests": s["requests"],
+                        "errors": s["errors"],
+                        "avg_ms": round(1000 * s["total_seconds"] / s["requests"], 2)
+                    }
+                    for name, s in self.endpoints.items()
+                }
+            }
+
+
+class GreycatTransport:
+    """
+    Pooled keep-alive HTTP transport (async and sync) with metrics.
+    async_transport replaces the network for async requests (e.g.
+    httpx.ASGITransport to serve an app in-process).
+    """
+
+    def __init__(self, config: Optional[TransportConfig] = None,
+                 async_transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.config = config or TransportConfig.from_env()
+        self.metrics = TransportMetrics()
+        self.http2 = self.config.http2 and HTTP2_AVAILABLE
+        self.async_transport = async_transport
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._sync_client: Optional[httpx.Client] = None
+
+    def _client_kwargs(self) -> dict:
+        return {
+            "base_url": self.config.base_url,
+            "http2": self.http2,
+            "limits": httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry,
+            ),
+            "timeout": httpx.Timeout(
+                self.config.default_timeout, connect=self.config.connect_timeout
+            ),
+        }
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            kwargs = self._client_kwargs()
+            if self.async_transport is not None:
+                kwargs["transport"] = self.async_transport
+            self._async_client = httpx.AsyncClient(**kwargs)
+        return self._async_client
+
+    @property
+    def sync_client(self) -> httpx.Client:
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(**self._client_kwargs())
+        return self._sync_client
+
+    def _timeout(self, endpoint: str) -> httpx.Timeout:
+        return httpx.Timeout(
+            self.config.timeout_for(endpoint), connect=self.config.connect_timeout
+        )
+
+    def _on_trace_event(self, event_name: str):
+        if event_name == "connection.connect_tcp.complete":
+            self.metrics.connection_opened()
+
+    async def _async_trace(self, event_name: str, info: dict):
+        self._on_trace_event(event_name)
+
+    def _sync_trace(self, event_name: str, info: dict):
+        self._on_trace_event(event_name)
+
+    async def request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Send a request on the shared async pool; raises httpx errors like httpx does"""
+        endpoint = endpoint_name(path)
+        kwargs.setdefault("timeout", self._timeout(endpoint))
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = await self.async_client.request(
+                method, path, extensions={"trace": self._async_trace}, **kwargs
+            )
+            ok = response.status_code < 400
+            return response
+        finally:
+            self.metrics.record(endpoint, time.perf_counter() - start, ok)
+
+    def request_sync(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Blocking variant of request() for synchronous tools"""
+        endpoint = endpoint_name(path)
+        kwargs.setdefault("timeout", self._timeout(endpoint))
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = self.sync_client.request(
+                method, path, extensions={"trace": self._sync_trace}, **kwargs
+            )
+            ok = response.status_code < 400
+            return response
+        finally:
+            self.metrics.record(endpoint, time.perf_counter() - start, ok)
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.config.base_url,
+            "http2": self.http2,
+            "max_connections": self.config.max_connections,
+            "max_keepalive_connections": self.config.max_keepalive_connections,
+            **self.metrics.snapshot()
+        }
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
+
+    def close(self):
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+
+_shared_transports: dict[str, GreycatTransport] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_transport(base_url: Optional[str] = None) -> GreycatTransport:
+    """The process-wide transport for base_url (configured from the environment)"""
+    config = TransportConfig.from_env()
+    if base_url is not None:
+        config.base_url = base_url
+    with _shared_lock:
+        transport = _shared_transports.get(config.base_url)
+        if transport is None:
+            transport = GreycatTransport(config)
+            _shared_transports[config.base_url] = transport
+        return transport
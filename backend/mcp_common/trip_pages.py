@@ -0,0 +1,24 @@
+"""
+get_trip_patterns pagination shared by the MCP servers
+
+The tool reads one page of a day's trips with get_trip_patterns_for_day_page;
+the page size is capped so a single call stays small.
+"""
+
+TRIP_PAGE_DEFAULT_LIMIT = 50
+TRIP_PAGE_MAX_LIMIT = 200
+
+
+def trip_page_params(arguments: dict) -> list:
+    """Greycat parameters for get_trip_patterns_for_day_page, with the page size capped"""
+    offset = max(int(arguments.get("offset", 0)), 0)
+    limit = int(arguments.get("limit", TRIP_PAGE_DEFAULT_LIMIT))
+    limit = min(max(limit, 1), TRIP_PAGE_MAX_LIMIT)
+    return [
+        arguments["day"],
+        offset,
+        limit,
+        arguments.get("hour"),
+        arguments.get("issue_label"),
+        arguments.get("n_sites")
+    ]
@@ -0,0 +1,134 @@
+"""
+analyze_vehicle_trip, shared by the MCP servers
+
+Step site names come from the client's SiteMetadataCache, so each distinct
+site is looked up at most once per process (per TTL).
+"""
+
+import asyncio
+
+from mcp_common.greycat import GreycatClient
+
+
+async def analyze_vehicle_trip(greycat: GreycatClient, plate_number: str, day: str) -> dict:
+    """
+    Complex analysis: Determine if vehicle degradation is due to vehicle or site issues
+    """
+    # Get vehicle details and this plate's trips for the day (YYYY-MM-DD).
+    # get_trips_for_plate reads the plate/day index, so only matching trips are sent.
+    vehicle, trips = await asyncio.gather(
+        greycat.call_function("get_vehicle_details", [plate_number]),
+        greycat.call_function("get_trips_for_plate", [plate_number, day])
+    )
+    vehicle_trips = trips if isinstance(trips, list) else []
+
+    if not vehicle_trips:
+        return {
+            "analysis": "No trips found for this vehicle on this day",
+            "vehicle": vehicle,
+            "plate_number": plate_number,
+            "day": day
+        }
+
+    # Analyze each trip
+    analysis = {
+        "vehicle": vehicle,
+        "plate_number": plate_number,
+        "day": day,
+        "trips": [],
+        "summary": {
+            "total_trips": len(vehicle_trips),
+            "total_detections": 0,
+            "degraded_detections": 0,
+            "sites_visited": set(),
+            "always_degraded": vehicle.get("vehicle_label") == "always_degraded"
+        }
+    }
+
+    # Look up each distinct site once (cached per process) for the step names
+    site_ids = [
+        step.get("site")
+        for trip in vehicle_trips
+        for step in trip.get("steps", [])
+    ]
+    site_metadata, failures = await greycat.get_site_metadata(site_ids)
+    site_names = {
+        site_id: metadata.get("name_en") or "Unknown"
+        for site_id, metadata in site_metadata.items()
+    }
+    if failures:
+        analysis["failed_site_lookups"] = failures
+
+    for trip in vehicle_trips:
+        trip_analysis = {
+            "window": trip.get("window30"),
+            "sites": trip.get("site_list"),
+            "min_quality": trip.get("min_quality"),
+            "max_quality": trip.get("max_quality"),
+            "issue_label": trip.get("issue_label"),
+            "steps": []
+        }
+
+        # Analyze each step in the trip
+        for step in trip.get("steps", []):
+            site_id = step.get("site")
+            quality = step.get("img_quality")
+            hour = step.get("hour")
+
+            analysis["summary"]["sites_visited"].add(site_id)
+            analysis["summary"]["total_detections"] += 1
+
+            if quality < 0.5:  # Threshold for degraded
+                analysis["summary"]["degraded_detections"] += 1
+
+            step_analysis = {
+                "site_id": site_id,
+                "timestamp": step.get("ts"),
+                "hour": hour,
+                "quality": quality,
+                "is_degraded": quality < 0.5,
+                "site_name": site_names.get(site_id, "Unknown")
+            }
+
+            trip_analysis["steps"].append(step_analysis)
+
+        analysis["trips"].append(trip_analysis)
+
+    # Convert set to list for JSON serialization
+    analysis["summary"]["sites_visited"] = list(analysis["summary"]["sites_visited"])
+
+    # Determine root cause
+    degradation_rate = (analysis["summary"]["degraded_detections"] /
+                       analysis["summary"]["total_detections"] * 100
+                       if analysis["summary"]["total_detections"] > 0 else 0)
+
+    if analysis["summary"]["always_degraded"]:
+        analysis["conclusion"] = {
+            "root_cause": "VEHICLE_ISSUE",
+            "confidence": "HIGH",
+            "reasoning": f"Vehicle is marked as 'always_degraded' with {degradation_rate:.1f}% degradation rate across {len(analysis['summary']['sites_visited'])} sites",
+            "recommendation": "Vehicle camera/plate requires maintenance or replacement"
+        }
+    elif degradation_rate > 80:
+        analysis["conclusion"] = {
+            "root_cause": "LIKELY_VEHICLE_ISSUE",
+            "confidence": "MEDIUM",
+            "reasoning": f"High degradation rate ({degradation_rate:.1f}%) across multiple sites suggests vehicle issue",
+            "recommendation": "Inspect vehicle plate quality and compare with other vehicles at same sites"
+        }
+    elif len(analysis["summary"]["sites_visited"]) == 1:
+        analysis["conclusion"] = {
+            "root_cause": "LIKELY_SITE_ISSUE",
+            "confidence": "MEDIUM",
+            "reasoning": "Degradation only at single site suggests site-specific issue",
+            "recommendation": "Inspect site camera and compare with other vehicles at same time"
+        }
+    else:
+        analysis["conclusion"] = {
+            "root_cause": "MIXED_OR_UNCLEAR",
+            "confidence": "LOW",
+            "reasoning": f"Degradation rate {degradation_rate:.1f}% across {len(analysis['summary']['sites_visited'])} sites requires deeper analysis",
+            "recommendation": "Compare site performance at same time of day with other vehicles"
+        }
+
+    return analysis
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import httpx
+import pytest
+
+# mcp_common is imported from backend/, like the servers do; the stub from bench/
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.join(BACKEND, "bench"))
+
+# The stub's history: 7 days ending 2025_08_10, imported as YYYY_MM_DD
+STUB_LAST_DAY = "2025_08_10"
+STUB_SITES = 20
+
+
+@pytest.fixture(scope="session")
+def stub_app():
+    """The stub Greycat app (bench/stub_greycat.py) without latency"""
+    from stub_greycat import create_app
+    return create_app(STUB_SITES, 0.0, STUB_LAST_DAY)
+
+
+@pytest.fixture
+def make_greycat(stub_app):
+    """
+    GreycatClient factory; requests are served in-process by the stub app,
+    or by another httpx transport. Create clients inside the event loop.
+    """
+    from mcp_common.greycat import GreycatClient
+    from mcp_common.transport import GreycatTransport, TransportConfig
+
+    def make(async_transport: httpx.AsyncBaseTransport = None, **options) -> GreycatClient:
+        transport = GreycatTransport(TransportConfig(base_url="http://greycat"),
+                                     async_transport=async_transport or httpx.ASGITransport(stub_app))
+        return GreycatClient("http://greycat", "site_queries", transport=transport, **options)
+    return make
@@ -0,0 +1,45 @@
+"""
+DAY_VIEW CSV trees written from the stub Greycat's generators, so a tree
+holds the same rows the stub serves for get_site_day
+"""
+
+import csv
+import os
+
+from stub_greycat import HISTORY_VARIANTS, make_hourly_grid, make_hourly_quality, make_hourly_zones
+
+# File type -> stub generator of its rows
+GENERATORS = {
+    "hourly_grid_summary": make_hourly_grid,
+    "hourly_quality": make_hourly_quality,
+    "hourly_zone_stats_3x4": make_hourly_zones,
+}
+
+
+def csv_path(root: str, file_type: str, day: str, site_id: str) -> str:
+    # As mcp_common.day_view.csv_path, without needing pyarrow
+    return os.path.join(root, site_id, "DAY_VIEW", day, f"{site_id}_{day}_{file_type}.csv")
+
+
+def stub_rows(file_type: str, site_id: str, day: str) -> list[dict]:
+    """The rows the stub serves for a site-day (sites share HISTORY_VARIANTS histories)"""
+    variant = int(site_id[5:]) % HISTORY_VARIANTS
+    return GENERATORS[file_type](site_id, [day], variant)
+
+
+def write_csv(path: str, rows: list[dict]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_site_day(root: str, site_id: str, day: str, file_types=tuple(GENERATORS)) -> dict:
+    """Write the site-day's CSVs; file type -> rows written"""
+    written = {}
+    for file_type in file_types:
+        rows = stub_rows(file_type, site_id, day)
+        write_csv(csv_path(root, file_type, day, site_id), rows)
+        written[file_type] = rows
+    return written
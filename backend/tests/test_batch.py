@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from mcp_common.batch import BATCH_MAX_SITE_DAYS, day_range, sites_day_status_batch
+
+# The stub's history: 7 days ending 2025_08_10, imported as YYYY_MM_DD
+LAST_DAY = "2025_08_10"
+
+
+def call(make_greycat, function, *args, **kwargs):
+    async def run():
+        greycat = make_greycat()
+        try:
+            return await function(greycat, *args, **kwargs)
+        finally:
+            await greycat.close()
+    return asyncio.run(run())
+
+
+def test_day_range_keeps_the_format():
+    assert day_range("2025_08_30", "2025_09_01") == ["2025_08_30", "2025_08_31", "2025_09_01"]
+    assert day_range("2025-08-10", "2025-08-10") == ["2025-08-10"]
+    with pytest.raises(ValueError):
+        day_range("2025-08-10", "2025-08-09")
+
+
+def test_status_batch_reads_each_site_day(make_greycat):
+    result = call(make_greycat, sites_day_status_batch, ["RUHSM001", "RUHSM002", "RUHSM001"],
+                  [LAST_DAY, "2025_07_01"])
+    assert (result["sites"], result["days"], result["failures"]) == (2, 2, [])
+
+    rows = {(r[0], r[1]): dict(zip(result["columns"], r)) for r in result["rows"]}
+    assert len(rows) == 4
+    known = rows[("RUHSM001", LAST_DAY)]
+    assert known["hours"] == 24
+    assert known["frames"] == known["good_frames"] + known["bad_frames"] > 0
+    assert known["unique_vehicles"] > 0
+    # A day outside the history is an empty SiteDay, not a failure
+    assert rows[("RUHSM001", "2025_07_01")]["hours"] == 0
+    assert rows[("RUHSM001", "2025_07_01")]["good_rate"] is None
+
+
+def test_status_batch_is_capped():
+    days = [f"d{i}" for i in range(BATCH_MAX_SITE_DAYS // 10 + 1)]
+    with pytest.raises(ValueError, match="site-days"):
+        asyncio.run(sites_day_status_batch(None, [f"S{i}" for i in range(10)], days))
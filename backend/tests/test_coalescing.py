@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+
+
+class SlowGreycat:
+    """Answers each request after `delay` seconds, echoing the params"""
+
+    def __init__(self, delay: float = 0.05, status: int = 200):
+        self.delay = delay
+        self.status = status
+        self.requests = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        return httpx.Response(self.status, content=request.content)
+
+
+def run_with(make_greycat, upstream, calls):
+    """Run calls(greycat) against a client on `upstream`; (result, client stats)"""
+    async def run():
+        greycat = make_greycat(httpx.MockTransport(upstream))
+        try:
+            return await calls(greycat), greycat.stats()["coalescing"]
+        finally:
+            await greycat.close()
+    return asyncio.run(run())
+
+
+def test_identical_calls_share_one_request(make_greycat):
+    upstream = SlowGreycat()
+
+    async def calls(greycat):
+        return await asyncio.gather(*(greycat.post_function("get_site_day", ["S1", "2025_08_10"])
+                                      for _ in range(5)))
+
+    results, stats = run_with(make_greycat, upstream, calls)
+    assert results == [["S1", "2025_08_10"]] * 5
+    assert upstream.requests == 1
+    assert stats == {"upstream_calls": 1, "coalesced_calls": 4, "in_flight": 0}
+
+
+def test_different_params_are_not_coalesced(make_greycat):
+    upstream = SlowGreycat()
+
+    async def calls(greycat):
+        return await asyncio.gather(greycat.post_function("get_site_day", ["S1", "2025_08_10"]),
+                                    greycat.post_function("get_site_day", ["S2", "2025_08_10"]),
+                                    greycat.post_function("get_site_details", ["S1"]))
+
+    results, stats = run_with(make_greycat, upstream, calls)
+    assert upstream.requests == 3
+    assert stats["coalesced_calls"] == 0
+
+
+def test_finished_calls_are_not_reused(make_greycat):
+    upstream = SlowGreycat(delay=0)
+
+    async def calls(greycat):
+        await greycat.post_function("list_sites", [])
+        await greycat.post_function("list_sites", [])
+
+    _, stats = run_with(make_greycat, upstream, calls)
+    assert upstream.requests == 2
+    assert stats["coalesced_calls"] == 0
+
+
+def test_errors_reach_every_waiter(make_greycat):
+    upstream = SlowGreycat(status=503)
+
+    async def calls(greycat):
+        return await asyncio.gather(*(greycat.post_function("list_sites", []) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results, stats = run_with(make_greycat, upstream, calls)
+    assert upstream.requests == 1
+    assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+    assert stats["in_flight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_others(make_greycat):
+    upstream = SlowGreycat()
+
+    async def calls(greycat):
+        first = asyncio.create_task(greycat.post_function("list_sites", []))
+        second = asyncio.create_task(greycat.post_function("list_sites", []))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    result, stats = run_with(make_greycat, upstream, calls)
+    assert result == []
+    assert upstream.requests == 1
+    assert stats == {"upstream_calls": 1, "coalesced_calls": 1, "in_flight": 0}
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from day_view_to_parquet import ingest, read_day_view  # noqa: E402
+from day_view_tree import write_site_day  # noqa: E402
+from mcp_common.day_view import SCHEMAS, parquet_path  # noqa: E402
+
+DAYS = ["2025_08_09", "2025_08_10"]
+PAIRS = [(site_id, day) for site_id in ("RUHSM000", "RUHSM001") for day in DAYS]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = str(tmp_path / "day_view")
+    written = {pair: write_site_day(root, *pair) for pair in PAIRS}
+    return root, str(tmp_path / "parquet"), written
+
+
+def test_converts_with_the_model_schema(tree):
+    root, out, written = tree
+    report = ingest(root, out, PAIRS, workers=1)
+    assert (report["converted"], report["missing"], report["failed"]) == (8, 4, 0)
+    assert report["rows"] == 4 * (24 + 288)
+
+    table = pq.read_table(parquet_path(out, "hourly_grid_summary", "2025_08_10", "RUHSM001"))
+    schema = SCHEMAS["hourly_grid_summary"]
+    assert table.column_names == list(schema)
+    assert all(table.schema.field(name).type == schema[name] for name in schema)
+    # Days stay strings, hour_str keeps its leading zero
+    assert table.to_pylist() == written[("RUHSM001", "2025_08_10")]["hourly_grid_summary"]
+
+    zones = read_day_view(out, "hourly_zone_stats_3x4", sites=["RUHSM000"])
+    assert zones.num_rows == 2 * 288
+    assert zones.schema.field("dead_cell").type == pa.bool_()
+    assert sorted(set(zones.column("day").to_pylist())) == DAYS
+
+
+def test_rerun_converts_only_changed_files(tree):
+    root, out, _ = tree
+    ingest(root, out, PAIRS, workers=1)
+    assert ingest(root, out, PAIRS, workers=1)["converted"] == 0
+
+    write_site_day(root, "RUHSM000", "2025_08_10", ["hourly_grid_summary"])
+    src = os.path.join(root, "RUHSM000", "DAY_VIEW", "2025_08_10", "RUHSM000_2025_08_10_hourly_grid_summary.csv")
+    os.utime(src, ns=(0, 0))
+    report = ingest(root, out, PAIRS, workers=1)
+    assert (report["converted"], report["up_to_date"]) == (1, 7)
+
+
+def test_reading_an_unconverted_type_is_empty(tree):
+    _, out, _ = tree
+    table = read_day_view(out, "peaks_summary", columns=["site", "frames"])
+    assert table.num_rows == 0
+    assert table.schema.field("frames").type == pa.int64()
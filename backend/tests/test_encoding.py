@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from mcp_common.encoding import encode_response, to_table
+
+RESULT = {
+    "siteId": "RUHSM336",
+    "name_ar": "طريق الملك فهد",
+    "hourly_quality": [{"hour": 0, "frames": 10}, {"hour": 1, "frames": 12}],
+    "peaks": [{"hour": 7}],
+}
+
+
+def test_pretty_is_the_original_output():
+    assert encode_response(RESULT) == json.dumps(RESULT, indent=2)
+
+
+def test_compact_keeps_arabic_unescaped():
+    text = encode_response(RESULT, "compact")
+    assert "\n" not in text and "طريق" in text
+    assert json.loads(text) == RESULT
+
+
+def test_table_converts_homogeneous_arrays_only():
+    table = json.loads(encode_response(RESULT, "table"))
+    assert table["hourly_quality"] == {"columns": ["hour", "frames"], "rows": [[0, 10], [1, 12]]}
+    # One row: the header would not pay off
+    assert table["peaks"] == [{"hour": 7}]
+
+
+def test_table_leaves_mixed_arrays_as_objects():
+    rows = [{"a": 1}, {"b": 2}]
+    assert to_table(rows) == rows
+    assert to_table([{"a": {"x": [{"k": 1}, {"k": 2}]}}, {"a": None}]) == {
+        "columns": ["a"], "rows": [[{"x": {"columns": ["k"], "rows": [[1], [2]]}}], [None]]}
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        encode_response(RESULT, "yaml")
@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+
+
+class HangsOnce:
+    """Greycat that never answers the first request and answers the others at once"""
+
+    def __init__(self):
+        self.requests = 0
+        self.cancelled = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.requests == 1:
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        return httpx.Response(200, json={"siteId": "S1"})
+
+
+def test_timed_out_call_is_retried_upstream(make_greycat):
+    greycat_stub = HangsOnce()
+
+    async def run():
+        greycat = make_greycat(httpx.MockTransport(greycat_stub))
+        try:
+            results, failures = await greycat.fan_out("get_site_details", [["S1"]], timeout=0.05, retries=1)
+            await asyncio.sleep(0)
+            return greycat, results, failures
+        finally:
+            await greycat.close()
+
+    greycat, results, failures = asyncio.run(run())
+    assert (results, failures) == ([{"siteId": "S1"}], [])
+    # The retry is a new request, not another wait on the hung one (which is cancelled)
+    assert greycat_stub.requests == 2 and greycat_stub.cancelled == 1
+    assert (greycat.upstream_calls, greycat.coalesced_calls) == (2, 0)
+    assert greycat.stats()["coalescing"]["in_flight"] == 0
+
+
+def test_timeout_keeps_the_call_for_other_waiters(make_greycat):
+    async def slow(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json=[1])
+
+    async def run():
+        greycat = make_greycat(httpx.MockTransport(slow))
+        try:
+            waiter = asyncio.create_task(greycat.post_function("list_sites", []))
+            await asyncio.sleep(0)
+            results, failures = await greycat.fan_out("list_sites", [[]], timeout=0.01, retries=0)
+            assert results == [None] and failures
+            # Abandoning the call did not cancel it for the caller still waiting
+            return await waiter
+        finally:
+            await greycat.close()
+
+    assert asyncio.run(run()) == [1]
@@ -0,0 +1,112 @@
+import math
+
+from mcp_common.hourly_analytics import (
+    ANOMALY_Z, dead_cell_analytics, quality_analytics, site_hourly_performance,
+)
+
+
+def quality_row(day, hour, frames, good, night=False, dawn=False, dusk=False):
+    return {"day": day, "hour": hour, "frames": frames, "good_frames": good,
+            "dawn": dawn, "dusk": dusk, "is_night": night}
+
+
+def grid_row(day, hour, dead):
+    return {"day": day, "ts_hour": f"{day} {hour:02d}:00:00", "hour_str": f"{hour:02d}:00", "dead_cells": dead}
+
+
+def zone_row(day, hour, row, col, dead):
+    return {"day": day, "ts_hour": f"{day} {hour:02d}:00:00", "hour_str": f"{hour:02d}",
+            "zone_row": row, "zone_col": col, "dead_cell": dead}
+
+
+def baseline(days, hour=10, rates=(0.90, 0.92, 0.88, 0.91, 0.89)):
+    return [quality_row(d, hour, 100, int(r * 100)) for d, r in zip(days, rates)]
+
+
+DAYS = ["2025-08-01", "2025-08-02", "2025-08-03", "2025-08-04", "2025-08-05"]
+
+
+def test_unknown_day_is_empty():
+    result = quality_analytics(baseline(DAYS), "2025-09-01")
+    assert result["hourly_performance"] == []
+    assert result["baseline"]["days"] == len(DAYS)
+
+
+def test_drop_against_baseline_is_an_anomaly():
+    rows = baseline(DAYS) + [quality_row("2025-08-06", 10, 100, 40)]
+    result = quality_analytics(rows, "2025-08-06")
+
+    [hour] = result["hourly_performance"]
+    assert hour["good_rate"] == 0.4
+    assert hour["baseline_good_rate"] == 0.9
+    assert hour["z_score"] <= -ANOMALY_Z
+    assert hour["anomaly"] is True
+    assert result["anomalies"] == [{k: hour[k] for k in ("hour", "good_rate", "baseline_good_rate", "z_score")}]
+
+
+def test_no_z_score_without_enough_baseline_days():
+    rows = baseline(DAYS[:2]) + [quality_row("2025-08-06", 10, 100, 40)]
+    [hour] = quality_analytics(rows, "2025-08-06")["hourly_performance"]
+    assert hour["z_score"] is None
+    assert hour["anomaly"] is False
+
+
+def test_periods_prefer_night():
+    rows = [
+        quality_row("2025-08-06", 2, 100, 50, night=True, dawn=True),
+        quality_row("2025-08-06", 6, 100, 80, dawn=True),
+        quality_row("2025-08-06", 12, 100, 90),
+    ]
+    result = quality_analytics(rows, "2025-08-06")
+    assert [r["period"] for r in result["hourly_performance"]] == ["night", "dawn", "day"]
+    assert result["periods"]["night"] == {"hours": 1, "frames": 100, "good_frames": 50, "good_rate": 0.5}
+    assert result["periods"]["dusk"]["good_rate"] is None
+
+
+def test_dead_cells_by_hour_and_trend():
+    rows = [grid_row("2025-08-01", h, 1) for h in range(4)] + [grid_row("2025-08-02", h, 3) for h in range(4)]
+    result = dead_cell_analytics(rows, [], "2025-08-02")
+    assert result["by_hour"] == {0: 3, 1: 3, 2: 3, 3: 3}
+    assert result["day_avg"] == 3.0
+    assert math.isclose(result["trend_per_day"], 2.0)
+    assert [d["max_dead_cells"] for d in result["daily"]] == [1, 3]
+
+
+def test_persistent_cells_ranked_by_dead_hours():
+    grid = [grid_row("2025-08-02", h, 1) for h in range(4)]
+    zones = [zone_row("2025-08-02", h, 1, 2, True) for h in range(4)]
+    zones += [zone_row("2025-08-02", h, 0, 0, h == 0) for h in range(4)]
+    zones += [zone_row("2025-08-01", 0, 3, 3, True)]
+
+    cells = dead_cell_analytics(grid, zones, "2025-08-02")["persistent_cells"]
+    assert [(c["zone_row"], c["zone_col"], c["dead_hours"]) for c in cells] == [(1, 2, 4), (0, 0, 1)]
+    assert cells[0]["dead_share"] == 1.0
+
+
+def test_trend_is_per_calendar_day():
+    # Days 1 and 5 imported, 2-4 missing: +4 dead cells over 4 days
+    rows = [grid_row("2025-08-01", 0, 1), grid_row("2025-08-05", 0, 5)]
+    assert math.isclose(dead_cell_analytics(rows, [], "2025-08-05")["trend_per_day"], 1.0)
+    rows = [grid_row("2025_08_30", 0, 1), grid_row("2025_09_01", 0, 3)]
+    assert math.isclose(dead_cell_analytics(rows, [], "2025_09_01")["trend_per_day"], 1.0)
+
+
+def test_dead_share_counts_zone_hours_without_grid_rows():
+    # One grid hour, four zone hours: the cell was dead in all four
+    grid = [grid_row("2025-08-02", 0, 1)]
+    zones = [zone_row("2025-08-02", h, 1, 1, True) for h in range(4)]
+    zones += [zone_row("2025-08-02", 0, 1, 1, True)]  # repeated row for hour 0
+    [cell] = dead_cell_analytics(grid, zones, "2025-08-02")["persistent_cells"]
+    assert (cell["dead_hours"], cell["dead_share"]) == (4, 1.0)
+
+
+def test_site_hourly_performance_joins_dead_cells():
+    site = {
+        "hourly_quality": [quality_row("2025-08-02", 3, 10, 5), quality_row("2025-08-02", 4, 10, 10)],
+        "hourly_grid": [grid_row("2025-08-02", 3, 2)],
+    }
+    result = site_hourly_performance(site, "2025-08-02")
+    assert result["summary"] == {"hours": 2, "frames": 20, "good_frames": 15,
+                                 "good_rate": 0.75, "anomalous_hours": 0}
+    assert [r["dead_cells"] for r in result["hourly_performance"]] == [2, None]
+    assert "by_hour" not in result["dead_cells"]
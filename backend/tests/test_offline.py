@@ -0,0 +1,138 @@
+import asyncio
+import csv
+import os
+
+import httpx
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from day_view_to_parquet import ingest  # noqa: E402
+from day_view_tree import csv_path, write_site_day  # noqa: E402
+from mcp_common.greycat import GreycatClient  # noqa: E402
+from mcp_common.offline import (  # noqa: E402
+    OFFLINE_BASE_URL, SITE_DAY_FILE_TYPES, OfflineConfig, OfflineEngine, OfflineTransport,
+)
+from mcp_common.transport import TransportConfig  # noqa: E402
+
+
+def write_rows(path: str, header: list, rows: list):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Two sites; their counts rows spell the same day differently"""
+    root = str(tmp_path)
+    config = OfflineConfig(
+        site_metadata=os.path.join(root, "sites.csv"),
+        site_counts_total=os.path.join(root, "site_counts_total.csv"),
+        site_counts_by_type=os.path.join(root, "site_counts_by_vehicle_type.csv"),
+        city_profile_root=os.path.join(root, "city_profile_multi"),
+        day_view_root=os.path.join(root, "day_view"),
+        snapshot_check_seconds=0.0,
+    )
+    write_rows(config.site_metadata,
+               ["location", "geolatitude", "geolongitude", "number_of_lanes", "Direction",
+                "Streat_Name_Arabic", "Streat_Name_English"],
+               [["RUHSM000", "24.6", "46.6", "3", "N", "", "King Fahd Rd"],
+                ["RUHSM001", "24.7", "46.7", "2", "S", "", "Olaya St"]])
+    write_rows(config.site_counts_total,
+               ["day", "site", "unique_vehicles", "always_degraded_vehicles", "not_always_degraded_vehicles"],
+               [["2025_08_10", "RUHSM000", "200", "50", "150"],
+                ["2025-08-10", "RUHSM001", "100", "10", "90"]])
+    write_rows(config.site_counts_by_type,
+               ["day", "site", "vehicle_type", "unique_vehicles", "always_degraded_vehicles",
+                "not_always_degraded_vehicles"],
+               [["2025_08_10", "RUHSM000", "1", "200", "50", "150"]])
+    write_rows(os.path.join(config.city_profile_root, "2025-08-10", "overall_stats_2025_08_10.csv"),
+               ["detections_total_all_days", "pct_good_all_days"],
+               [["1000", "0.9"], [], ["day", "vehicle_type", "detections_total_all_days"],
+                ["2025_08_10", "1", "600"], ["2025-08-10", "2", "400"], ["2025-08-09", "1", "5"]])
+    write_site_day(config.day_view_root, "RUHSM000", "2025_08_10")
+    write_site_day(config.day_view_root, "RUHSM001", "2025_08_09")
+    return config
+
+
+@pytest.mark.parametrize("day", ["2025-08-10", "2025_08_10"])
+def test_counts_match_either_day_spelling(config, day):
+    engine = OfflineEngine(config)
+    assert [r["unique_vehicles"] for r in engine.call("get_site_vehicle_counts_total", ["RUHSM000", day])] == [200]
+    assert [r["unique_vehicles"] for r in engine.call("get_site_vehicle_counts_total", ["RUHSM001", day])] == [100]
+    assert len(engine.call("get_site_vehicle_counts_by_type", ["RUHSM000", day])) == 1
+    rates = {r["siteId"]: r["degradation_rate"] for r in engine.call("get_site_degradation_for_day", [day])}
+    assert rates == {"RUHSM000": 25.0, "RUHSM001": 10.0}
+
+
+def test_site_day_and_profile_are_cached_once_per_day(config):
+    engine = OfflineEngine(config)
+    for day in ("2025-08-10", "2025_08_10"):
+        site_day = engine.call("get_site_day", ["RUHSM000", day])
+        assert len(site_day["hourly_grid"]) == 24 and len(site_day["hourly_zones"]) == 288
+        profile = engine.call("get_city_profile", [day])
+        assert profile["day"] == "2025-08-10"
+        assert profile["overall"]["detections_total_all_days"] == 1000
+        assert [r["detections_total_all_days"] for r in profile["by_vehicle_type"]] == [600, 400]
+    stats = engine.stats()
+    assert stats["city_profiles"] == 1
+    assert stats["day_view_tables"] == len(SITE_DAY_FILE_TYPES)
+
+
+def test_reads_the_parquet_copy(config, tmp_path):
+    parquet_root = str(tmp_path / "parquet")
+    ingest(config.day_view_root, parquet_root, [("RUHSM000", "2025_08_10")], workers=1)
+    os.remove(csv_path(config.day_view_root, "hourly_grid_summary", "2025_08_10", "RUHSM000"))
+
+    config.parquet_root = parquet_root
+    rows = OfflineEngine(config).call("get_site_day", ["RUHSM000", "2025-08-10"])["hourly_grid"]
+    assert len(rows) == 24 and rows[0]["hour_str"] == "00"
+
+
+def test_snapshot_change_drops_missing_tables_and_rollups(config):
+    engine = OfflineEngine(config)
+    assert engine.call("get_site_day", ["RUHSM001", "2025-08-10"])["hourly_grid"] == []
+    assert [(r["day"], r["sites"]) for r in engine.call("get_city_rollups", [])] == [
+        ("2025-08-09", 1), ("2025-08-10", 1)]
+    assert engine.call("get_city_rollups", []) is engine.call("get_city_rollups", [])
+
+    # A new day folder; pin the folder's mtime so the change is visible at any clock resolution
+    write_site_day(config.day_view_root, "RUHSM001", "2025_08_10")
+    os.utime(os.path.join(config.day_view_root, "RUHSM001", "DAY_VIEW"), ns=(1, 1))
+
+    assert len(engine.call("get_site_day", ["RUHSM001", "2025-08-10"])["hourly_grid"]) == 24
+    assert [(r["day"], r["sites"]) for r in engine.call("get_city_rollups", [])] == [
+        ("2025-08-09", 1), ("2025-08-10", 2)]
+    assert engine.stats()["refreshes"] == 1
+
+
+def test_snapshot_is_checked_at_most_every_interval(config):
+    config.snapshot_check_seconds = 3600.0
+    engine = OfflineEngine(config)
+    assert engine.call("get_site_day", ["RUHSM001", "2025-08-10"])["hourly_grid"] == []
+    write_site_day(config.day_view_root, "RUHSM001", "2025_08_10")
+    assert engine.call("get_site_day", ["RUHSM001", "2025-08-10"])["hourly_grid"] == []
+
+    engine.refresh()
+    assert len(engine.call("get_site_day", ["RUHSM001", "2025-08-10"])["hourly_grid"]) == 24
+
+
+def test_greycat_client_over_the_offline_transport(config):
+    async def run():
+        transport = OfflineTransport(OfflineEngine(config), TransportConfig(base_url=OFFLINE_BASE_URL))
+        greycat = GreycatClient(OFFLINE_BASE_URL, "site_queries", transport=transport)
+        try:
+            counts = await greycat.post_function("get_site_vehicle_counts_total", ["RUHSM001", "2025_08_10"])
+            with pytest.raises(httpx.HTTPStatusError) as missing:
+                await greycat.post_function("get_trips_for_plate", ["1000AVR", "2025-08-10"])
+        finally:
+            await greycat.close()
+        return counts, missing.value.response.status_code, transport.unsupported_tools()
+
+    counts, status, unsupported = asyncio.run(run())
+    assert [r["site"] for r in counts] == ["RUHSM001"]
+    assert status == 404
+    assert "analyze_vehicle_trip" in unsupported and "get_health_trend" not in unsupported
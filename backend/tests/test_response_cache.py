@@ -0,0 +1,124 @@
+import json
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from mcp_common import response_cache
+from mcp_common.response_cache import NEVER, ResponseCache, is_placeholder, parse_day
+
+PAST = "2025-08-10"
+TODAY = date.today().isoformat()
+TOMORROW = (date.today() + timedelta(days=1)).isoformat()
+
+
+def put(cache, function_name, params, value):
+    cache.put(function_name, params, value, json.dumps(value).encode())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Starts at the real time: date.today() reads time.time() too
+    now = [time.time()]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_parse_day_accepts_both_spellings():
+    assert parse_day("2025-08-10") == parse_day("2025_08_10") == date(2025, 8, 10)
+    assert parse_day("2025-13-01") is None
+    assert parse_day(20250810) is None
+
+
+def test_placeholders():
+    assert is_placeholder({}) and is_placeholder([]) and is_placeholder(None)
+    assert is_placeholder({"siteId": "S1", "hourly_grid": [], "hourly_quality": []})
+    assert not is_placeholder({"siteId": "S1", "hourly_grid": [{}]})
+    assert not is_placeholder({"day": PAST, "sites": 3})
+    # A ranking of a day not imported yet: one row per site, no values
+    rows = [{"siteId": "S1", "unique_vehicles": 0, "degradation_rate": None},
+            {"siteId": "S2", "unique_vehicles": 0, "degradation_rate": None}]
+    assert not is_placeholder(rows)
+    assert is_placeholder(rows, "degradation_rate")
+    assert not is_placeholder(rows + [{"siteId": "S3", "degradation_rate": 12.5}], "degradation_rate")
+
+
+def test_ttl_rules():
+    cache = ResponseCache(today_ttl=60, undated_ttl=300)
+    value = [{"site": "S1"}]
+    assert cache.ttl_for("get_city_profile", [PAST], {"day": PAST, "n": 1}) == NEVER
+    assert cache.ttl_for("get_site_day", ["S1", PAST], {"siteId": "S1", "hourly_grid": [{}]}) == NEVER
+    assert cache.ttl_for("get_site_degradation_for_day", [TODAY], value) == 60
+    assert cache.ttl_for("get_site_degradation_for_day", [TOMORROW], value) == 60
+    assert cache.ttl_for("get_site_degradation_for_day", ["not a day"], value) == 60
+    assert cache.ttl_for("list_sites", [], value) == 300
+    # An empty answer for a past day may be an import still running
+    assert cache.ttl_for("get_site_day", ["S1", PAST], {"siteId": "S1", "hourly_grid": []}) == 60
+
+
+def test_rankings_of_past_days_expire(clock):
+    cache = ResponseCache(today_ttl=60, aggregate_ttl=3600)
+    not_imported = [{"siteId": "S1", "degradation_rate": None}]
+    partly_imported = [{"siteId": "S1", "degradation_rate": 10.0}, {"siteId": "S2", "degradation_rate": None}]
+    assert cache.ttl_for("get_site_degradation_for_day", ["2025_01_01"], not_imported) == 60
+    assert cache.ttl_for("get_site_degradation_for_day", ["2025_01_01"], partly_imported) == 3600
+
+    put(cache, "get_site_degradation_for_day", ["2025_01_01"], not_imported)
+    put(cache, "get_site_degradation_for_day", ["2025_01_02"], partly_imported)
+    clock[0] += 61
+    assert cache.get("get_site_degradation_for_day", ["2025_01_01"]) == (False, None)
+    assert cache.get("get_site_degradation_for_day", ["2025_01_02"])[0]
+    clock[0] += 3600
+    assert cache.get("get_site_degradation_for_day", ["2025_01_02"]) == (False, None)
+
+
+def test_today_expires_and_past_days_do_not(clock):
+    cache = ResponseCache(today_ttl=60, undated_ttl=300)
+    put(cache, "get_city_profile", [TODAY], {"day": TODAY, "n": 1})
+    put(cache, "get_city_profile", [PAST], {"day": PAST, "n": 1})
+    put(cache, "list_sites", [], [{"siteId": "S1"}])
+
+    clock[0] += 61
+    assert cache.get("get_city_profile", [TODAY]) == (False, None)
+    assert cache.get("list_sites", []) == (True, [{"siteId": "S1"}])
+
+    clock[0] += 10 ** 9
+    assert cache.get("get_city_profile", [PAST]) == (True, {"day": PAST, "n": 1})
+    assert cache.get("list_sites", []) == (False, None)
+    assert cache.stats()["entries"] == 1
+
+
+def test_lru_eviction_by_bytes():
+    body = b"x" * 100
+    cache = ResponseCache(max_bytes=250)
+    for name in ("a", "b"):
+        cache.put("list_sites", [name], [name], body)
+    cache.get("list_sites", ["a"])  # a is now the most recent
+    cache.put("list_sites", ["c"], ["c"], body)
+
+    assert cache.get("list_sites", ["b"]) == (False, None)
+    assert cache.get("list_sites", ["a"])[0] and cache.get("list_sites", ["c"])[0]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 200
+
+    cache.put("list_sites", ["huge"], ["huge"], b"x" * 300)
+    assert cache.get("list_sites", ["huge"]) == (False, None)
+    assert cache.stats()["entries"] == 2
+
+
+def test_disk_tier_survives_restarts(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(disk_path=path, today_ttl=60)
+    put(cache, "get_city_profile", [PAST], {"day": PAST, "n": 1})
+    put(cache, "get_city_profile", [TODAY], {"day": TODAY, "n": 1})
+    cache.close()
+
+    clock[0] += 61
+    cache = ResponseCache(disk_path=path, today_ttl=60)
+    assert cache.get("get_city_profile", [PAST]) == (True, {"day": PAST, "n": 1})
+    assert cache.get("get_city_profile", [TODAY]) == (False, None)
+    assert cache.stats()["disk_hits"] == 1
+    # Promoted to memory
+    assert cache.get("get_city_profile", [PAST])[0]
+    assert cache.stats()["hits"] == 1
+    cache.close()
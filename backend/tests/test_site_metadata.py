@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from mcp_common import greycat as greycat_module
+from mcp_common.greycat import SiteMetadataCache
+from mcp_common.vehicle_trip import analyze_vehicle_trip
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(greycat_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_hits_and_misses():
+    cache = SiteMetadataCache()
+    assert cache.get("S1") is None
+    cache.put("S1", {"siteId": "S1", "name_en": "King Fahd Rd", "extra": [1, 2]})
+    assert cache.get("S1") == {
+        "siteId": "S1", "lat": None, "lon": None, "numberOfLanes": None,
+        "direction": None, "name_ar": None, "name_en": "King Fahd Rd",
+    }
+    # peek does not count
+    assert cache.peek("S1") is not None and cache.peek("S2") is None
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+
+
+def test_entries_expire(clock):
+    cache = SiteMetadataCache(ttl=60)
+    cache.put("S1", {"siteId": "S1"})
+    clock[0] += 59
+    assert cache.get("S1") is not None
+    clock[0] += 2
+    assert cache.get("S1") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = SiteMetadataCache(max_size=2)
+    cache.put("S1", {"siteId": "S1"})
+    cache.put("S2", {"siteId": "S2"})
+    cache.get("S1")
+    cache.put("S3", {"siteId": "S3"})
+    assert cache.peek("S2") is None
+    assert cache.peek("S1") is not None and cache.peek("S3") is not None
+
+
+def test_metadata_is_fetched_once(make_greycat):
+    async def run():
+        greycat = make_greycat()
+        try:
+            first, failures = await greycat.get_site_metadata(["RUHSM001", "RUHSM002", "NOPE"])
+            calls = greycat.upstream_calls
+            second, _ = await greycat.get_site_metadata(["RUHSM001", "NOPE"])
+            return first, failures, calls, second, greycat.upstream_calls
+        finally:
+            await greycat.close()
+
+    first, failures, calls, second, calls_after = asyncio.run(run())
+    assert failures == []
+    assert first["RUHSM001"]["name_en"] == "Street 1"
+    # One list_sites call, then get_site_details for the site it does not list
+    assert calls == 2
+    assert first["NOPE"]["siteId"] == "NOPE" and first["NOPE"]["name_en"] is None
+    assert second == {k: first[k] for k in ("RUHSM001", "NOPE")}
+    assert calls_after == calls
+
+
+def test_vehicle_trip_steps_are_named(make_greycat):
+    async def run():
+        greycat = make_greycat()
+        try:
+            return await analyze_vehicle_trip(greycat, "1000AVR", "2025-08-10")
+        finally:
+            await greycat.close()
+
+    analysis = asyncio.run(run())
+    steps = [step for trip in analysis["trips"] for step in trip["steps"]]
+    assert steps
+    for step in steps:
+        assert step["site_name"] == f"Street {int(step['site_id'][5:]) % 40}"
+    assert "failed_site_lookups" not in analysis
+    assert analysis["conclusion"]["root_cause"]
@@ -0,0 +1,52 @@
+import pytest
+
+from mcp_common.spatial_index import SpatialIndex, haversine_m
+
+# A north-south line of sites ~1.1 km apart, one off to the east, one unlocated
+SITES = [{"siteId": f"N{i}", "lat": 24.70 + 0.01 * i, "lon": 46.70} for i in range(5)]
+SITES += [{"siteId": "E", "lat": 24.72, "lon": 46.80}, {"siteId": "X", "lat": None, "lon": None}]
+
+
+@pytest.fixture
+def index():
+    return SpatialIndex(SITES)
+
+
+def test_unlocated_sites_are_counted(index):
+    assert len(index) == 6
+    assert index.stats()["unlocated_sites"] == 1
+
+
+def test_near_is_nearest_first(index):
+    rows = index.near(24.72, 46.70, 1500)
+    assert [r["siteId"] for r in rows] == ["N2", "N1", "N3"]
+    assert rows[0]["distance_m"] == 0.0
+    assert rows[1]["distance_m"] == pytest.approx(1113, abs=5)
+    assert [r["siteId"] for r in index.near(24.72, 46.70, 1500, limit=1)] == ["N2"]
+
+
+def test_near_matches_a_brute_force_scan(index):
+    lat, lon, radius = 24.715, 46.72, 9000
+    expected = sorted(
+        (s["siteId"] for s in SITES if s["lat"] is not None
+         and haversine_m(lat, lon, [s["lat"]], [s["lon"]])[0] <= radius))
+    assert sorted(r["siteId"] for r in index.near(lat, lon, radius)) == expected
+
+
+def test_in_bbox_is_inclusive_and_sorted(index):
+    rows = index.in_bbox(24.71, 46.69, 24.73, 46.81)
+    assert [r["siteId"] for r in rows] == ["E", "N1", "N2", "N3"]
+    assert index.in_bbox(25.0, 47.0, 25.1, 47.1) == []
+
+
+def test_corridor_is_ordered_along_the_path(index):
+    rows = index.along_corridor([(24.70, 46.70), (24.74, 46.70)], 200)
+    assert [r["siteId"] for r in rows] == ["N0", "N1", "N2", "N3", "N4"]
+    assert rows[-1]["along_m"] == pytest.approx(4453, abs=10)
+    assert all(r["distance_m"] == 0.0 for r in rows)
+
+
+def test_empty_index():
+    index = SpatialIndex([])
+    assert index.near(24.7, 46.7, 1000) == []
+    assert index.in_bbox(0, 0, 90, 90) == []
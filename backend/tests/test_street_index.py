@@ -0,0 +1,41 @@
+from mcp_common.street_index import StreetIndex, normalize
+
+SITES = [
+    {"siteId": "S1", "name_en": "King Fahd Rd", "name_ar": "طريق الملك فهد"},
+    {"siteId": "S2", "name_en": "King Abdullah Rd", "name_ar": "طريق الملك عبدالله"},
+    {"siteId": "S3", "name_en": "Prince Sultan St", "name_ar": "شارع الأمير سلطان"},
+    {"siteId": "S4", "name_en": None, "name_ar": None},
+]
+
+
+def test_normalize_folds_case_and_arabic_variants():
+    assert normalize("King-FAHD  Rd.") == "king fahd rd"
+    assert normalize("الأمير") == normalize("الامير")
+    assert normalize("مدرسة") == normalize("مدرسه")
+    assert normalize("مُحَمَّد") == "محمد"
+
+
+def test_every_query_token_must_prefix_a_name_token():
+    index = StreetIndex(SITES)
+    assert index.lookup("king") == ["S1", "S2"]
+    assert index.lookup("king fah") == ["S1"]
+    assert index.lookup("fahd king") == ["S1"]
+    assert index.lookup("king sultan") == []
+    assert index.lookup("  ") == []
+
+
+def test_arabic_without_article_and_hamza():
+    index = StreetIndex(SITES)
+    assert index.lookup("امير") == ["S3"]
+    assert index.lookup("الملك") == ["S1", "S2"]
+
+
+def test_signature_follows_renames():
+    index = StreetIndex(SITES)
+    renamed = [dict(SITES[0], name_en="King Salman Rd"), *SITES[1:]]
+    assert StreetIndex.signature_of(SITES) == index.signature
+    assert StreetIndex.signature_of(renamed) != index.signature
+
+    index.rebuild(renamed)
+    assert index.lookup("salman") == ["S1"]
+    assert index.lookup("king fahd") == []
@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+
+from mcp_common import transport as transport_module
+from mcp_common.transport import (
+    DEFAULT_ENDPOINT_TIMEOUTS, GreycatTransport, TransportConfig, TransportMetrics,
+    endpoint_name, parse_endpoint_timeouts, shared_transport,
+)
+
+
+def test_endpoint_name():
+    assert endpoint_name("/site_queries::list_sites") == "list_sites"
+    assert endpoint_name("/site_queries::get_site_day?x=1") == "get_site_day"
+    assert endpoint_name("/health/") == "health"
+
+
+def test_parse_endpoint_timeouts():
+    assert parse_endpoint_timeouts("a=1.5, b = 20,bad,") == {"a": 1.5, "b": 20.0}
+    assert parse_endpoint_timeouts("") == {}
+
+
+def test_config_from_env(monkeypatch):
+    monkeypatch.setenv("GREYCAT_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("GREYCAT_HTTP2", "yes")
+    monkeypatch.setenv("GREYCAT_CALL_TIMEOUT", "9")
+    monkeypatch.setenv("GREYCAT_ENDPOINT_TIMEOUTS", "list_sites=3")
+    config = TransportConfig.from_env(max_keepalive_connections=2)
+
+    assert (config.max_connections, config.max_keepalive_connections, config.http2) == (7, 2, True)
+    assert config.timeout_for("list_sites") == 3.0
+    assert config.timeout_for("get_site_details") == DEFAULT_ENDPOINT_TIMEOUTS["get_site_details"]
+    assert config.timeout_for("get_site_day") == 9.0
+    # The defaults are not shared between configs
+    assert "list_sites" not in TransportConfig().endpoint_timeouts
+
+
+def test_http2_needs_h2(monkeypatch):
+    monkeypatch.setattr(transport_module, "HTTP2_AVAILABLE", False)
+    assert GreycatTransport(TransportConfig(http2=True)).http2 is False
+
+
+def test_metrics_snapshot():
+    metrics = TransportMetrics()
+    metrics.connection_opened()
+    for ok in (True, True, False, True):
+        metrics.record("list_sites", 0.01, ok)
+    snapshot = metrics.snapshot()
+    assert (snapshot["requests"], snapshot["errors"], snapshot["new_connections"]) == (4, 1, 1)
+    assert (snapshot["reused_connections"], snapshot["reuse_rate"]) == (3, 0.75)
+    assert snapshot["endpoints"]["list_sites"]["requests"] == 4
+    assert snapshot["endpoints"]["list_sites"]["errors"] == 1
+    assert TransportMetrics().snapshot()["reuse_rate"] is None
+
+
+def test_requests_are_recorded_per_endpoint():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.extensions["timeout"]["read"])
+        status = 500 if request.url.path.endswith("::broken") else 200
+        return httpx.Response(status, json=[])
+
+    async def run():
+        transport = GreycatTransport(TransportConfig(base_url="http://greycat", default_timeout=9.0),
+                                     async_transport=httpx.MockTransport(handler))
+        try:
+            await transport.request("POST", "/site_queries::get_site_details", json=[])
+            await transport.request("POST", "/site_queries::list_sites", json=[])
+            await transport.request("POST", "/site_queries::broken", json=[])
+            return transport.stats()
+        finally:
+            await transport.aclose()
+
+    stats = asyncio.run(run())
+    # Per-endpoint timeouts
+    assert seen == [DEFAULT_ENDPOINT_TIMEOUTS["get_site_details"], 9.0, 9.0]
+    assert (stats["requests"], stats["errors"]) == (3, 1)
+    assert set(stats["endpoints"]) == {"get_site_details", "list_sites", "broken"}
+    assert stats["endpoints"]["broken"]["errors"] == 1
+
+
+def test_shared_transport_per_base_url():
+    first = shared_transport("http://greycat-a:8080")
+    assert shared_transport("http://greycat-a:8080") is first
+    assert shared_transport("http://greycat-b:8080") is not first
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from mcp_common.batch import TREND_COLUMNS, health_trend
+
+# The stub's history: 7 days ending 2025_08_10, imported as YYYY_MM_DD
+LAST_DAY = "2025_08_10"
+
+
+def trend(make_greycat, *args):
+    async def run():
+        greycat = make_greycat()
+        try:
+            return await health_trend(greycat, *args)
+        finally:
+            await greycat.close()
+    return asyncio.run(run())
+
+
+def test_site_trend_compares_days_as_dates(make_greycat):
+    result = trend(make_greycat, "RUHSM001", "daily", "2025-08-08", "2025-08-09")
+    assert result["columns"] == ["day", "max_dead_cells", *TREND_COLUMNS]
+    assert [r[0] for r in result["rows"]] == ["2025_08_08", "2025_08_09"]
+
+
+def test_site_trend_weekly(make_greycat):
+    weekly = trend(make_greycat, "RUHSM001", "weekly")
+    # 2025-08-04 is a Monday: the whole history is one week
+    assert [r[:2] for r in weekly["rows"]] == [["2025-08-04", 7]]
+
+
+def test_unknown_site_has_no_rows(make_greycat):
+    assert trend(make_greycat, "NOPE", "daily")["rows"] == []
+
+
+def test_city_trend_is_daily_only(make_greycat):
+    result = trend(make_greycat, None, "daily", "2025_08_10")
+    assert [r[0] for r in result["rows"]] == [LAST_DAY]
+    with pytest.raises(ValueError):
+        trend(make_greycat, None, "weekly")
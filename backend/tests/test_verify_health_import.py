@@ -0,0 +1,54 @@
+from starlette.testclient import TestClient
+
+from day_view_tree import csv_path, stub_rows, write_csv, write_site_day
+from verify_health_import import FILE_TYPES, verify
+
+# The last day of the stub history
+DAY = "2025_08_10"
+
+
+def test_file_counts_without_greycat(tmp_path):
+    root = str(tmp_path)
+    write_site_day(root, "RUHSM000", DAY)
+    write_site_day(root, "RUHSM001", DAY, ["hourly_grid_summary"])
+
+    report = verify(root, [("RUHSM000", DAY), ("RUHSM001", DAY)])
+    totals = report["file_types"]
+    assert report["site_days"] == 2 and "mismatches" not in report
+    assert totals["hourly_grid_summary"]["files"] == 2
+    assert totals["hourly_grid_summary"]["rows"] == 48
+    assert totals["hourly_quality"]["files"] == 1 and totals["hourly_quality"]["missing"] == 1
+    assert totals["hourly_zone_stats_3x4"]["rows"] == 288
+    assert totals["peaks_summary"] == {"files": 0, "missing": 2, "rows": 0, "bytes": 0, "seconds": 0.0,
+                                       "foreign_rows": 0, "rows_per_sec": None}
+
+
+def test_compares_with_greycat(tmp_path, stub_app):
+    root = str(tmp_path)
+    write_site_day(root, "RUHSM000", DAY)
+    write_site_day(root, "RUHSM001", DAY)
+    # One row short of what Greycat holds
+    grid = stub_rows("hourly_grid_summary", "RUHSM001", DAY)
+    write_csv(csv_path(root, "hourly_grid_summary", DAY, "RUHSM001"), grid[:-1])
+    # Another site's row: the importer skips the whole file
+    quality = stub_rows("hourly_quality", "RUHSM001", DAY)
+    quality[0]["site"] = "RUHSM002"
+    write_csv(csv_path(root, "hourly_quality", DAY, "RUHSM001"), quality)
+
+    with TestClient(stub_app, base_url="http://greycat") as client:
+        report = verify(root, [("RUHSM000", DAY), ("RUHSM001", DAY)], client=client)
+
+    totals = report["file_types"]
+    assert totals["hourly_grid_summary"]["rows"] == 47
+    assert totals["hourly_grid_summary"]["greycat_rows"] == 48
+    assert totals["hourly_quality"]["foreign_rows"] == 1
+    assert totals["hourly_zone_stats_3x4"]["mismatches"] == 0
+    assert totals["hourly_zone_stats_3x4"]["greycat_rows"] == 576
+    assert sorted((m["site_id"], m["file_type"], m["file_rows"], m["greycat_rows"])
+                  for m in report["mismatches"]) == [
+        ("RUHSM001", "hourly_grid_summary", 23, 24),
+        ("RUHSM001", "hourly_quality", 0, 24),
+    ]
+    # Missing files are not compared
+    assert all(totals[t]["mismatches"] == 0 for t in FILE_TYPES
+               if t not in ("hourly_grid_summary", "hourly_quality"))
@@ -0,0 +1,176 @@
+"""
+Row counts and parse timing per health file type, optionally checked against Greycat
+
+For every site-day (from a manifest or a walk of ROOT/<siteId>/DAY_VIEW/<day>)
+each CSV of the day folder is parsed and timed, grouped by file type. Rows
+whose site is not the folder's site are counted separately: the importer
+trusts the folder layout and skips such files (is_site_file in
+edi/site_importer.gcl).
+
+With --greycat, each site-day is also fetched with site_queries::get_site_day
+and its array sizes are compared with the file row counts.
+
+  python verify_health_import.py data/organized_site_data/organized_site_data \
+      --manifest data/health_manifest.csv --greycat http://localhost:8080
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import httpx
+
+from build_health_manifest import site_days
+
+# File suffix -> SiteDay array filled from it
+FILE_TYPES = {
+    "hourly_grid_summary": "hourly_grid",
+    "hourly_quality": "hourly_quality",
+    "hourly_zone_stats_3x4": "hourly_zones",
+    "peaks_summary": "peaks_daily",
+    "ws_grid_3x4_summary": "ws_grid_daily",
+    "ws_grid_3x4_zones": "ws_zones_daily",
+}
+
+
+def read_manifest(path: str) -> list[tuple[str, str]]:
+    with open(path, newline="") as f:
+        return [(row["siteId"], row["day"]) for row in csv.DictReader(f)]
+
+
+def count_file(path: str, site_id: str) -> dict:
+    """Rows, bytes, parse seconds and rows whose site is not site_id"""
+    start = time.perf_counter()
+    rows = foreign = 0
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        site_col = header.index("site") if "site" in header else None
+        for row in reader:
+            rows += 1
+            if site_col is not None and row[site_col] != site_id:
+                foreign += 1
+    return {
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "seconds": time.perf_counter() - start,
+        "foreign_rows": foreign,
+    }
+
+
+def new_totals() -> dict:
+    return {"files": 0, "missing": 0, "rows": 0, "bytes": 0, "seconds": 0.0,
+            "foreign_rows": 0, "greycat_rows": 0, "mismatches": 0}
+
+
+def verify(root: str, pairs: list[tuple[str, str]], greycat_url: str = None,
+           client: httpx.Client = None) -> dict:
+    """Report of the file counts; compared with Greycat given its URL or a client for it"""
+    totals = {file_type: new_totals() for file_type in FILE_TYPES}
+    mismatches = []
+    greycat_seconds = 0.0
+
+    compare = client is not None or greycat_url is not None
+    own_client = client is None and greycat_url is not None
+    if own_client:
+        client = httpx.Client(base_url=greycat_url, timeout=60.0)
+    try:
+        for site_id, day in pairs:
+            folder = os.path.join(root, site_id, "DAY_VIEW", day)
+            file_rows = {}
+            for file_type in FILE_TYPES:
+                path = os.path.join(folder, f"{site_id}_{day}_{file_type}.csv")
+                acc = totals[file_type]
+                if not os.path.isfile(path):
+                    acc["missing"] += 1
+                    continue
+                counts = count_file(path, site_id)
+                acc["files"] += 1
+                for key in ("rows", "bytes", "seconds", "foreign_rows"):
+                    acc[key] += counts[key]
+                # A file with another site's rows is skipped by the importer
+                file_rows[file_type] = 0 if counts["foreign_rows"] else counts["rows"]
+
+            if client is None:
+                continue
+            start = time.perf_counter()
+            response = client.post("/site_queries::get_site_day", json=[site_id, day])
+            response.raise_for_status()
+            site_day = response.json()
+            greycat_seconds += time.perf_counter() - start
+
+            for file_type, expected in file_rows.items():
+                loaded = len(site_day.get(FILE_TYPES[file_type]) or [])
+                totals[file_type]["greycat_rows"] += loaded
+                if loaded != expected:
+                    totals[file_type]["mismatches"] += 1
+                    mismatches.append({"site_id": site_id, "day": day, "file_type": file_type,
+                                       "file_rows": expected, "greycat_rows": loaded})
+    finally:
+        if own_client:
+            client.close()
+
+    for acc in totals.values():
+        acc["rows_per_sec"] = round(acc["rows"] / acc["seconds"]) if acc["seconds"] else None
+        acc["seconds"] = round(acc["seconds"], 4)
+        if not compare:
+            del acc["greycat_rows"], acc["mismatches"]
+
+    report = {"site_days": len(pairs), "file_types": totals}
+    if compare:
+        report["greycat_seconds"] = round(greycat_seconds, 4)
+        report["mismatches"] = mismatches
+    return report
+
+
+def print_report(report: dict):
+    totals = report["file_types"]
+    columns = ["files", "missing", "rows", "bytes", "seconds", "rows_per_sec", "foreign_rows"]
+    if "mismatches" in report:
+        columns += ["greycat_rows", "mismatches"]
+
+    print(f"{report['site_days']} site-days")
+    print(f"{'file type':<24}" + "".join(f"{c:>14}" for c in columns))
+    for file_type, acc in totals.items():
+        print(f"{file_type:<24}" + "".join(f"{str(acc[c]):>14}" for c in columns))
+
+    if "mismatches" in report:
+        print(f"greycat get_site_day: {report['greycat_seconds']}s, "
+              f"{len(report['mismatches'])} mismatched file(s)")
+        for m in report["mismatches"][:20]:
+            print(f"  {m['site_id']} {m['day']} {m['file_type']}: "
+                  f"file {m['file_rows']} rows, greycat {m['greycat_rows']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("root", help="folder holding <siteId>/DAY_VIEW/<day>")
+    parser.add_argument("--manifest", help="siteId,day CSV (default: walk ROOT)")
+    parser.add_argument("--from", dest="day_from", help="first day when walking ROOT")
+    parser.add_argument("--to", dest="day_to", help="last day when walking ROOT")
+    parser.add_argument("--site", dest="sites", action="append", help="only this site (repeatable)")
+    parser.add_argument("--greycat", help="Greycat base URL to compare loaded rows with")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.manifest:
+        pairs = read_manifest(args.manifest)
+        if args.sites:
+            pairs = [p for p in pairs if p[0] in args.sites]
+    else:
+        pairs = list(site_days(args.root, args.day_from, args.day_to, set(args.sites or ())))
+
+    report = verify(args.root, pairs, args.greycat)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+    sys.exit(1 if report.get("mismatches") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,24 @@
 #!/usr/bin/env python
-import requests
 import json
+import os
+import sys
 from mcp.server import Server
 from mcp.types import CallToolResult
 
-BACKEND = "http://localhost:8080"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from mcp_common.transport import shared_transport
+
+BACKEND = os.environ.get("GREYCAT_BASE_URL", "http://localhost:8080")
+
+# One keep-alive pool for every tool call (see backend/mcp_common/transport.py)
+transport = shared_transport(BACKEND)
 
 server = Server("twin-greycat")
 
 def jget(path):
     try:
-        return requests.get(BACKEND + path, timeout=10).json()
+        return transport.request_sync("GET", path, timeout=10).json()
     except Exception as e:
         return {"error": str(e)}
 
@@ -1,14 +1,22 @@
+import json
+import os
+import sys
 from mcp.server import Server
 from mcp.types import CallToolResult
-import json
-import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from mcp_common.transport import shared_transport
 
 server = Server("twin-greycat")
 
-BACKEND = "http://localhost:8080"
+BACKEND = os.environ.get("GREYCAT_BASE_URL", "http://localhost:8080")
+
+# One keep-alive pool for every tool call (see backend/mcp_common/transport.py)
+transport = shared_transport(BACKEND)
 
 def call_java(path):
-    return requests.get(f"{BACKEND}{path}").json()
+    return transport.request_sync("GET", path).json()
 
 @server.call_tool("site_trend")
 def site_trend(params):
@@ -1,10 +1,17 @@
 #!/usr/bin/env python
-import json
-import requests
+import os
+import sys
 from mcp.server import FastMCP
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from mcp_common.transport import shared_transport
+
 # Your Java backend HTTP server
-BACKEND = "http://localhost:8080"
+BACKEND = os.environ.get("GREYCAT_BASE_URL", "http://localhost:8080")
+
+# One keep-alive pool for every tool call (see backend/mcp_common/transport.py)
+transport = shared_transport(BACKEND)
 
 # Create MCP server instance
 mcp = FastMCP("twin")
@@ -13,7 +20,7 @@ mcp = FastMCP("twin")
 def safe_get(url: str):
     """Call backend safely and always return a JSON-serializable object."""
     try:
-        resp = requests.get(url, timeout=10)
+        resp = transport.request_sync("GET", url, timeout=10)
         return resp.json()
     except Exception as e:
         return {"error": str(e), "url": url}
@@ -29,7 +36,7 @@ def getCityTotals(day: str) -> dict:
     Get city-level degraded vs non-degraded vehicle counts for a given day
     (YYYY-MM-DD).
     """
-    url = f"{BACKEND}/getCityTotals?day={day}"
+    url = f"/getCityTotals?day={day}"
     return safe_get(url)
 
 
@@ -38,7 +45,7 @@ def getSiteTotals(day: str, site: str) -> dict:
     """
     Get degraded vs non-degraded vehicle counts for a specific site on a day.
     """
-    url = f"{BACKEND}/getSiteTotals?day={day}&site={site}"
+    url = f"/getSiteTotals?day={day}&site={site}"
     return safe_get(url)
 
 
@@ -48,7 +55,7 @@ def getSiteDayStatus(day: str, site: str) -> dict:
     Get full health status of a site on a specific day (detections, good rate,
     color, etc.).
     """
-    url = f"{BACKEND}/getSiteDayStatus?day={day}&site={site}"
+    url = f"/getSiteDayStatus?day={day}&site={site}"
     return safe_get(url)
 
 
@@ -57,7 +64,7 @@ def getVehicleDegradeStatus(plate: str) -> dict:
     """
     Get latest degradation profile for a vehicle (plate).
     """
-    url = f"{BACKEND}/getVehicleDegradeStatus?plate={plate}"
+    url = f"/getVehicleDegradeStatus?plate={plate}"
     return safe_get(url)
 
 
@@ -66,7 +73,7 @@ def getTripsForDay(plate: str, day: str) -> dict:
     """
     Get all 30-min trips for a plate on a given day.
     """
-    url = f"{BACKEND}/getTripsForDay?plate={plate}&day={day}"
+    url = f"/getTripsForDay?plate={plate}&day={day}"
     return safe_get(url)
 
 
@@ -75,7 +82,7 @@ def getTripsAllDays(plate: str) -> dict:
     """
     Get all trips for a plate across all loaded days.
     """
-    url = f"{BACKEND}/getTripsAllDays?plate={plate}"
+    url = f"/getTripsAllDays?plate={plate}"
     return safe_get(url)
 
 
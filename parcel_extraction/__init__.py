@@ -0,0 +1,33 @@
+"""
+Parcel extraction from the Riyadh GeoPortal parcels layer
+
+    python -m parcel_extraction residential --rate 8 --max-concurrency 16
+    python -m parcel_extraction my_job.json
+"""
+
+from parcel_extraction.arcgis import ArcGISClient, ArcGISError
+from parcel_extraction.engine import Extraction, Group, WorkUnit, compare_geometry, run_job
+from parcel_extraction.geometry import feature_point, ring_centroid
+from parcel_extraction.journal import Journal, JournalMismatch, open_journal
+from parcel_extraction.limits import AdaptiveConcurrency, RateLimiter
+from parcel_extraction.spec import PRESETS, JobSpec, load_spec
+
+__all__ = [
+    "AdaptiveConcurrency",
+    "ArcGISClient",
+    "ArcGISError",
+    "Extraction",
+    "Group",
+    "JobSpec",
+    "Journal",
+    "JournalMismatch",
+    "PRESETS",
+    "RateLimiter",
+    "WorkUnit",
+    "compare_geometry",
+    "feature_point",
+    "load_spec",
+    "open_journal",
+    "ring_centroid",
+    "run_job",
+]
@@ -0,0 +1,119 @@
+"""
+Run an extraction job: a preset name or a JSON job spec
+
+    python -m parcel_extraction residential
+    python -m parcel_extraction verification --rate 4 -o verification.csv
+    python -m parcel_extraction job.json --district 077 --district 168
+
+Completed work units are journaled next to the output (<output>.journal), so
+running the same command again after a crash resumes where it stopped;
+--restart discards the journal and extracts everything again.
+
+    python -m parcel_extraction residential --compare-geometry
+
+fetches one sample window in each geometry mode and prints the bytes per
+parcel of each, without writing anything.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+
+from parcel_extraction.engine import (
+    DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RETRIES, DEFAULT_RATE, GEOMETRY_MODES, PAGING_MODES,
+    compare_geometry, run_job,
+)
+from parcel_extraction.journal import JournalMismatch, open_journal
+from parcel_extraction.spec import PRESETS, load_spec
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="parcel_extraction", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("job", help=f"preset ({', '.join(PRESETS)}) or job spec JSON file")
+    parser.add_argument("-o", "--output", help="CSV to write (default: the job's output)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"max requests per second, 0 for no limit (default: {DEFAULT_RATE})")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help=f"max requests in flight (default: {DEFAULT_MAX_CONCURRENCY})")
+    parser.add_argument("--target-rows", type=int,
+                        help="rows a window is sized for (default: 80%% of the layer's maxRecordCount)")
+    parser.add_argument("--window", type=int,
+                        help="fixed OBJECTID window per request (implies --paging oid)")
+    parser.add_argument("--paging", choices=PAGING_MODES, default="auto",
+                        help="offset pages or OBJECTID windows (default auto: offset pages "
+                             "when the layer supports pagination)")
+    parser.add_argument("--geometry", choices=GEOMETRY_MODES, default="auto",
+                        help="how coordinates are obtained (default auto: server centroids when the "
+                             "layer can return them, else generalized rings)")
+    parser.add_argument("--compare-geometry", action="store_true",
+                        help="print the bytes per parcel of each geometry mode on a sample and exit")
+    parser.add_argument("--retries", type=int, default=DEFAULT_MAX_RETRIES)
+    parser.add_argument("--district", dest="districts", action="append", help="only this district (repeatable)")
+    parser.add_argument("--journal", help="work-unit journal (default: <output>.journal)")
+    parser.add_argument("--restart", action="store_true", help="discard the journal and start over")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    spec = load_spec(args.job)
+    if args.output:
+        spec.output = args.output
+    if args.compare_geometry:
+        results = asyncio.run(compare_geometry(spec, rate=args.rate, target_rows=args.target_rows,
+                                               districts=set(args.districts) if args.districts else None))
+        if args.json:
+            json.dump(results, sys.stdout, indent=2)
+            print()
+        else:
+            for r in results:
+                used = "" if r["used"] == r["geometry"] else f" (fell back to {r['used']})"
+                print(f"{r['geometry']:<12} {r['bytes_per_parcel']:>8,.1f} B/parcel "
+                      f"({r['rows']:,} rows, {r['bytes']:,} bytes, {r['sample']}){used}")
+        sys.exit(0 if results else 1)
+    try:
+        journal = open_journal(args.journal or f"{spec.output}.journal", spec, args.restart)
+    except JournalMismatch as e:
+        parser.error(f"{e}; use --restart or another --journal")
+
+    print("=" * 70)
+    print(f"PARCEL EXTRACTION: {spec.name} -> {spec.output}")
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 70)
+
+    report = asyncio.run(run_job(
+        spec,
+        rate=args.rate,
+        max_concurrency=args.max_concurrency,
+        window=args.window,
+        target_rows=args.target_rows,
+        paging=args.paging,
+        geometry=args.geometry,
+        max_retries=args.retries,
+        districts=set(args.districts) if args.districts else None,
+        journal=journal,
+    ))
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print("=" * 70)
+        if report["resumed_units"]:
+            print(f"Resumed after {report['resumed_units']:,} journaled units")
+        print(f"{report['rows']:,} / {report['expected']:,} parcels in {report['seconds']}s "
+              f"({report['rows_per_sec']} rows/s, {report['requests']:,} requests, "
+              f"{report['requests_per_sec']} req/s, peak concurrency {report['peak_concurrency']})")
+        print(f"{report['requests_per_parcel'] or 0:.4f} requests/parcel with {report['paging']} paging "
+              f"({report['units']:,} units, {report['empty_units']:,} empty, {report['bisections']:,} bisected, "
+              f"{len(report['count_mismatches'])} count mismatches)")
+        print(f"{report['bytes'] / (1024 * 1024):.1f} MB transferred, "
+              f"{report['bytes_per_parcel'] or 0:,.0f} bytes/parcel with {report['geometry']} geometry; "
+              f"{len(report['failed_units'])} failed units, {len(report['short_groups'])} short groups")
+        for g in report["short_groups"][:20]:
+            print(f"  short {g['group']}: {g['got']:,} / {g['expected']:,}")
+    sys.exit(1 if report["failed_units"] or report["short_groups"] else 0)
+
+
+if __name__ == "__main__":
+    main()
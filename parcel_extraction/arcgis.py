@@ -0,0 +1,107 @@
+"""
+Async client for the GeoPortal parcels layer (ArcGIS REST MapServer query)
+"""
+
+import json
+from typing import Any, Optional
+
+import httpx
+
+BASE_URL = "https://mapservice.alriyadh.gov.sa/wa_maps/rest/services/BaseMap/Riyadh_BaseMap_V3/MapServer/71/query"
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Referer": "https://mapservice.alriyadh.gov.sa/geoportal/geomap"
+}
+
+DEFAULT_TIMEOUT = 180.0
+
+# Used when the layer does not report maxRecordCount
+DEFAULT_MAX_RECORD_COUNT = 2000
+
+
+class ArcGISError(Exception):
+    """An error object in a 200 response, or an HTTP error status"""
+
+    def __init__(self, message: str, status: Optional[int] = None, details: Optional[list[str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.details = details or []
+
+    @property
+    def throttled(self) -> bool:
+        """The server asked us to slow down (or is overloaded)"""
+        return self.status in (429, 503)
+
+
+class ArcGISClient:
+    """One pooled connection set to the query endpoint, with request/byte counters"""
+
+    def __init__(self, url: str = BASE_URL, timeout: float = DEFAULT_TIMEOUT,
+                 max_connections: int = 64):
+        self.url = url
+        self.client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+        )
+        self.requests = 0
+        self.bytes = 0
+        self.last_bytes = 0
+
+    async def query(self, params: dict) -> dict:
+        """GET the query endpoint with f=json; ArcGISError on an error response"""
+        response = await self.client.get(self.url, params={**params, "f": "json"})
+        self.requests += 1
+        # Decoded size, so the same response compares alike with or without gzip
+        self.last_bytes = len(response.content)
+        self.bytes += self.last_bytes
+        if response.status_code != 200:
+            raise ArcGISError(f"HTTP {response.status_code}", response.status_code)
+
+        data = response.json()
+        if "error" in data:
+            error = data["error"]
+            raise ArcGISError(error.get("message", "Unknown error"), error.get("code"),
+                              [str(d) for d in error.get("details") or []])
+        return data
+
+    async def group_stats(self, where: str, group_fields: list[str],
+                          statistics: list[tuple[str, str, str]]) -> list[dict]:
+        """
+        Attributes of a grouped outStatistics query; statistics are
+        (statisticType, onStatisticField, outStatisticFieldName)
+        """
+        data = await self.query({
+            "where": where,
+            "groupByFieldsForStatistics": ",".join(group_fields),
+            "outStatistics": json.dumps([
+                {"statisticType": t, "onStatisticField": f, "outStatisticFieldName": n}
+                for t, f, n in statistics
+            ]),
+        })
+        return [f.get("attributes", {}) for f in data.get("features", [])]
+
+    async def layer_info(self) -> dict:
+        """The layer description (maxRecordCount, advancedQueryCapabilities, ...); {} if unavailable"""
+        response = await self.client.get(self.url.rsplit("/query", 1)[0], params={"f": "json"})
+        self.requests += 1
+        self.bytes += len(response.content)
+        try:
+            info = response.json()
+        except ValueError:
+            return {}
+        return info if isinstance(info, dict) and "error" not in info else {}
+
+    def stats(self) -> dict[str, Any]:
+        return {"requests": self.requests, "bytes": self.bytes}
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def stat_value(attributes: dict, name: str) -> Any:
+    """A statistic by its out name; some servers lower-case the field names"""
+    value = attributes.get(name)
+    return value if value is not None else attributes.get(name.lower())
@@ -0,0 +1,606 @@
+"""
+Concurrent extraction of a job's parcels
+
+Planning is one grouped statistics query: count and OBJECTID range per
+district (and land use). Each group is cut into OBJECTID windows, the work
+units, which a pool of workers fetches through the rate limiter and the
+adaptive concurrency limit.
+
+Windows are sized from the group's density (count / OBJECTID span) to hold
+about target_rows rows, a fraction of the layer's maxRecordCount, so a
+sparse district takes one wide window instead of many empty ones. A window
+that still comes back with exceededTransferLimit is bisected and both halves
+fetched again (its rows are discarded), so no window is ever truncated.
+
+When the layer supports pagination, a unit is instead an OBJECTID span of a
+group sized for about PAGED_SPAN_PAGES pages, read in resultOffset /
+resultRecordCount pages ordered by OBJECTID, all pages of a unit in
+parallel. Spans keep what a crash costs to a few pages: each is journaled
+on its own. The rows are checked against the span's returnCountOnly count;
+a group small enough to be a single span is checked against its planning
+count instead, saving the count request, and is counted again only when
+its rows do not match. A unit that does not match its count is fetched
+again in OBJECTID windows.
+
+Each parcel's coordinates need one point, so by default the server computes
+it (returnCentroid) and no polygon is transferred. Where the layer cannot
+return centroids, rings are fetched generalized (maxAllowableOffset) and
+rounded (geometryPrecision), and the point is their vertex average as
+before; "full" fetches the rings as they are. A server that refuses
+returnCentroid with a generic HTTP 400 is told apart from a bad query by
+asking once again with rings.
+
+Rows are appended to the job's CSV as units complete; failed units are
+retried with backoff and reported, never silently dropped. With a journal
+(see journal.py), every completed unit is recorded and a restarted job only
+fetches what is not recorded yet.
+"""
+
+import asyncio
+import csv
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import httpx
+
+from parcel_extraction.arcgis import DEFAULT_MAX_RECORD_COUNT, ArcGISClient, ArcGISError, stat_value
+from parcel_extraction.journal import Journal, uncovered
+from parcel_extraction.limits import AdaptiveConcurrency, RateLimiter
+from parcel_extraction.spec import JobSpec
+
+DEFAULT_RATE = 5.0
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_MAX_RETRIES = 3
+# Fraction of maxRecordCount a window is sized for; the headroom absorbs
+# uneven density within a group, bisection handles the rest
+TARGET_FILL = 0.8
+# Pages an offset-paged unit is sized for: the most a crash refetches,
+# against one count request per unit
+PAGED_SPAN_PAGES = 10
+
+PAGING_MODES = ("auto", "offset", "oid")
+GEOMETRY_MODES = ("auto", "centroid", "generalized", "full")
+# Generalization tolerance and coordinate decimals for rings in degrees
+# (outSR 4326): about 1 m and 1 cm, below the CSV's 6 decimals of the
+# vertex average for parcel-sized polygons
+GENERALIZE_OFFSET = 1e-5
+GEOMETRY_PRECISION = 7
+PROGRESS_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class Group:
+    """The parcels of one district (and land use) matching the job"""
+    district: str
+    land_use: Optional[int]
+    where: str
+    expected: int
+    oid_min: int
+    oid_max: int
+
+    @property
+    def key(self) -> tuple[str, Optional[int]]:
+        return self.district, self.land_use
+
+    @property
+    def label(self) -> str:
+        return self.district if self.land_use is None else f"{self.district}/{self.land_use}"
+
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """A group's OBJECTIDs in [oid_start, oid_end): one request, or offset pages if paged"""
+    group: Group
+    oid_start: int
+    oid_end: int
+    paged: bool = False
+
+    @property
+    def where(self) -> str:
+        return f"{self.group.where} AND OBJECTID >= {self.oid_start} AND OBJECTID < {self.oid_end}"
+
+    @property
+    def width(self) -> int:
+        return self.oid_end - self.oid_start
+
+    @property
+    def whole_group(self) -> bool:
+        return self.oid_start <= self.group.oid_min and self.oid_end > self.group.oid_max
+
+    def halves(self) -> tuple["WorkUnit", "WorkUnit"]:
+        middle = self.oid_start + self.width // 2
+        return WorkUnit(self.group, self.oid_start, middle), WorkUnit(self.group, middle, self.oid_end)
+
+    @property
+    def label(self) -> str:
+        return f"{self.group.label} [{self.oid_start}, {self.oid_end})"
+
+
+def sql_literal(value) -> str:
+    return f"'{value}'" if isinstance(value, str) else str(value)
+
+
+def window_units(group: Group, window: int, oid_start: Optional[int] = None,
+                 oid_end: Optional[int] = None) -> list[WorkUnit]:
+    """[oid_start, oid_end) (default: the whole group) in windows of `window` OBJECTIDs"""
+    start = group.oid_min if oid_start is None else oid_start
+    end = group.oid_max + 1 if oid_end is None else oid_end
+    return [WorkUnit(group, lo, min(lo + window, end)) for lo in range(start, end, window)]
+
+
+def density_units(group: Group, target_rows: int, oid_start: Optional[int] = None,
+                  oid_end: Optional[int] = None) -> list[WorkUnit]:
+    """[oid_start, oid_end) in equal windows expected to hold about target_rows rows each"""
+    start = group.oid_min if oid_start is None else oid_start
+    end = group.oid_max + 1 if oid_end is None else oid_end
+    expected = group.expected * (end - start) / (group.oid_max + 1 - group.oid_min)
+    n_windows = max(1, math.ceil(expected / target_rows))
+    return window_units(group, math.ceil((end - start) / n_windows), start, end)
+
+
+def rejects_centroid(error: ArcGISError) -> bool:
+    """
+    The error names returnCentroid; a generic HTTP 400 may still be about it
+    (see Extraction.probe_rings), other errors go through the normal retries
+    """
+    return any("centroid" in text.lower() for text in (str(error), *error.details))
+
+
+def is_backoff_error(error: Exception) -> bool:
+    """Failures that mean the server wants fewer requests"""
+    if isinstance(error, ArcGISError):
+        return error.throttled
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+class Extraction:
+    def __init__(self, spec: JobSpec, client: ArcGISClient,
+                 rate: float = DEFAULT_RATE,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 window: Optional[int] = None,
+                 target_rows: Optional[int] = None,
+                 paging: str = "auto",
+                 geometry: str = "auto",
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 districts: Optional[set[str]] = None,
+                 journal: Optional[Journal] = None,
+                 log: Callable[[str], None] = print):
+        self.spec = spec
+        self.client = client
+        self.rate = RateLimiter(rate)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.window = window
+        self.target_rows = target_rows
+        self.paging = paging
+        self.page_size = DEFAULT_MAX_RECORD_COUNT
+        self.offset_paging = False
+        self.geometry = geometry
+        self.max_retries = max_retries
+        self.districts = districts
+        self.journal = journal
+        self.log = log
+
+        self.units_done = 0
+        self.units_total = 0
+        self.rows = 0
+        self.rows_by_group: dict[Group, int] = {}
+        self.failed: list[dict] = []
+        self.truncated: list[str] = []
+        self.resumed_units = 0
+        self.resumed_rows = 0
+        self.bisections = 0
+        self.empty_units = 0
+        self.count_checks = 0
+        self.count_mismatches: list[dict] = []
+        self.geometry_fallback: Optional[str] = None
+        self.centroid_probed = False
+        self.parcel_bytes = 0
+        self.parcels_fetched = 0
+
+    async def plan(self) -> list[Group]:
+        """Count and OBJECTID range per district (and land use), largest first"""
+        group_fields = ["DISTRICT"] + (["LANDUSEADETAILED"] if self.spec.split_land_use else [])
+        rows = await self.client.group_stats(self.spec.where, group_fields, [
+            ("count", "OBJECTID", "COUNT"),
+            ("min", "OBJECTID", "MIN_OID"),
+            ("max", "OBJECTID", "MAX_OID"),
+        ])
+
+        groups = []
+        for attrs in rows:
+            district = attrs.get("DISTRICT")
+            count = int(stat_value(attrs, "COUNT") or 0)
+            if not district or count == 0:
+                continue
+            if self.districts is not None and district not in self.districts:
+                continue
+
+            where = f"({self.spec.where}) AND DISTRICT={sql_literal(district)}"
+            land_use = None
+            if self.spec.split_land_use:
+                land_use = attrs.get("LANDUSEADETAILED")
+                where += (" AND LANDUSEADETAILED IS NULL" if land_use is None
+                          else f" AND LANDUSEADETAILED={sql_literal(land_use)}")
+
+            groups.append(Group(district, land_use, where, count,
+                                int(stat_value(attrs, "MIN_OID")), int(stat_value(attrs, "MAX_OID"))))
+        return sorted(groups, key=lambda g: -g.expected)
+
+    async def configure(self):
+        """Page size and paging mode from the layer description"""
+        info = await self.client.layer_info()
+        self.page_size = int(info.get("maxRecordCount") or DEFAULT_MAX_RECORD_COUNT)
+        capabilities = info.get("advancedQueryCapabilities") or {}
+        supported = bool(capabilities.get("supportsPagination") and capabilities.get("supportsOrderBy", True))
+        self.offset_paging = not self.window and (
+            self.paging == "offset" or (self.paging == "auto" and supported))
+        if not self.window and not self.target_rows:
+            self.target_rows = max(1, int(self.page_size * TARGET_FILL))
+        if self.geometry == "auto":
+            self.geometry = ("centroid" if capabilities.get("supportsReturningGeometryCentroid")
+                             else "generalized")
+
+    def geometry_params(self, geometry: Optional[str] = None) -> dict:
+        """Query parameters returning what a geometry mode (default: the job's) needs for a row's point"""
+        geometry = geometry or self.geometry
+        if geometry == "centroid":
+            return {"returnGeometry": "false", "returnCentroid": "true", "outSR": "4326"}
+        params = {"returnGeometry": "true", "outSR": "4326"}
+        if geometry == "generalized":
+            params.update(maxAllowableOffset=GENERALIZE_OFFSET, geometryPrecision=GEOMETRY_PRECISION)
+        return params
+
+    def fall_back_to_rings(self, reason: str):
+        """Centroids are not available after all: fetch generalized rings from now on"""
+        if self.geometry == "centroid":
+            self.geometry = "generalized"
+            self.geometry_fallback = reason
+            self.log(f"    ⚠ server centroids unavailable ({reason}), using generalized rings")
+
+    def query_params(self, unit: WorkUnit, offset: Optional[int] = None,
+                     geometry: Optional[str] = None) -> dict:
+        params = {
+            "where": unit.where,
+            "outFields": ",".join(self.spec.out_fields),
+            **self.geometry_params(geometry),
+        }
+        if offset is not None:
+            params.update(orderByFields="OBJECTID ASC", resultOffset=offset, resultRecordCount=self.page_size)
+        return params
+
+    async def probe_rings(self, unit: WorkUnit, offset: Optional[int], error: ArcGISError) -> dict:
+        """
+        After the first HTTP 400 to a centroid query, the same query with
+        rings: if it succeeds the 400 was returnCentroid, so rings are used
+        from now on and its response is returned; otherwise `error` is raised
+        """
+        if error.status != 400 or self.centroid_probed:
+            raise error
+        self.centroid_probed = True
+        try:
+            data = await self.client.query(self.query_params(unit, offset, "generalized"))
+        except ArcGISError:
+            raise error
+        self.fall_back_to_rings(f"HTTP 400 with returnCentroid only: {error}")
+        return data
+
+    async def fetch_unit(self, unit: WorkUnit, offset: Optional[int] = None) -> tuple[list[dict], bool]:
+        """(rows, exceededTransferLimit) of the unit's window, or of one page of it"""
+        centroid = self.geometry == "centroid"
+        try:
+            data = await self.client.query(self.query_params(unit, offset))
+        except ArcGISError as e:
+            if not centroid:
+                raise
+            if rejects_centroid(e):
+                self.fall_back_to_rings("; ".join((str(e), *e.details)))
+                return await self.fetch_unit(unit, offset)
+            data = await self.probe_rings(unit, offset, e)
+            centroid = False
+
+        features = data.get("features", [])
+        if centroid and features and "centroid" not in features[0]:
+            # returnCentroid was ignored: no centroid and no geometry to compute one from
+            self.fall_back_to_rings("returnCentroid ignored")
+            return await self.fetch_unit(unit, offset)
+        self.parcel_bytes += self.client.last_bytes
+        self.parcels_fetched += len(features)
+        rows = [self.spec.row(f) for f in features]
+        return rows, bool(data.get("exceededTransferLimit"))
+
+    async def count_unit(self, unit: WorkUnit) -> int:
+        data = await self.client.query({"where": unit.where, "returnCountOnly": "true"})
+        self.count_checks += 1
+        return int(data.get("count", 0))
+
+    async def fetch_with_retries(self, unit: WorkUnit, request: Optional[Callable] = None):
+        """request() (default: fetch the unit) with retries; None once they are used up"""
+        for attempt in range(self.max_retries + 1):
+            await self.concurrency.acquire()
+            await self.rate.wait()
+            try:
+                rows = await (request() if request is not None else self.fetch_unit(unit))
+            except (ArcGISError, httpx.HTTPError, ValueError) as e:
+                await self.concurrency.release(ok=False, backoff=is_backoff_error(e))
+                if attempt == self.max_retries:
+                    self.failed.append({"unit": unit.label, "error": f"{type(e).__name__}: {e}"})
+                    self.log(f"    ✗ {unit.label}: {type(e).__name__}: {e}")
+                    return None
+                await asyncio.sleep(2 ** attempt)
+            else:
+                await self.concurrency.release(ok=True)
+                return rows
+
+    async def fetch_pages(self, unit: WorkUnit) -> Optional[tuple[list[dict], int]]:
+        """
+        (rows, count) of a unit read by offset pages; None if a request failed.
+        A whole group trusts its planning count unless the rows disagree.
+        """
+        if unit.whole_group:
+            expected = unit.group.expected
+        else:
+            expected = await self.fetch_with_retries(unit, lambda: self.count_unit(unit))
+            if expected is None:
+                return None
+
+        n_pages = max(1, math.ceil(expected / self.page_size))
+        pages = await asyncio.gather(*(
+            self.fetch_with_retries(unit, lambda offset=i * self.page_size: self.fetch_unit(unit, offset))
+            for i in range(n_pages)
+        ))
+        if any(page is None for page in pages):
+            return None
+        rows = [row for page_rows, _ in pages for row in page_rows]
+
+        # More rows than counted: keep paging until the server says there are no more
+        exceeded = pages[-1][1]
+        while exceeded:
+            page = await self.fetch_with_retries(unit, lambda: self.fetch_unit(unit, len(rows)))
+            if page is None:
+                return None
+            rows.extend(page[0])
+            exceeded = page[1] and bool(page[0])
+
+        # Pages shift if rows change while reading; keep each OBJECTID once
+        rows = list({row["objectid"]: row for row in rows}.values())
+
+        if len(rows) != expected and unit.whole_group:
+            # The planning count may be stale; ask for the current one
+            expected = await self.fetch_with_retries(unit, lambda: self.count_unit(unit))
+            if expected is None:
+                return None
+        return rows, expected
+
+    def group_units(self, group: Group, oid_start: Optional[int] = None,
+                    oid_end: Optional[int] = None) -> list[WorkUnit]:
+        if self.offset_paging:
+            spans = density_units(group, PAGED_SPAN_PAGES * self.page_size, oid_start, oid_end)
+            return [WorkUnit(group, u.oid_start, u.oid_end, paged=True) for u in spans]
+        if self.window:
+            return window_units(group, self.window, oid_start, oid_end)
+        return density_units(group, self.target_rows, oid_start, oid_end)
+
+    def pending_units(self, groups: list[Group]) -> list[WorkUnit]:
+        """Work units of the groups, minus the ranges the journal has recorded"""
+        if self.journal is None:
+            return [u for g in groups for u in self.group_units(g)]
+
+        completed = self.journal.completed()
+        units = []
+        for g in groups:
+            done = completed.get(g.key, [])
+            rows = sum(r for _, _, r in done)
+            self.resumed_units += len(done)
+            self.resumed_rows += rows
+            self.rows_by_group[g] = rows
+            for start, end in uncovered(g.oid_min, g.oid_max + 1, done):
+                units.extend(self.group_units(g, start, end))
+        return units
+
+    def open_output(self):
+        """The CSV for appending, cut back to the journal's last recorded size"""
+        offset = self.journal.csv_offset() if self.journal is not None else 0
+        if offset == 0:
+            f = open(self.spec.output, "w", newline="", encoding="utf-8")
+            csv.DictWriter(f, fieldnames=self.spec.columns).writeheader()
+            return f
+
+        size = os.path.getsize(self.spec.output) if os.path.exists(self.spec.output) else 0
+        if size < offset:
+            raise RuntimeError(f"{self.spec.output} is shorter than its journal "
+                               f"({size} < {offset} bytes); restart the job")
+        os.truncate(self.spec.output, offset)
+        return open(self.spec.output, "a", newline="", encoding="utf-8")
+
+    def write_unit(self, f, writer: csv.DictWriter, unit: WorkUnit, rows: list[dict]):
+        """Append a unit's rows, then record it (no await: units are written one at a time)"""
+        writer.writerows(rows)
+        self.rows += len(rows)
+        self.rows_by_group[unit.group] = self.rows_by_group.get(unit.group, 0) + len(rows)
+        if self.journal is not None:
+            f.flush()
+            os.fsync(f.fileno())
+            self.journal.record(unit.group.district, unit.group.land_use, unit.oid_start, unit.oid_end,
+                                len(rows), os.fstat(f.fileno()).st_size)
+
+    async def worker(self, queue: asyncio.Queue, f, writer: csv.DictWriter):
+        while True:
+            unit = await queue.get()
+            try:
+                if unit.paged:
+                    await self.process_paged(queue, f, writer, unit)
+                    continue
+                result = await self.fetch_with_retries(unit)
+                if result is None:
+                    continue
+                rows, exceeded = result
+                if exceeded and unit.width > 1:
+                    # Truncated: fetch both halves instead
+                    self.bisections += 1
+                    for half in unit.halves():
+                        queue.put_nowait(half)
+                    self.units_total += 2
+                    continue
+                if exceeded:
+                    self.truncated.append(unit.label)
+                    self.log(f"    ⚠ {unit.label} exceeded the transfer limit")
+                if not rows:
+                    self.empty_units += 1
+                self.write_unit(f, writer, unit, rows)
+            finally:
+                self.units_done += 1
+                queue.task_done()
+
+    async def process_paged(self, queue: asyncio.Queue, f, writer: csv.DictWriter, unit: WorkUnit):
+        result = await self.fetch_pages(unit)
+        if result is None:
+            return
+        rows, expected = result
+        if len(rows) != expected:
+            # Offset pages did not add up: fetch the unit again in OBJECTID windows
+            self.count_mismatches.append({"unit": unit.label, "expected": expected, "got": len(rows)})
+            self.log(f"    ⚠ {unit.label}: {len(rows):,} rows for a count of {expected:,}, "
+                     f"refetching by OBJECTID windows")
+            for part in density_units(unit.group, self.target_rows, unit.oid_start, unit.oid_end):
+                queue.put_nowait(part)
+                self.units_total += 1
+            return
+        if not rows:
+            self.empty_units += 1
+        self.write_unit(f, writer, unit, rows)
+
+    async def progress(self, start: float):
+        while True:
+            await asyncio.sleep(PROGRESS_SECONDS)
+            elapsed = time.perf_counter() - start
+            self.log(f"    --- {self.units_done:,}/{self.units_total:,} units, {self.rows:,} rows, "
+                     f"{self.client.requests / elapsed:.1f} req/s, "
+                     f"{self.requests_per_parcel() or 0:.4f} req/parcel, "
+                     f"{self.bytes_per_parcel() or 0:.0f} B/parcel, "
+                     f"concurrency {self.concurrency.limit} ---")
+
+    def requests_per_parcel(self) -> Optional[float]:
+        return self.client.requests / self.rows if self.rows else None
+
+    def bytes_per_parcel(self) -> Optional[float]:
+        """Feature response bytes per parcel received (planning and counts excluded)"""
+        return self.parcel_bytes / self.parcels_fetched if self.parcels_fetched else None
+
+    async def compare_geometry(self, modes: tuple[str, ...] = ("full", "generalized", "centroid")) -> list[dict]:
+        """
+        Bytes per parcel of each geometry mode on the same sample: the first
+        window of the largest group. Nothing is written.
+        """
+        await self.configure()
+        groups = await self.plan()
+        if not groups:
+            return []
+        unit = density_units(groups[0], self.target_rows or self.page_size)[0]
+
+        results = []
+        for mode in modes:
+            self.geometry = mode
+            self.geometry_fallback = None
+            self.centroid_probed = False
+            self.parcel_bytes = self.parcels_fetched = 0
+            rows, _ = await self.fetch_unit(unit)
+            results.append({
+                "geometry": mode,
+                "used": self.geometry,
+                "sample": unit.label,
+                "rows": len(rows),
+                "bytes": self.parcel_bytes,
+                "bytes_per_parcel": round(self.bytes_per_parcel() or 0, 1),
+            })
+        return results
+
+    async def run(self) -> dict:
+        start = time.perf_counter()
+        await self.configure()
+        groups = await self.plan()
+        units = self.pending_units(groups)
+        self.units_total = len(units)
+        expected = sum(g.expected for g in groups)
+        self.log(f"{self.spec.name}: {expected:,} parcels in {len(groups)} groups, {len(units):,} work units "
+                 f"({'offset pages' if self.offset_paging else 'OBJECTID windows'} of {self.page_size}, "
+                 f"{self.geometry} geometry)")
+        if self.resumed_units:
+            self.log(f"Resuming: {self.resumed_units:,} units ({self.resumed_rows:,} rows) already done")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for unit in units:
+            queue.put_nowait(unit)
+
+        with self.open_output() as f:
+            writer = csv.DictWriter(f, fieldnames=self.spec.columns)
+            # Workers run until the queue (which bisection refills) is drained
+            workers = [asyncio.create_task(self.worker(queue, f, writer))
+                       for _ in range(self.concurrency.max_limit)]
+            joined = asyncio.create_task(queue.join())
+            tasks = [asyncio.create_task(self.progress(start)), joined, *workers]
+            try:
+                done, _ = await asyncio.wait([joined, *workers], return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is not joined:
+                        task.result()  # a worker only stops on an unexpected error
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        seconds = time.perf_counter() - start
+        short = [{"group": g.label, "expected": g.expected, "got": self.rows_by_group.get(g, 0)}
+                 for g in groups if self.rows_by_group.get(g, 0) < g.expected]
+        return {
+            "job": self.spec.name,
+            "output": self.spec.output,
+            "groups": len(groups),
+            "units": self.units_done,
+            "paging": "offset" if self.offset_paging else "oid",
+            "page_size": self.page_size,
+            "target_rows": self.target_rows,
+            "window": self.window,
+            "bisections": self.bisections,
+            "empty_units": self.empty_units,
+            "count_checks": self.count_checks,
+            "count_mismatches": self.count_mismatches,
+            "geometry": self.geometry,
+            "geometry_fallback": self.geometry_fallback,
+            "failed_units": self.failed,
+            "truncated_units": self.truncated,
+            "expected": expected,
+            "rows": self.rows + self.resumed_rows,
+            "new_rows": self.rows,
+            "resumed_units": self.resumed_units,
+            "short_groups": short,
+            **self.client.stats(),
+            "seconds": round(seconds, 2),
+            "rows_per_sec": round(self.rows / seconds, 1) if seconds else None,
+            "requests_per_sec": round(self.client.requests / seconds, 2) if seconds else None,
+            "requests_per_parcel": self.requests_per_parcel(),
+            "bytes_per_parcel": round(self.bytes_per_parcel(), 1) if self.parcels_fetched else None,
+            "peak_concurrency": self.concurrency.peak,
+        }
+
+
+async def run_job(spec: JobSpec, **options) -> dict:
+    """Plan and extract a job with a fresh client"""
+    client = ArcGISClient()
+    try:
+        return await Extraction(spec, client, **options).run()
+    finally:
+        await client.close()
+        if options.get("journal") is not None:
+            options["journal"].close()
+
+
+async def compare_geometry(spec: JobSpec, **options) -> list[dict]:
+    """Extraction.compare_geometry with a fresh client"""
+    client = ArcGISClient()
+    try:
+        return await Extraction(spec, client, **options).compare_geometry()
+    finally:
+        await client.close()
@@ -0,0 +1,26 @@
+"""
+Parcel geometry helpers
+"""
+
+from typing import Optional
+
+
+def ring_centroid(rings: Optional[list]) -> tuple[Optional[float], Optional[float]]:
+    """(lat, lng) as the vertex average of a polygon's outer ring, (None, None) if empty"""
+    if not rings or not rings[0]:
+        return None, None
+    points = rings[0]
+    lng = sum(p[0] for p in points) / len(points)
+    lat = sum(p[1] for p in points) / len(points)
+    return lat, lng
+
+
+def feature_point(feature: dict) -> tuple[Optional[float], Optional[float]]:
+    """
+    (lat, lng) of a query feature: the server's centroid (returnCentroid)
+    when present, else computed from the polygon rings
+    """
+    centroid = feature.get("centroid")
+    if centroid and centroid.get("x") is not None:
+        return centroid.get("y"), centroid.get("x")
+    return ring_centroid((feature.get("geometry") or {}).get("rings"))
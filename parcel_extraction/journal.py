@@ -0,0 +1,115 @@
+"""
+Work-unit journal for resumable extraction (sqlite)
+
+Every completed unit is recorded as its district, land use, OBJECTID range,
+row count and the CSV size after its rows were written (flushed and
+fsynced first). A restarted job:
+
+- truncates the CSV to the last recorded size, dropping rows of a unit that
+  was written but not recorded, so no row is written twice;
+- plans the job again and fetches only the OBJECTID ranges of each group
+  that no recorded unit covers.
+
+The journal stores the job's fingerprint (where-clause, fields, columns)
+and refuses to resume a different job.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from typing import Optional
+
+from parcel_extraction.spec import JobSpec
+
+GroupKey = tuple[str, Optional[int]]
+
+
+def job_fingerprint(spec: JobSpec) -> str:
+    return json.dumps({
+        "where": spec.where,
+        "out_fields": spec.out_fields,
+        "split_land_use": spec.split_land_use,
+        "columns": spec.columns,
+    }, sort_keys=True)
+
+
+class JournalMismatch(Exception):
+    """The journal belongs to another job"""
+
+
+class Journal:
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS units ("
+            " district TEXT NOT NULL, land_use TEXT NOT NULL,"
+            " oid_start INTEGER NOT NULL, oid_end INTEGER NOT NULL,"
+            " rows INTEGER NOT NULL, csv_offset INTEGER NOT NULL, completed_at REAL NOT NULL,"
+            " PRIMARY KEY (district, land_use, oid_start))"
+        )
+        self.db.commit()
+
+    def bind(self, spec: JobSpec):
+        """Record the job on a new journal; JournalMismatch if it holds another job"""
+        fingerprint = job_fingerprint(spec)
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'job'").fetchone()
+        if row is None:
+            self.db.execute("INSERT INTO meta VALUES ('job', ?)", (fingerprint,))
+            self.db.commit()
+        elif row[0] != fingerprint:
+            raise JournalMismatch(f"{self.path} was written for another job spec")
+
+    def csv_offset(self) -> int:
+        """CSV size after the last recorded unit (0: nothing recorded)"""
+        row = self.db.execute("SELECT MAX(csv_offset) FROM units").fetchone()
+        return row[0] or 0
+
+    def completed(self) -> dict[GroupKey, list[tuple[int, int, int]]]:
+        """(oid_start, oid_end, rows) of the recorded units per (district, land use), sorted"""
+        out: dict[GroupKey, list[tuple[int, int, int]]] = {}
+        for district, land_use, start, end, rows in self.db.execute(
+                "SELECT district, land_use, oid_start, oid_end, rows FROM units "
+                "ORDER BY district, land_use, oid_start"):
+            out.setdefault((district, json.loads(land_use)), []).append((start, end, rows))
+        return out
+
+    def record(self, district: str, land_use: Optional[int], oid_start: int, oid_end: int,
+               rows: int, csv_offset: int):
+        self.db.execute(
+            "INSERT OR REPLACE INTO units VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (district, json.dumps(land_use), oid_start, oid_end, rows, csv_offset, time.time())
+        )
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+def uncovered(oid_min: int, oid_end: int, covered: list[tuple[int, int, int]]) -> list[tuple[int, int]]:
+    """Gaps of [oid_min, oid_end) not covered by the sorted (start, end, rows) ranges"""
+    gaps = []
+    cursor = oid_min
+    for start, end, _ in covered:
+        if start > cursor:
+            gaps.append((cursor, min(start, oid_end)))
+        cursor = max(cursor, end)
+        if cursor >= oid_end:
+            break
+    if cursor < oid_end:
+        gaps.append((cursor, oid_end))
+    return [(a, b) for a, b in gaps if a < b]
+
+
+def open_journal(path: str, spec: JobSpec, restart: bool = False) -> Journal:
+    """The journal at path for spec; restart discards an existing journal"""
+    if restart:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    journal = Journal(path)
+    journal.bind(spec)
+    return journal
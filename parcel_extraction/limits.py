@@ -0,0 +1,71 @@
+"""
+Request pacing: a politeness rate limit and an adaptive concurrency limit
+
+RateLimiter caps requests per second across all workers. AdaptiveConcurrency
+caps requests in flight and adjusts the cap AIMD-style: +1 after a full
+window of successes, halved on a throttling response, timeout or connection
+error.
+Together they let the pool grow until the permitted rate, not the request
+latency, is the bound.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Token bucket: `rate` requests per second, up to `burst` at once (rate <= 0: no limit)"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AdaptiveConcurrency:
+    """In-flight limit between min_limit and max_limit, adjusted from request outcomes"""
+
+    def __init__(self, max_limit: int, min_limit: int = 1, initial: Optional[int] = None):
+        self.max_limit = max(max_limit, 1)
+        self.min_limit = min(max(min_limit, 1), self.max_limit)
+        self.limit = min(max(initial or self.min_limit, self.min_limit), self.max_limit)
+        self.in_flight = 0
+        self.peak = self.limit
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self, ok: bool, backoff: bool = False):
+        """ok: the request succeeded; backoff: it failed in a way that calls for fewer requests"""
+        async with self._condition:
+            self.in_flight -= 1
+            if backoff:
+                self.limit = max(self.min_limit, self.limit // 2)
+                self._successes = 0
+            elif ok:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_limit:
+                    self.limit += 1
+                    self.peak = max(self.peak, self.limit)
+                    self._successes = 0
+            self._condition.notify_all()
@@ -0,0 +1,120 @@
+"""
+Declarative extraction jobs
+
+A job is a where-clause over the parcels layer, the fields to fetch and the
+CSV to write. It is given as a JSON file or by a preset name:
+
+    {
+      "name": "residential",
+      "where": "LANDUSEADETAILED IN (1000, 1012, 1100)",
+      "out_fields": ["OBJECTID", "PARCELID", "PARCELNO", "BLOCKNO", "PLANNO",
+                     "DISTRICT", "LANDUSEADETAILED"],
+      "output": "riyadh_residential_parcels_geo.csv",
+      "split_land_use": true,
+      "building_type": true,
+      "constants": {}
+    }
+
+Work is split per district (and per land use with split_land_use), then
+into OBJECTID windows.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+from parcel_extraction.geometry import feature_point
+
+LAND_USE_TYPES = {
+    1000: "VILLA",      # سكني - فلل
+    1012: "APARTMENT",  # سكني تجاري - عمائر
+    1100: "COMPLEX"     # مجمعات سكنية
+}
+
+DEFAULT_OUT_FIELDS = ["OBJECTID", "PARCELID", "PARCELNO", "BLOCKNO", "PLANNO", "DISTRICT", "LANDUSEADETAILED"]
+
+# Layer field -> CSV column (other fields are lower-cased)
+FIELD_COLUMNS = {
+    "OBJECTID": "objectid",
+    "PARCELID": "parcel_id",
+    "PARCELNO": "parcel_no",
+    "BLOCKNO": "block_no",
+    "PLANNO": "plan_no",
+    "DISTRICT": "district",
+    "LANDUSEADETAILED": "land_use_code",
+}
+
+COORDINATE_DIGITS = 6
+
+
+@dataclass
+class JobSpec:
+    name: str
+    where: str
+    output: str
+    out_fields: list[str] = field(default_factory=lambda: list(DEFAULT_OUT_FIELDS))
+    split_land_use: bool = False
+    building_type: bool = False
+    constants: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "JobSpec":
+        unknown = set(data) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Unknown job spec keys: {', '.join(sorted(unknown))}")
+        spec = cls(**data)
+        if "OBJECTID" not in spec.out_fields:
+            spec.out_fields = ["OBJECTID", *spec.out_fields]
+        return spec
+
+    @classmethod
+    def from_file(cls, path: str) -> "JobSpec":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @property
+    def columns(self) -> list[str]:
+        """CSV header: fetched fields, derived columns, constants, coordinates"""
+        columns = [FIELD_COLUMNS.get(f, f.lower()) for f in self.out_fields]
+        if self.building_type:
+            columns.append("building_type")
+        columns += list(self.constants)
+        return columns + ["latitude", "longitude"]
+
+    def row(self, feature: dict) -> dict:
+        """CSV row of one query feature"""
+        attributes = feature.get("attributes") or {}
+        out = {FIELD_COLUMNS.get(f, f.lower()): attributes.get(f) for f in self.out_fields}
+        if self.building_type:
+            out["building_type"] = LAND_USE_TYPES.get(attributes.get("LANDUSEADETAILED"), "OTHER")
+        out.update(self.constants)
+        lat, lng = feature_point(feature)
+        out["latitude"] = round(lat, COORDINATE_DIGITS) if lat is not None else None
+        out["longitude"] = round(lng, COORDINATE_DIGITS) if lng is not None else None
+        return out
+
+
+PRESETS = {
+    # Villas, apartments and residential complexes
+    "residential": dict(
+        name="residential",
+        where="LANDUSEADETAILED IN (1000, 1012, 1100)",
+        output="riyadh_residential_parcels_geo.csv",
+        split_land_use=True,
+        building_type=True,
+    ),
+    # Parcels without a detailed land use
+    "verification": dict(
+        name="verification",
+        where="(LANDUSEADETAILED IS NULL OR LANDUSEADETAILED = 0)",
+        output="riyadh_verification_needed_parcels.csv",
+        constants={"status": "NEEDS_VERIFICATION"},
+    ),
+}
+
+
+def load_spec(name_or_path: str) -> JobSpec:
+    """A preset by name, or a JSON job spec file"""
+    if name_or_path in PRESETS:
+        return JobSpec.from_dict(dict(PRESETS[name_or_path]))
+    return JobSpec.from_file(name_or_path)
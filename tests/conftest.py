@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# parcel_extraction is imported from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parcel_extraction.spec import JobSpec  # noqa: E402
+
+
+@pytest.fixture
+def spec(tmp_path):
+    return JobSpec.from_dict({
+        "name": "test",
+        "where": "1=1",
+        "out_fields": ["OBJECTID", "DISTRICT"],
+        "output": str(tmp_path / "parcels.csv"),
+    })
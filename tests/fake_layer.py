@@ -0,0 +1,104 @@
+"""An in-memory parcels layer behind httpx.MockTransport"""
+
+import asyncio
+import csv
+import re
+
+import httpx
+
+from parcel_extraction.arcgis import ArcGISClient
+from parcel_extraction.engine import Extraction
+
+
+class FakeLayer:
+    """
+    In-memory parcels layer answering the queries the engine sends: the
+    layer description, grouped statistics, returnCountOnly, OBJECTID
+    windows and offset pages (capped at max_record_count)
+    """
+
+    def __init__(self, parcels: list[dict], max_record_count: int = 50, pagination: bool = True):
+        self.parcels = sorted(parcels, key=lambda p: p["OBJECTID"])
+        self.max_record_count = max_record_count
+        self.pagination = pagination
+        self.requests = 0
+        # Raise a connection error once this many requests were answered
+        self.fail_after = None
+
+    def install(self, client):
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+        return client
+
+    def select(self, where: str) -> list[dict]:
+        rows = self.parcels
+        m = re.search(r"DISTRICT='(\w+)'", where)
+        if m:
+            rows = [p for p in rows if p["DISTRICT"] == m.group(1)]
+        m = re.search(r"OBJECTID >= (\d+) AND OBJECTID < (\d+)", where)
+        if m:
+            lo, hi = int(m.group(1)), int(m.group(2))
+            rows = [p for p in rows if lo <= p["OBJECTID"] < hi]
+        return rows
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.fail_after is not None and self.requests >= self.fail_after:
+            raise httpx.ConnectError("layer down", request=request)
+        self.requests += 1
+        q = dict(request.url.params)
+        if not request.url.path.endswith("/query"):
+            return httpx.Response(200, json={
+                "maxRecordCount": self.max_record_count,
+                "advancedQueryCapabilities": {"supportsPagination": self.pagination,
+                                              "supportsReturningGeometryCentroid": True},
+            })
+
+        rows = self.select(q["where"])
+        if "groupByFieldsForStatistics" in q:
+            groups: dict[str, list[int]] = {}
+            for p in rows:
+                groups.setdefault(p["DISTRICT"], []).append(p["OBJECTID"])
+            return httpx.Response(200, json={"features": [
+                {"attributes": {"DISTRICT": d, "COUNT": len(oids), "MIN_OID": min(oids), "MAX_OID": max(oids)}}
+                for d, oids in groups.items()
+            ]})
+        if q.get("returnCountOnly") == "true":
+            return httpx.Response(200, json={"count": len(rows)})
+
+        offset = int(q.get("resultOffset", 0))
+        size = min(int(q.get("resultRecordCount", self.max_record_count)), self.max_record_count)
+        page = rows[offset:offset + size]
+        data = {"features": [
+            {"attributes": dict(p), "centroid": {"x": 46.7, "y": 24.7}} for p in page
+        ]}
+        if offset + len(page) < len(rows):
+            data["exceededTransferLimit"] = True
+        return httpx.Response(200, json=data)
+
+
+def make_parcels(districts: dict[str, int], start: int = 1, step: int = 3) -> list[dict]:
+    """`count` parcels per district, OBJECTIDs `step` apart"""
+    parcels = []
+    oid = start
+    for district, count in districts.items():
+        for _ in range(count):
+            parcels.append({"OBJECTID": oid, "DISTRICT": district})
+            oid += step
+    return parcels
+
+
+def run_extraction(spec, layer: FakeLayer, **options) -> dict:
+    """The report of an Extraction against the layer (no rate limit, no retries, no log)"""
+    async def run():
+        client = layer.install(ArcGISClient())
+        try:
+            return await Extraction(spec, client, **{
+                "rate": 0, "max_retries": 0, "log": lambda message: None, **options}).run()
+        finally:
+            await client.close()
+    return asyncio.run(run())
+
+
+def read_oids(path: str) -> list[int]:
+    """Sorted OBJECTIDs of an extraction CSV"""
+    with open(path, newline="") as f:
+        return sorted(int(row["objectid"]) for row in csv.DictReader(f))
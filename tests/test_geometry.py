@@ -0,0 +1,71 @@
+import httpx
+
+from fake_layer import FakeLayer, make_parcels, read_oids, run_extraction
+from parcel_extraction.geometry import feature_point, ring_centroid
+
+SQUARE = [[[46.6, 24.6], [46.8, 24.6], [46.8, 24.8], [46.6, 24.8], [46.6, 24.6]]]
+
+
+class RingsOnlyLayer(FakeLayer):
+    """
+    A layer that advertises centroids but answers returnCentroid with a
+    generic 400 error object (reject_all: every query does)
+    """
+
+    def __init__(self, parcels: list[dict], reject_all: bool = False, **options):
+        super().__init__(parcels, **options)
+        self.reject_all = reject_all
+        self.centroid_queries = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        q = dict(request.url.params)
+        if q.get("returnCentroid") == "true":
+            self.centroid_queries += 1
+        rejected = q.get("returnCentroid") == "true" or (self.reject_all and "outFields" in q)
+        if rejected and "groupByFieldsForStatistics" not in q:
+            self.requests += 1
+            return httpx.Response(200, json={"error": {
+                "code": 400, "message": "Unable to complete operation.", "details": []}})
+        response = super().handle(request)
+        if q.get("returnGeometry") == "true":
+            data = response.json()
+            for feature in data.get("features", []):
+                del feature["centroid"]
+                feature["geometry"] = {"rings": SQUARE}
+            response = httpx.Response(200, json=data)
+        return response
+
+
+def test_ring_centroid_is_the_vertex_average():
+    # The closing vertex counts like the others
+    lat, lng = ring_centroid(SQUARE)
+    assert round(lat, 6) == 24.68 and round(lng, 6) == 46.68
+    assert ring_centroid(None) == (None, None)
+
+
+def test_feature_point_prefers_the_server_centroid():
+    feature = {"centroid": {"x": 46.1, "y": 24.1}, "geometry": {"rings": SQUARE}}
+    assert feature_point(feature) == (24.1, 46.1)
+    assert feature_point({"geometry": {"rings": SQUARE}})[0] is not None
+
+
+def test_generic_400_to_return_centroid_falls_back_to_rings(spec):
+    layer = RingsOnlyLayer(make_parcels({"A": 30, "B": 20}), max_record_count=10)
+    report = run_extraction(spec, layer)
+
+    assert not report["failed_units"]
+    assert report["geometry"] == "generalized"
+    assert report["geometry_fallback"].startswith("HTTP 400 with returnCentroid only")
+    assert read_oids(spec.output) == sorted(p["OBJECTID"] for p in layer.parcels)
+    # Only the first data query asked for centroids
+    assert layer.centroid_queries == 1
+    with open(spec.output) as f:
+        assert "24.68" in f.read()
+
+
+def test_generic_400_for_every_query_is_a_failure(spec):
+    layer = RingsOnlyLayer(make_parcels({"A": 30}), reject_all=True, max_record_count=10)
+    report = run_extraction(spec, layer)
+
+    assert report["failed_units"] and report["geometry_fallback"] is None
+    assert all("Unable to complete operation" in f["error"] for f in report["failed_units"])
@@ -0,0 +1,151 @@
+import pytest
+
+from fake_layer import FakeLayer, make_parcels, read_oids, run_extraction
+from parcel_extraction.arcgis import ArcGISClient
+from parcel_extraction.engine import Extraction
+from parcel_extraction.journal import Journal, JournalMismatch, open_journal, uncovered
+from parcel_extraction.spec import JobSpec
+
+
+def test_uncovered_nothing_recorded():
+    assert uncovered(10, 50, []) == [(10, 50)]
+
+
+def test_uncovered_gaps_between_and_around_units():
+    covered = [(20, 30, 5), (30, 35, 1), (40, 45, 2)]
+    assert uncovered(10, 50, covered) == [(10, 20), (35, 40), (45, 50)]
+
+
+def test_uncovered_overlapping_units():
+    covered = [(10, 30, 5), (20, 25, 1), (25, 40, 3)]
+    assert uncovered(10, 50, covered) == [(40, 50)]
+
+
+def test_uncovered_fully_covered():
+    assert uncovered(10, 50, [(0, 60, 9)]) == []
+    assert uncovered(10, 50, [(10, 30, 1), (30, 50, 1)]) == []
+
+
+def test_uncovered_units_outside_the_range():
+    # A unit from an earlier plan may reach past the group's current range
+    assert uncovered(10, 50, [(0, 5, 1), (45, 70, 1)]) == [(10, 45)]
+    assert uncovered(10, 50, [(60, 70, 1)]) == [(10, 50)]
+
+
+def test_record_and_completed(tmp_path):
+    journal = Journal(str(tmp_path / "j.sqlite"))
+    journal.record("077", None, 100, 200, 40, 1000)
+    journal.record("077", None, 1, 100, 30, 600)
+    journal.record("077", 1012, 1, 100, 7, 1200)
+    # Recording a unit again replaces it
+    journal.record("168", 1000, 5, 9, 2, 1300)
+    journal.record("168", 1000, 5, 9, 3, 1400)
+
+    assert journal.completed() == {
+        ("077", None): [(1, 100, 30), (100, 200, 40)],
+        ("077", 1012): [(1, 100, 7)],
+        ("168", 1000): [(5, 9, 3)],
+    }
+    assert journal.csv_offset() == 1400
+    journal.close()
+
+
+def test_empty_journal_has_no_offset(tmp_path):
+    journal = Journal(str(tmp_path / "j.sqlite"))
+    assert journal.csv_offset() == 0
+    assert journal.completed() == {}
+    journal.close()
+
+
+def test_bind_refuses_another_job(tmp_path, spec):
+    path = str(tmp_path / "j.sqlite")
+    open_journal(path, spec).close()
+    # The same job binds again
+    open_journal(path, spec).close()
+
+    other = JobSpec.from_dict({"name": "other", "where": "DISTRICT='077'", "output": spec.output})
+    with pytest.raises(JournalMismatch):
+        open_journal(path, other)
+    # --restart discards the old journal
+    journal = open_journal(path, other, restart=True)
+    assert journal.completed() == {}
+    journal.close()
+
+
+def test_restart_drops_recorded_units(tmp_path, spec):
+    path = str(tmp_path / "j.sqlite")
+    journal = open_journal(path, spec)
+    journal.record("077", None, 1, 10, 3, 100)
+    journal.close()
+
+    journal = open_journal(path, spec)
+    assert journal.csv_offset() == 100
+    journal.close()
+    journal = open_journal(path, spec, restart=True)
+    assert journal.csv_offset() == 0
+    journal.close()
+
+
+def test_open_output_truncates_to_the_journal(tmp_path, spec):
+    with open(spec.output, "w") as f:
+        f.write("header\nrecorded\nwritten but not recorded\n")
+    journal = open_journal(str(tmp_path / "j.sqlite"), spec)
+    journal.record("077", None, 1, 10, 1, len("header\nrecorded\n"))
+
+    with Extraction(spec, ArcGISClient(), journal=journal).open_output() as f:
+        f.write("next\n")
+    with open(spec.output) as f:
+        assert f.read() == "header\nrecorded\nnext\n"
+    journal.close()
+
+
+def test_open_output_refuses_a_shorter_csv(tmp_path, spec):
+    with open(spec.output, "w") as f:
+        f.write("header\n")
+    journal = open_journal(str(tmp_path / "j.sqlite"), spec)
+    journal.record("077", None, 1, 10, 1, 1000)
+
+    with pytest.raises(RuntimeError, match="shorter than its journal"):
+        Extraction(spec, ArcGISClient(), journal=journal).open_output()
+    journal.close()
+
+
+def test_open_output_without_journal_starts_over(spec):
+    with open(spec.output, "w") as f:
+        f.write("old\n")
+    with Extraction(spec, ArcGISClient()).open_output() as f:
+        pass
+    with open(spec.output) as f:
+        assert f.read().splitlines() == [",".join(spec.columns)]
+
+
+def extract(spec, layer, journal):
+    return run_extraction(spec, layer, max_concurrency=1, target_rows=4, journal=journal)
+
+
+@pytest.mark.parametrize("pagination", [False, True])
+def test_resume_after_a_crash(tmp_path, spec, pagination):
+    parcels = make_parcels({"A": 60, "B": 45, "C": 30})
+    layer = FakeLayer(parcels, max_record_count=5, pagination=pagination)
+    path = str(tmp_path / "j.sqlite")
+
+    # The layer goes away part way through: the units fetched so far are journaled
+    layer.fail_after = 12
+    first = extract(spec, layer, open_journal(path, spec))
+    assert first["failed_units"]
+    journal = open_journal(path, spec)
+    recorded = sum(rows for units in journal.completed().values() for _, _, rows in units)
+    assert 0 < recorded < len(parcels)
+    # A crash after writing rows but before recording them
+    with open(spec.output, "a") as f:
+        f.write("9999,A,,\n")
+
+    layer.fail_after = None
+    layer.requests = 0
+    second = extract(spec, layer, journal)
+    assert not second["failed_units"]
+    assert second["resumed_units"] > 0
+    assert second["rows"] == len(parcels)
+    assert second["new_rows"] == len(parcels) - recorded
+
+    assert read_oids(spec.output) == [p["OBJECTID"] for p in parcels]
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+from parcel_extraction.limits import AdaptiveConcurrency, RateLimiter
+
+
+async def timed_waits(limiter: RateLimiter, n: int) -> float:
+    start = time.monotonic()
+    for _ in range(n):
+        await limiter.wait()
+    return time.monotonic() - start
+
+
+def test_rate_limiter_paces_requests():
+    # The first request goes at once, the next four 1/20 s apart
+    assert asyncio.run(timed_waits(RateLimiter(20), 5)) >= 0.19
+
+
+def test_rate_limiter_burst():
+    assert asyncio.run(timed_waits(RateLimiter(1, burst=3), 3)) < 0.1
+
+
+@pytest.mark.parametrize("rate", [0, -1])
+def test_rate_limiter_no_limit(rate):
+    assert asyncio.run(timed_waits(RateLimiter(rate), 1000)) < 0.1
+
+
+async def succeed(limiter: AdaptiveConcurrency, n: int):
+    for _ in range(n):
+        await limiter.acquire()
+        await limiter.release(ok=True)
+
+
+def test_concurrency_grows_after_a_window_of_successes():
+    async def run():
+        limiter = AdaptiveConcurrency(4)
+        assert limiter.limit == 1
+        await succeed(limiter, 1)
+        assert limiter.limit == 2
+        await succeed(limiter, 1)
+        assert limiter.limit == 2
+        await succeed(limiter, 1)
+        assert limiter.limit == 3
+        await succeed(limiter, 20)
+        assert limiter.limit == limiter.peak == 4
+    asyncio.run(run())
+
+
+def test_concurrency_halves_on_backoff():
+    async def run():
+        limiter = AdaptiveConcurrency(16, min_limit=2, initial=12)
+        for expected in (6, 3, 2, 2):
+            await limiter.acquire()
+            await limiter.release(ok=False, backoff=True)
+            assert limiter.limit == expected
+        # Failures that do not call for backing off leave the limit alone
+        await limiter.acquire()
+        await limiter.release(ok=False)
+        assert limiter.limit == 2
+        assert limiter.peak == 12
+    asyncio.run(run())
+
+
+def test_concurrency_initial_is_clamped():
+    assert AdaptiveConcurrency(4, initial=10).limit == 4
+    assert AdaptiveConcurrency(4, min_limit=3).limit == 3
+    assert AdaptiveConcurrency(0).max_limit == 1
+
+
+def test_acquire_waits_for_a_release():
+    async def run():
+        limiter = AdaptiveConcurrency(2, initial=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        blocked = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        await limiter.release(ok=True)
+        await asyncio.wait_for(blocked, 1)
+        assert limiter.in_flight == 2
+    asyncio.run(run())
@@ -0,0 +1,47 @@
+import httpx
+
+from fake_layer import FakeLayer, make_parcels, read_oids, run_extraction
+from parcel_extraction.arcgis import ArcGISClient
+from parcel_extraction.engine import PAGED_SPAN_PAGES, Extraction, Group
+
+
+class SkippingLayer(FakeLayer):
+    """Offset pages lose their first row, as when rows shift while paging"""
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        response = super().handle(request)
+        if "resultOffset" in request.url.params:
+            data = response.json()
+            data["features"] = data["features"][1:]
+            return httpx.Response(200, json=data)
+        return response
+
+
+def test_offset_pages_read_every_row(spec):
+    parcels = make_parcels({"A": 123, "B": 7})
+    report = run_extraction(spec, FakeLayer(parcels, max_record_count=10), max_concurrency=4)
+    assert report["paging"] == "offset"
+    assert not report["count_mismatches"] and not report["failed_units"]
+    assert read_oids(spec.output) == [p["OBJECTID"] for p in parcels]
+
+
+def test_paged_units_are_bounded_spans(spec):
+    extraction = Extraction(spec, ArcGISClient())
+    extraction.offset_paging = True
+    extraction.page_size = 10
+    group = Group("077", None, "1=1", expected=1000, oid_min=1, oid_max=10000)
+
+    units = extraction.group_units(group)
+    assert all(u.paged for u in units)
+    # About PAGED_SPAN_PAGES pages each, so a crash refetches at most that much
+    assert len(units) == 1000 // (PAGED_SPAN_PAGES * 10)
+    assert units[0].oid_start == 1 and units[-1].oid_end == 10001
+    assert all(a.oid_end == b.oid_start for a, b in zip(units, units[1:]))
+
+
+def test_count_mismatch_refetches_by_windows(spec):
+    parcels = make_parcels({"A": 45})
+    report = run_extraction(spec, SkippingLayer(parcels, max_record_count=10), max_concurrency=2)
+    assert report["count_mismatches"]
+    assert not report["failed_units"] and not report["short_groups"]
+    assert read_oids(spec.output) == [p["OBJECTID"] for p in parcels]
@@ -0,0 +1,9 @@
+def test_row_keeps_zero_coordinates(spec):
+    row = spec.row({"attributes": {"OBJECTID": 7, "DISTRICT": "D1"},
+                    "centroid": {"x": 0.0, "y": 24.123456789}})
+    assert row == {"objectid": 7, "district": "D1", "latitude": 24.123457, "longitude": 0.0}
+
+
+def test_row_without_geometry(spec):
+    row = spec.row({"attributes": {"OBJECTID": 7}})
+    assert row["latitude"] is None and row["longitude"] is None
@@ -0,0 +1,72 @@
+import pytest
+
+from fake_layer import FakeLayer, make_parcels, read_oids, run_extraction
+from parcel_extraction.engine import Group, WorkUnit, density_units, window_units
+
+GROUP = Group("077", None, "(1=1) AND DISTRICT='077'", expected=1000, oid_min=100, oid_max=10099)
+
+
+def assert_tiles(units, start, end):
+    """The units cover [start, end) in order, without gaps or overlaps"""
+    assert units[0].oid_start == start
+    assert units[-1].oid_end == end
+    for a, b in zip(units, units[1:]):
+        assert a.oid_end == b.oid_start
+
+
+def test_window_units():
+    units = window_units(GROUP, 3000)
+    assert [(u.oid_start, u.oid_end) for u in units] == [
+        (100, 3100), (3100, 6100), (6100, 9100), (9100, 10100)]
+    assert_tiles(window_units(GROUP, 7, 500, 550), 500, 550)
+
+
+def test_density_units_sized_for_target_rows():
+    # 1000 parcels over 10000 OBJECTIDs: 250 rows per unit is 4 windows of 2500
+    units = density_units(GROUP, 250)
+    assert [u.width for u in units] == [2500] * 4
+    assert_tiles(units, 100, 10100)
+
+
+def test_density_units_of_a_range():
+    # A tenth of the group holds about 100 rows: 3 windows for 40 rows each
+    units = density_units(GROUP, 40, 1100, 2100)
+    assert len(units) == 3
+    assert_tiles(units, 1100, 2100)
+
+
+def test_density_units_small_group_is_one_unit():
+    units = density_units(GROUP, 5000)
+    assert len(units) == 1
+    assert units[0].whole_group
+
+
+def test_halves():
+    low, high = WorkUnit(GROUP, 100, 201).halves()
+    assert (low.oid_start, low.oid_end, high.oid_start, high.oid_end) == (100, 150, 150, 201)
+    assert not low.paged and not high.paged
+
+
+def test_whole_group():
+    assert WorkUnit(GROUP, 100, 10100).whole_group
+    assert WorkUnit(GROUP, 0, 20000).whole_group
+    assert not WorkUnit(GROUP, 101, 10100).whole_group
+    assert not WorkUnit(GROUP, 100, 10099).whole_group
+
+
+def test_where_bounds_the_unit():
+    assert WorkUnit(GROUP, 5, 9).where == "(1=1) AND DISTRICT='077' AND OBJECTID >= 5 AND OBJECTID < 9"
+
+
+@pytest.mark.parametrize("options", [{"target_rows": 40}, {"window": 500}])
+def test_truncated_windows_are_bisected(spec, options):
+    # A dense run of OBJECTIDs among sparse ones: windows sized for the
+    # average density overflow a maxRecordCount of 10
+    parcels = make_parcels({"A": 30}, start=1, step=40) + make_parcels({"A": 60}, start=2000, step=1)
+    layer = FakeLayer(parcels, max_record_count=10, pagination=False)
+
+    report = run_extraction(spec, layer, max_concurrency=4, **options)
+    assert report["paging"] == "oid"
+    assert report["bisections"] > 0
+    assert not report["truncated_units"] and not report["failed_units"] and not report["short_groups"]
+    assert read_oids(spec.output) == [p["OBJECTID"] for p in parcels]